@@ -0,0 +1,518 @@
+import asyncio
+import hashlib
+import hmac
+import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import parse_qs
+from core.config import config
+from core.constants import DAY_PERIODS, PROJECTS_DIR
+from core.exceptions import (DailyTrackerError, DataValidationError, DayNotFoundError,
+                             ProjectNotFoundError)
+from core.validators import Validators
+from api.cache import CachedResponse, ResponseCache
+from services.async_service import async_service
+from services.json_codec import json_codec
+
+MAX_BODY_SIZE = 1024 * 1024
+
+# Версия файла: (mtime_ns, size) или None, если файла нет
+Version = Optional[Tuple[int, int]]
+
+
+class ApiError(Exception):
+    """Ошибка запроса с HTTP-статусом"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """Разобранный HTTP-запрос ASGI"""
+
+    def __init__(self, scope: Dict[str, Any], body: bytes):
+        self.method: str = scope["method"]
+        self.path: str = scope["path"]
+        self.query: Dict[str, List[str]] = parse_qs(scope.get("query_string", b"").decode("utf-8", "replace"))
+        self.headers: Dict[str, str] = {
+            name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])
+        }
+        self.body = body
+        self.params: Dict[str, str] = {}
+
+    def arg(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def json(self) -> Any:
+        if not self.body:
+            raise ApiError(400, "Пустое тело запроса")
+        try:
+            return json_codec.loads(self.body)
+        except ValueError as e:
+            raise ApiError(400, f"Некорректный JSON: {e}")
+
+
+class Response:
+    """Ответ: статус, тело и заголовки"""
+
+    def __init__(self, status: int = 200, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    @classmethod
+    def json(cls, data: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> "Response":
+        body = json_codec.dumps_compact(data)
+        return cls(status, body, {"content-type": "application/json; charset=utf-8", **(headers or {})})
+
+
+def _etag(validator: Hashable) -> str:
+    """ETag по версиям файлов: одинаков для всех представлений одного файла,
+    поэтому подходит для If-Match при записи"""
+    digest = hashlib.blake2b(repr(validator).encode("utf-8"), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _last_modified(versions: List[Version]) -> Optional[str]:
+    mtimes = [version[0] for version in versions if version]
+    return formatdate(max(mtimes) / 1e9, usegmt=True) if mtimes else None
+
+
+def _not_modified(request: Request, entry: CachedResponse) -> bool:
+    """Проверка If-None-Match / If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified:
+        try:
+            return parsedate_to_datetime(entry.last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _path_version(path) -> Version:
+    """Версия файла или каталога по mtime (каталог меняется при добавлении и удалении файлов)"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, 0
+
+
+def _check_date(day_date: str) -> str:
+    if not Validators.validate_date_format(day_date):
+        raise ApiError(400, f"Неверный формат даты: {day_date}")
+    return day_date
+
+
+def _check_project_name(name: str) -> str:
+    if not Validators.validate_filename(name):
+        raise ApiError(400, f"Недопустимое имя проекта: {name}")
+    return name
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class ApiApp:
+    """HTTP API ежедневника и проектов (ASGI, без сторонних фреймворков).
+
+    Чтения кэшируются в памяти процесса и отдаются с ETag/Last-Modified,
+    построенными по версиям файлов; условные запросы получают 304."""
+
+    def __init__(self, cache_entries: Optional[int] = None, token: Optional[str] = None):
+        settings = config.api
+        self.cache = ResponseCache(settings['cache_entries'] if cache_entries is None else cache_entries)
+        self.token = settings['token'] if token is None else token
+        self._routes: List[Tuple[str, re.Pattern, Handler]] = []
+        # Полосы блокировок по ресурсу: проверка If-Match, чтение и запись идут одним шагом
+        self._write_locks = [threading.Lock() for _ in range(64)]
+
+        self._route("GET", r"/health", self.health)
+        self._route("GET", r"/days", self.list_days)
+        self._route("GET", r"/days/range", self.get_day_range)
+        self._route("GET", r"/days/(?P<date>[^/]+)", self.get_day)
+        self._route("PUT", r"/days/(?P<date>[^/]+)", self.put_day)
+        self._route("GET", r"/days/(?P<date>[^/]+)/tasks", self.get_tasks)
+        self._route("POST", r"/days/(?P<date>[^/]+)/tasks", self.add_task)
+        self._route("PATCH", r"/days/(?P<date>[^/]+)/tasks/(?P<task_id>[^/]+)", self.update_task)
+        self._route("GET", r"/days/(?P<date>[^/]+)/state", self.get_state)
+        self._route("PUT", r"/days/(?P<date>[^/]+)/state", self.put_state)
+        self._route("GET", r"/state/categories", self.get_state_categories)
+        self._route("GET", r"/projects", self.list_projects)
+        self._route("GET", r"/projects/(?P<name>[^/]+)", self.get_project)
+        self._route("PUT", r"/projects/(?P<name>[^/]+)", self.put_project)
+
+    def _route(self, method: str, pattern: str, handler: Handler) -> None:
+        self._routes.append((method, re.compile(f"^{pattern}/?$"), handler))
+
+    # ---------- ASGI ----------
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        try:
+            request = Request(scope, await self._read_body(receive))
+            response = await self.dispatch(request)
+        except ApiError as e:
+            response = Response.json({"error": e.message}, status=e.status)
+        except Exception as e:
+            print(f"Ошибка обработки запроса {scope.get('path')}: {e}")
+            response = Response.json({"error": "Внутренняя ошибка сервера"}, status=500)
+
+        response.headers.setdefault("content-length", str(len(response.body)))
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in response.headers.items()]
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_SIZE:
+                raise ApiError(413, "Слишком большое тело запроса")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    async def dispatch(self, request: Request) -> Response:
+        """Маршрутизация и преобразование ошибок приложения в HTTP-статусы"""
+        # Сравнение за постоянное время: по времени ответа нельзя подобрать токен
+        if self.token and not hmac.compare_digest(request.headers.get("authorization", "").encode("utf-8"),
+                                                  f"Bearer {self.token}".encode("utf-8")):
+            raise ApiError(401, "Требуется токен доступа")
+
+        allowed = []
+        for method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            if method != request.method and not (method == "GET" and request.method == "HEAD"):
+                allowed.append(method)
+                continue
+            request.params = match.groupdict()
+            try:
+                response = await handler(request)
+            except (DayNotFoundError, ProjectNotFoundError) as e:
+                raise ApiError(404, str(e))
+            except DataValidationError as e:
+                raise ApiError(422, str(e))
+            except DailyTrackerError as e:
+                raise ApiError(500, str(e))
+            if request.method == "HEAD":
+                response.headers["content-length"] = str(len(response.body))
+                response.body = b""
+            return response
+
+        if allowed:
+            raise ApiError(405, f"Метод не поддерживается, допустимо: {', '.join(sorted(set(allowed)))}")
+        raise ApiError(404, f"Нет такого ресурса: {request.path}")
+
+    # ---------- Кэш и условные запросы ----------
+
+    async def _cached(self, request: Request, key: Hashable, versions: List[Version],
+                      build: Callable[[], Any]) -> Response:
+        """Ответ из кэша, если версии файлов не изменились; иначе собрать и запомнить.
+
+        build - синхронная функция (выполняется в пуле async_service) или корутина."""
+        validator = tuple(versions)
+        entry = self.cache.get(key, validator)
+        if entry is None:
+            data = await build() if asyncio.iscoroutinefunction(build) else await async_service.run(build)
+            entry = CachedResponse(validator, json_codec.dumps_compact(data),
+                                   _etag(validator), _last_modified(versions))
+            self.cache.put(key, entry)
+
+        headers = {"etag": entry.etag, "cache-control": "no-cache"}
+        if entry.last_modified:
+            headers["last-modified"] = entry.last_modified
+        if _not_modified(request, entry):
+            return Response(304, b"", headers)
+        return Response(200, entry.body, {"content-type": "application/json; charset=utf-8", **headers})
+
+    @staticmethod
+    def _check_precondition(request: Request, version: Version) -> None:
+        """If-Match: запись только поверх той версии, которую видел клиент"""
+        if_match = request.headers.get("if-match")
+        if if_match is None or if_match.strip() == "*":
+            return
+        if _etag((version,)) not in [tag.strip() for tag in if_match.split(",")]:
+            raise ApiError(412, "Ресурс изменён с момента чтения")
+
+    def _write_lock(self, key: Hashable) -> threading.Lock:
+        return self._write_locks[hash(key) % len(self._write_locks)]
+
+    async def _write(self, request: Request, key: Hashable, version: Callable[[], Version],
+                     apply: Callable[[], Any]) -> Tuple[Version, Version, Any]:
+        """Записать ресурс под блокировкой его ключа (в пуле async_service).
+
+        Возвращает версию до записи, версию после и результат apply."""
+        def locked():
+            with self._write_lock(key):
+                before = version()
+                self._check_precondition(request, before)
+                result = apply()
+                return before, version(), result
+
+        return await async_service.run(locked)
+
+    @staticmethod
+    def _written(version: Version, data: Any, status: int = 200) -> Response:
+        headers = {"etag": _etag((version,))}
+        last_modified = _last_modified([version])
+        if last_modified:
+            headers["last-modified"] = last_modified
+        return Response.json(data, status=status, headers=headers)
+
+    # ---------- Дни ----------
+
+    async def health(self, request: Request) -> Response:
+        return Response.json({"status": "ok", "cache": self.cache.stats()})
+
+    async def list_days(self, request: Request) -> Response:
+        from services.diary_service import diary_service
+
+        date_from, date_to = request.arg("from"), request.arg("to")
+
+        def build():
+            return {"days": sorted(diary_service.list_days(date_from, date_to))}
+
+        version = await async_service.run(diary_service.listing_version, date_from, date_to)
+        return await self._cached(request, ("days", date_from, date_to), [version], build)
+
+    async def get_day_range(self, request: Request) -> Response:
+        from services.diary_service import diary_service
+
+        date_from, date_to = request.arg("from"), request.arg("to")
+        if not date_from or not date_to:
+            raise ApiError(400, "Нужны параметры from и to")
+        _check_date(date_from)
+        _check_date(date_to)
+
+        dates = sorted(await async_service.list_days(date_from, date_to))
+        listing = await async_service.run(diary_service.listing_version, date_from, date_to)
+        versions = await asyncio.gather(*(async_service.day_version(d) for d in dates))
+
+        async def build():
+            days = await async_service.load_days(dates, skip_missing=True)
+            return {"days": {d: day_data.model_dump(by_alias=True) for d, day_data in days.items()}}
+
+        return await self._cached(request, ("range", date_from, date_to),
+                                  [listing] + versions, build)
+
+    async def get_day(self, request: Request) -> Response:
+        from services.diary_service import diary_service
+
+        day_date = _check_date(request.params["date"])
+        version = await async_service.day_version(day_date)
+        if version is None:
+            raise ApiError(404, f"День {day_date} не найден")
+        return await self._cached(request, ("day", day_date), [version],
+                                  lambda: diary_service.load_day(day_date).model_dump(by_alias=True))
+
+    async def put_day(self, request: Request) -> Response:
+        from models.diary import Day
+        from services.diary_service import diary_service
+
+        day_date = _check_date(request.params["date"])
+        try:
+            day_data = Day(**request.json())
+        except ValueError as e:
+            raise ApiError(422, f"Некорректные данные дня: {e}")
+
+        before, after, _ = await self._write(request, ("day", day_date),
+                                             lambda: diary_service.day_version(day_date),
+                                             lambda: diary_service.save_day(day_date, day_data))
+        return self._written(after, day_data.model_dump(by_alias=True), status=200 if before else 201)
+
+    async def get_tasks(self, request: Request) -> Response:
+        from services.diary_service import diary_service
+
+        day_date = _check_date(request.params["date"])
+        period = request.arg("period")
+        if period is not None and period not in DAY_PERIODS:
+            raise ApiError(400, f"Неизвестный период: {period}")
+        version = await async_service.day_version(day_date)
+        if version is None:
+            raise ApiError(404, f"День {day_date} не найден")
+
+        def build():
+            day_data = diary_service.load_day(day_date)
+            periods = [period] if period else DAY_PERIODS
+            return {"tasks": [dict(task.model_dump(by_alias=True), период=p)
+                              for p in periods for task in day_data.get_tasks_by_period(p)]}
+
+        return await self._cached(request, ("tasks", day_date, period), [version], build)
+
+    async def add_task(self, request: Request) -> Response:
+        """Добавить задачу; день создаётся, если его ещё нет"""
+        from models.diary import Task
+        from services.diary_service import diary_service
+
+        day_date = _check_date(request.params["date"])
+        payload = request.json()
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Ожидается объект задачи")
+        period = payload.pop("период", payload.pop("period", DAY_PERIODS[0]))
+        if period not in DAY_PERIODS:
+            raise ApiError(400, f"Неизвестный период: {period}")
+        try:
+            task = Task(**payload)
+        except ValueError as e:
+            raise ApiError(422, f"Некорректная задача: {e}")
+
+        def apply():
+            day_data = (diary_service.load_day(day_date) if diary_service.day_exists(day_date)
+                        else diary_service.create_day(day_date))
+            day_data.add_task(period, task)
+            diary_service.save_day(day_date, day_data)
+
+        _, after, _ = await self._write(request, ("day", day_date),
+                                        lambda: diary_service.day_version(day_date), apply)
+        return self._written(after, dict(task.model_dump(by_alias=True), период=period), status=201)
+
+    async def update_task(self, request: Request) -> Response:
+        """Изменить поля задачи (например, статус и прогресс)"""
+        from models.diary import Task
+        from services.diary_service import diary_service
+
+        day_date = _check_date(request.params["date"])
+        task_id = request.params["task_id"]
+        payload = request.json()
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Ожидается объект с полями задачи")
+
+        def apply():
+            day_data = diary_service.load_day(day_date)
+            for period in DAY_PERIODS:
+                tasks = day_data.get_tasks_by_period(period)
+                for index, task in enumerate(tasks):
+                    if task.id == task_id:
+                        merged = {**task.model_dump(by_alias=True), **payload, "id": task_id}
+                        tasks[index] = Task(**merged)
+                        diary_service.save_day(day_date, day_data)
+                        return dict(tasks[index].model_dump(by_alias=True), период=period)
+            raise ApiError(404, f"Задача {task_id} не найдена")
+
+        try:
+            _, after, result = await self._write(request, ("day", day_date),
+                                                 lambda: diary_service.day_version(day_date), apply)
+        except ValueError as e:
+            raise ApiError(422, f"Некорректные поля задачи: {e}")
+        return self._written(after, result)
+
+    async def get_state(self, request: Request) -> Response:
+        from services.diary_service import diary_service
+
+        day_date = _check_date(request.params["date"])
+        version = await async_service.day_version(day_date)
+        if version is None:
+            raise ApiError(404, f"День {day_date} не найден")
+
+        def build():
+            state = diary_service.load_day(day_date).state
+            return {"values": {value.category: value.value for value in state.values}}
+
+        return await self._cached(request, ("state", day_date), [version], build)
+
+    async def put_state(self, request: Request) -> Response:
+        """Записать значения состояния: {"values": {категория: значение}}"""
+        from services.diary_service import diary_service
+        from services.state_service import state_service
+
+        day_date = _check_date(request.params["date"])
+        payload = request.json()
+        values = payload.get("values") if isinstance(payload, dict) else None
+        if not isinstance(values, dict):
+            raise ApiError(400, "Ожидается объект values")
+
+        def apply():
+            types = {category.name: category.type for category in state_service.load_categories()}
+            day_data = diary_service.load_day(day_date)
+            for category_name, value in values.items():
+                day_data.state.set_value(category_name, str(value), types.get(category_name, "text"))
+            if day_data.state.is_dirty():
+                diary_service.save_day(day_date, day_data)
+            return {"values": {value.category: value.value for value in day_data.state.values}}
+
+        _, after, result = await self._write(request, ("day", day_date),
+                                             lambda: diary_service.day_version(day_date), apply)
+        return self._written(after, result)
+
+    async def get_state_categories(self, request: Request) -> Response:
+        from services.state_service import state_service
+
+        def build():
+            return {"categories": [category.model_dump() for category in state_service.load_categories()]}
+
+        versions = [_path_version(state_service.default_categories_file),
+                    _path_version(state_service.user_categories_file)]
+        return await self._cached(request, ("state_categories",), versions, build)
+
+    # ---------- Проекты ----------
+
+    async def list_projects(self, request: Request) -> Response:
+        from services.project_service import project_service
+
+        return await self._cached(request, ("projects",), [_path_version(PROJECTS_DIR)],
+                                  lambda: {"projects": project_service.list_projects()})
+
+    async def get_project(self, request: Request) -> Response:
+        from services.project_service import project_service
+
+        name = _check_project_name(request.params["name"])
+        version = await async_service.project_version(name)
+        if version is None:
+            raise ApiError(404, f"Проект {name} не найден")
+        return await self._cached(request, ("project", name), [version],
+                                  lambda: project_service.load_project(name).model_dump(by_alias=True))
+
+    async def put_project(self, request: Request) -> Response:
+        from services.project_service import project_service
+
+        name = _check_project_name(request.params["name"])
+        try:
+            project_data = project_service._migrate_old_format(request.json(), name)
+        except ValueError as e:
+            raise ApiError(422, f"Некорректные данные проекта: {e}")
+
+        before, after, _ = await self._write(request, ("project", name),
+                                             lambda: project_service.project_version(name),
+                                             lambda: project_service.save_project(name, project_data))
+        return self._written(after, project_data.model_dump(by_alias=True), status=200 if before else 201)
+
+
+def create_app(**kwargs) -> ApiApp:
+    """ASGI-приложение API"""
+    return ApiApp(**kwargs)
+
+
+def serve(host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """Запуск API через uvicorn (необязательная зависимость)"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise DailyTrackerError("Для запуска API установите uvicorn: pip install uvicorn")
+
+    settings = config.api
+    uvicorn.run(create_app(), host=host or settings['host'], port=port or settings['port'], log_level="info")
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class CachedResponse:
+    """Готовый ответ: тело и заголовки валидации"""
+
+    __slots__ = ("validator", "body", "etag", "last_modified")
+
+    def __init__(self, validator: Hashable, body: bytes, etag: str, last_modified: Optional[str]):
+        self.validator = validator
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """LRU-кэш сериализованных ответов.
+
+    Запись действительна, пока не изменился её валидатор - версии файлов
+    (mtime, size), из которых собран ответ. Проверка валидатора стоит
+    нескольких stat() и не требует чтения или разбора JSON."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, validator: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.validator != validator:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: CachedResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: Optional[Tuple[Any, ...]] = None) -> None:
+        """Сбросить все записи или записи с ключом, начинающимся с prefix"""
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                return
+            stale: List[Hashable] = [key for key in self._entries
+                                     if isinstance(key, tuple) and key[:len(prefix)] == prefix]
+            for key in stale:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
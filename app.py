@@ -1,4 +1,8 @@
 import streamlit as st
+from services.carryover_service import carryover_service
+from services.watcher_service import watcher_service
+from ui.components.diagnostics_components import DiagnosticsComponents
+from ui.components.habit_components import HabitComponents
 from ui.diary_tab import diary_tab
 from ui.projects_tab import projects_tab
 
@@ -13,8 +17,13 @@ def main():
 
     st.title("📅 Ежедневный трекер + 🚀 Проекты")
 
+    # Наблюдатель за внешними изменениями файлов (запускается один раз на процесс)
+    watcher_service.start()
+    # Перенос незавершённых задач по расписанию (если включён в config.yaml)
+    carryover_service.start()
+
     # Создаем вкладки
-    tab1, tab2 = st.tabs(["📅 Ежедневник", "🚀 Проекты"])
+    tab1, tab2, tab3 = st.tabs(["📅 Ежедневник", "🚀 Проекты", "🔥 Привычки"])
 
     with tab1:
         diary_tab.show_diary_tab()
@@ -22,6 +31,12 @@ def main():
     with tab2:
         projects_tab.show_projects_tab()
 
+    with tab3:
+        HabitComponents.render_dashboard()
+
+    # Панель метрик (только при включённой инструментации)
+    DiagnosticsComponents.render_diagnostics_panel()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    DiagnosticsComponents.run_with_profiler(main)
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Сравнение путей чтения и записи JSON: прежний (read_text + strip + json.loads,
+json.dumps + encode) и json_codec со стандартным json и с orjson.
+
+Запуск из корня проекта:
+    python benchmarks/bench_json_codec.py [--days 2000] [--repeat 5]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.constants import CATEGORIES, DAY_PERIODS, TASK_STATUSES  # noqa: E402
+from services.json_codec import JsonCodec, orjson  # noqa: E402
+
+
+def make_day(index: int) -> dict:
+    """Типичный день: 15 задач, состояние и заметки"""
+    day = {}
+    for period_index, period in enumerate(DAY_PERIODS):
+        day[period] = [
+            {
+                "id": str(uuid.uuid4()),
+                "задача": f"Задача {index}-{period_index}-{task_index} с описанием",
+                "время": f"{8 + task_index:02d}:00-{9 + task_index:02d}:00",
+                "статус": TASK_STATUSES[task_index % len(TASK_STATUSES)],
+                "прогресс": (index * 7 + task_index * 13) % 101,
+                "категория": CATEGORIES[(index + task_index) % len(CATEGORIES)],
+            }
+            for task_index in range(5)
+        ]
+    day["Состояние"] = {"значения": [
+        {"category": "😌 Настроение", "value": "😊 7/10", "value_type": "scale_1_10"},
+        {"category": "💪 Уровень энергии", "value": "70%", "value_type": "percent"},
+    ]}
+    day["Заметки"] = ["Заметка дня с текстом на русском языке 📝"]
+    return day
+
+
+def legacy_load(path: Path) -> dict:
+    content = path.read_text(encoding="utf-8").strip()
+    return json.loads(content) if content else {}
+
+
+def legacy_dump(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк JSON-кодека")
+    parser.add_argument("--days", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    days = [make_day(i) for i in range(args.days)]
+    variants = {
+        "прежний путь": (legacy_load, legacy_dump),
+        "codec stdlib": JsonCodec({"backend": "stdlib", "pretty": True, "compat": True}),
+    }
+    if orjson is not None:
+        variants["codec orjson (compat)"] = JsonCodec({"backend": "orjson", "pretty": True, "compat": True})
+        variants["codec orjson"] = JsonCodec({"backend": "orjson", "pretty": True, "compat": False})
+    else:
+        print("orjson не установлен - сравниваются только пути стандартного json\n")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = [Path(temp_dir) / f"{i}.json" for i in range(args.days)]
+        for path, day in zip(paths, days):
+            path.write_bytes(legacy_dump(day))
+        total_mb = sum(path.stat().st_size for path in paths) / 1024 / 1024
+
+        print(f"Дней: {args.days}, объём: {total_mb:.1f} МБ, лучший из {args.repeat} прогонов\n")
+        print(f"{'вариант':<24}{'чтение, с':>12}{'запись, с':>12}{'совпадает':>12}")
+
+        reference = [legacy_dump(day) for day in days]
+        for name, variant in variants.items():
+            if isinstance(variant, JsonCodec):
+                load = lambda path, codec=variant: codec.loads(path.read_bytes())
+                dump = variant.dumps
+            else:
+                load, dump = variant
+
+            read_time = timed(lambda: [load(path) for path in paths], args.repeat)
+            write_time = timed(lambda: [dump(day) for day in days], args.repeat)
+            identical = all(dump(day) == expected for day, expected in zip(days, reference))
+            print(f"{name:<24}{read_time:>12.3f}{write_time:>12.3f}{'да' if identical else 'нет':>12}")
+
+
+if __name__ == "__main__":
+    main()
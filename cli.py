@@ -0,0 +1,304 @@
+import argparse
+import sys
+from pathlib import Path
+from core.exceptions import DailyTrackerError
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    """Экспорт истории дней"""
+    from services.export_service import export_service
+
+    filters = dict(
+        date_from=args.date_from,
+        date_to=args.date_to,
+        categories=args.category or None,
+        record_types=args.record_type or None,
+    )
+
+    if args.output == "-":
+        count = export_service.export(args.format, sys.stdout.buffer, **filters)
+    else:
+        count = export_service.export_to_file(args.format, Path(args.output), **filters)
+    print(f"✅ Экспортировано записей: {count}", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    """Импорт задач из CSV/JSONL/iCalendar"""
+    from services.import_service import ImportService
+
+    service = ImportService(chunk_size=args.chunk_size, max_workers=args.workers)
+    report = service.import_file(Path(args.input), import_format=args.format, dry_run=args.dry_run)
+
+    for error in report.errors[:args.max_errors]:
+        print(f"  строка {error.line}: {error.message}", file=sys.stderr)
+    if len(report.errors) > args.max_errors:
+        print(f"  ... и ещё {len(report.errors) - args.max_errors} ошибок", file=sys.stderr)
+    print(f"✅ {report.summary()}", file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+def cmd_analytics(args: argparse.Namespace) -> int:
+    """Пересчёт аналитики по всей истории"""
+    import json
+    import signal
+    import threading
+    from services.analytics_service import analytics_service
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r  шардов: {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    cancel = threading.Event()
+
+    def interrupt(signum, frame) -> None:
+        # Первый Ctrl+C - досчитать отчёт по готовым шардам, второй - выйти сразу
+        if cancel.is_set():
+            raise KeyboardInterrupt
+        cancel.set()
+
+    previous = signal.signal(signal.SIGINT, interrupt)
+    try:
+        report = analytics_service.run(args.date_from, args.date_to, workers=args.workers,
+                                       progress=progress, cancel=cancel)
+    except KeyboardInterrupt:
+        print("\n⚠️ Прервано", file=sys.stderr)
+        return 130
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    print(file=sys.stderr)
+    if report.cancelled:
+        print(f"⚠️ Прервано: отчёт по {report.shards_done} из {report.shards_total} шардов", file=sys.stderr)
+
+    result = report.to_dict()
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"Дней: {result['days']}")
+        for row in result["categories"]:
+            print(f"  {row['category']}: задач {row['tasks']}, выполнено {row['done_rate']}%, "
+                  f"средний прогресс {row['avg_progress']}%")
+        for row in result["correlations"][:10]:
+            print(f"  r({row['a']}, {row['b']}) = {row['r']} по {row['days']} дням")
+    for error in result["errors"][:20]:
+        print(f"  {error}", file=sys.stderr)
+    return 130 if report.cancelled else 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """HTTP API для скриптов и автоматизаций"""
+    from api.app import serve
+
+    serve(host=args.host, port=args.port)
+    return 0
+
+
+def cmd_migrate_layout(args: argparse.Namespace) -> int:
+    """Перенос файлов дней в другую раскладку папок"""
+    from services.diary_service import diary_service
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r  файлов: {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    moved = diary_service.migrate_layout(args.layout, progress=progress)
+    print(file=sys.stderr)
+    target = args.layout or diary_service.layout
+    if target != diary_service.layout:
+        print(f"⚠️ В config.yaml указана раскладка {diary_service.layout} - "
+              f"новые сохранения будут переносить дни обратно", file=sys.stderr)
+    print(f"✅ Перенесено файлов: {moved} (раскладка {target})", file=sys.stderr)
+    return 0
+
+
+def cmd_reindex(args: argparse.Namespace) -> int:
+    """Полная перестройка производных индексов по файлам на диске"""
+    from services.diary_service import diary_service
+
+    diary_service.rebuild_indexes()
+    print("✅ Индексы перестроены", file=sys.stderr)
+    return 0
+
+
+def cmd_archive(args: argparse.Namespace) -> int:
+    """Упаковка закрытых периодов в пакеты и обратно"""
+    from services.archive_service import archive_service
+
+    if args.action == "list":
+        for period in archive_service.list_packs():
+            pack_path = archive_service.pack_path(period)
+            days = archive_service.packed_days(period)
+            print(f"  {period}: дней {len(days)}, {pack_path.stat().st_size / 1024:.1f} КБ")
+        return 0
+
+    if args.action == "unpack":
+        for period in args.periods:
+            print(f"✅ {period}: восстановлено файлов {archive_service.unpack(period)}", file=sys.stderr)
+        return 0
+
+    periods = args.periods or archive_service.closed_periods(months=args.months)
+    if not periods:
+        print("Нет закрытых периодов с отдельными файлами", file=sys.stderr)
+    for period in periods:
+        print(f"✅ {period}: дней в пакете {archive_service.pack(period, force=args.force)}", file=sys.stderr)
+    return 0
+
+
+def cmd_backup(args: argparse.Namespace) -> int:
+    """Снимки данных и восстановление"""
+    from services.backup_service import backup_service
+
+    if args.action == "snapshot":
+        print(f"✅ {backup_service.snapshot(force=args.force).summary()}", file=sys.stderr)
+    elif args.action == "list":
+        for snapshot_id in backup_service.list_snapshots():
+            manifest = backup_service.load_manifest(snapshot_id)
+            print(f"  {snapshot_id}  {manifest['created']}  файлов: {len(manifest['files'])}")
+    else:
+        snapshot_id = args.snapshot or (backup_service.find_snapshot(args.at) if args.at else None)
+        if snapshot_id is None:
+            print("❌ Укажите --snapshot или --at", file=sys.stderr)
+            return 2
+        if args.file:
+            target = backup_service.restore_file(snapshot_id, args.file, Path(args.output) if args.output else None)
+            print(f"✅ Восстановлен {target} из снимка {snapshot_id}", file=sys.stderr)
+        else:
+            restored, removed = backup_service.restore_snapshot(snapshot_id)
+            print(f"✅ Снимок {snapshot_id}: восстановлено {restored}, удалено {removed} файлов", file=sys.stderr)
+    return 0
+
+
+def cmd_sync(args: argparse.Namespace) -> int:
+    """Синхронизация с копией данных в другой папке"""
+    from services.sync_service import sync_service
+
+    report = sync_service.sync(sync_service.open_transport(Path(args.target)), dry_run=args.dry_run)
+    for title, keys in (("получено", report.pulled), ("отправлено", report.pushed), ("слито", report.merged)):
+        for key in keys[:args.max_items]:
+            print(f"  {title}: {key}", file=sys.stderr)
+    for path in report.conflicts:
+        print(f"  ⚠️ копия конфликта: {path}", file=sys.stderr)
+    for error in report.errors:
+        print(f"  ❌ {error}", file=sys.stderr)
+    print(f"✅ {'Проверка' if args.dry_run else 'Синхронизация'} с {report.peer[:8]}: {report.summary()}",
+          file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+def cmd_reschedule(args: argparse.Namespace) -> int:
+    """Перенос задач на другой день"""
+    from services.diary_service import diary_service
+
+    if args.task:
+        moved = diary_service.reschedule_tasks(args.task, args.target, args.period)
+    elif args.date_from:
+        moved = diary_service.reschedule_unfinished(args.date_from, args.date_to or args.date_from,
+                                                    args.target, args.period)
+    else:
+        print("❌ Укажите --task или --from", file=sys.stderr)
+        return 2
+    print(f"✅ Перенесено задач на {args.target}: {len(moved)}", file=sys.stderr)
+    return 0
+
+
+def cmd_carryover(args: argparse.Namespace) -> int:
+    """Перенос незавершённых задач закрытых дней"""
+    from services.carryover_service import carryover_service
+
+    report = carryover_service.run(through=args.through, dry_run=args.dry_run)
+    print(f"✅ {'Проверка' if args.dry_run else 'Перенос'}: {report.summary()}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Парсер аргументов командной строки"""
+    parser = argparse.ArgumentParser(prog="daily_tracker", description="📅 Daily Tracker — командная строка")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Экспорт истории дней в CSV/JSONL/Parquet")
+    export_parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], default="csv")
+    export_parser.add_argument("--from", dest="date_from", help="Начальная дата YYYY-MM-DD")
+    export_parser.add_argument("--to", dest="date_to", help="Конечная дата YYYY-MM-DD")
+    export_parser.add_argument("--category", action="append", help="Категория задач (можно несколько раз)")
+    export_parser.add_argument("--record-type", action="append", choices=["task", "state", "note"],
+                               help="Тип записей (по умолчанию все)")
+    export_parser.add_argument("-o", "--output", default="-", help="Файл результата или '-' для stdout")
+    export_parser.set_defaults(handler=cmd_export)
+
+    import_parser = subparsers.add_parser("import", help="Импорт задач из CSV/JSONL/iCalendar")
+    import_parser.add_argument("input", help="Входной файл")
+    import_parser.add_argument("--format", choices=["csv", "jsonl", "ics"], help="Формат (по расширению файла)")
+    import_parser.add_argument("--dry-run", action="store_true", help="Проверить без записи файлов")
+    import_parser.add_argument("--chunk-size", type=int, default=5000, help="Размер блока валидации")
+    import_parser.add_argument("--workers", type=int, default=8, help="Число потоков записи")
+    import_parser.add_argument("--max-errors", type=int, default=20, help="Сколько ошибок показать")
+    import_parser.set_defaults(handler=cmd_import)
+
+    analytics_parser = subparsers.add_parser("analytics", help="Аналитика по всей истории (пул процессов)")
+    analytics_parser.add_argument("--from", dest="date_from", help="Начальная дата YYYY-MM-DD")
+    analytics_parser.add_argument("--to", dest="date_to", help="Конечная дата YYYY-MM-DD")
+    analytics_parser.add_argument("--workers", type=int, help="Число процессов (по умолчанию - число ядер)")
+    analytics_parser.add_argument("--json", action="store_true", help="Вывести результат в JSON")
+    analytics_parser.set_defaults(handler=cmd_analytics)
+
+    serve_parser = subparsers.add_parser("serve", help="HTTP API (нужен uvicorn)")
+    serve_parser.add_argument("--host", help="Адрес (по умолчанию из config.yaml)")
+    serve_parser.add_argument("--port", type=int, help="Порт (по умолчанию из config.yaml)")
+    serve_parser.set_defaults(handler=cmd_serve)
+
+    archive_parser = subparsers.add_parser("archive", help="Пакеты закрытых лет и месяцев")
+    archive_parser.add_argument("action", choices=["pack", "unpack", "list"])
+    archive_parser.add_argument("periods", nargs="*", help="ГГГГ или ГГГГ-ММ (для pack по умолчанию - все закрытые годы)")
+    archive_parser.add_argument("--months", action="store_true", help="Упаковывать закрытые месяцы, а не годы")
+    archive_parser.add_argument("--force", action="store_true", help="Упаковать и незакрытый период")
+    archive_parser.set_defaults(handler=cmd_archive)
+
+    backup_parser = subparsers.add_parser("backup", help="Инкрементальные снимки данных")
+    backup_parser.add_argument("action", choices=["snapshot", "list", "restore"])
+    backup_parser.add_argument("--force", action="store_true", help="Снимок даже без изменений")
+    backup_parser.add_argument("--snapshot", help="Идентификатор снимка для восстановления")
+    backup_parser.add_argument("--at", help="Момент времени YYYY-MM-DD[THH:MM:SS] - последний снимок до него")
+    backup_parser.add_argument("--file", help="Восстановить один файл (путь относительно data/, например diary/2025/10/2025-10-15.json)")
+    backup_parser.add_argument("-o", "--output", help="Куда записать восстановленный файл (по умолчанию на место)")
+    backup_parser.set_defaults(handler=cmd_backup)
+
+    sync_parser = subparsers.add_parser("sync", help="Синхронизация с копией данных в другой папке")
+    sync_parser.add_argument("target", help="Папка другой установки (с подпапками data/ и config/)")
+    sync_parser.add_argument("--dry-run", action="store_true", help="Только показать различия")
+    sync_parser.add_argument("--max-items", type=int, default=20, help="Сколько ключей показать в каждой группе")
+    sync_parser.set_defaults(handler=cmd_sync)
+
+    reschedule_parser = subparsers.add_parser("reschedule", help="Перенос задач на другой день")
+    reschedule_parser.add_argument("target", help="День назначения YYYY-MM-DD")
+    reschedule_parser.add_argument("--task", action="append", help="ID задачи (можно несколько раз)")
+    reschedule_parser.add_argument("--from", dest="date_from", help="Перенести все незавершённые задачи с этой даты")
+    reschedule_parser.add_argument("--to", dest="date_to", help="... по эту дату (по умолчанию - только --from)")
+    reschedule_parser.add_argument("--period", choices=["Утро", "День", "Вечер"],
+                                   help="Период назначения (по умолчанию - прежний)")
+    reschedule_parser.set_defaults(handler=cmd_reschedule)
+
+    carryover_parser = subparsers.add_parser("carryover", help="Перенос незавершённых задач на следующий день")
+    carryover_parser.add_argument("--through", help="Последний закрытый день YYYY-MM-DD (по умолчанию по времени из config.yaml)")
+    carryover_parser.add_argument("--dry-run", action="store_true", help="Показать итог без записи")
+    carryover_parser.set_defaults(handler=cmd_carryover)
+
+    migrate_parser = subparsers.add_parser("migrate-layout", help="Перенос файлов дней в раскладку ГГГГ/ММ или обратно")
+    migrate_parser.add_argument("--layout", choices=["flat", "sharded"], help="Целевая раскладка (по умолчанию из config.yaml)")
+    migrate_parser.set_defaults(handler=cmd_migrate_layout)
+
+    reindex_parser = subparsers.add_parser("reindex", help="Перестроить поисковый и другие индексы по файлам")
+    reindex_parser.set_defaults(handler=cmd_reindex)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """Точка входа командной строки"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except DailyTrackerError as e:
+        print(f"❌ Ошибка: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -44,6 +44,82 @@ class Config:
     def template(self) -> str:
         return self._data.get('template', "template.md")
 
+    @property
+    def watcher(self) -> Dict[str, Any]:
+        """Настройки наблюдателя за файлами"""
+        defaults = {'enabled': True, 'backend': "auto", 'poll_interval': 1.0}
+        return {**defaults, **(self._data.get('watcher') or {})}
+
+    @property
+    def instrumentation(self) -> Dict[str, Any]:
+        """Настройки сбора метрик производительности"""
+        defaults = {'enabled': False}
+        return {**defaults, **(self._data.get('instrumentation') or {})}
+
+    @property
+    def profiler(self) -> Dict[str, Any]:
+        """Настройки профилировщика перезапуска"""
+        defaults = {'enabled': False, 'top': 30}
+        return {**defaults, **(self._data.get('profiler') or {})}
+
+    @property
+    def api(self) -> Dict[str, Any]:
+        """Настройки HTTP API"""
+        defaults = {'host': "127.0.0.1", 'port': 8765, 'cache_entries': 512, 'token': ""}
+        return {**defaults, **(self._data.get('api') or {})}
+
+    @property
+    def async_io(self) -> Dict[str, Any]:
+        """Ограничения асинхронного слоя ввода-вывода"""
+        defaults = {'max_workers': 8, 'max_concurrency': 32}
+        return {**defaults, **(self._data.get('async_io') or {})}
+
+    @property
+    def json_codec(self) -> Dict[str, Any]:
+        """Настройки чтения и записи JSON"""
+        defaults = {'backend': "auto", 'pretty': True, 'compat': True}
+        return {**defaults, **(self._data.get('json_codec') or {})}
+
+    @property
+    def diary(self) -> Dict[str, Any]:
+        """Раскладка файлов дней: flat (diary/ДАТА.json) или sharded (diary/ГГГГ/ММ/ДАТА.json)"""
+        defaults = {'layout': "flat"}
+        return {**defaults, **(self._data.get('diary') or {})}
+
+    @property
+    def backup(self) -> Dict[str, Any]:
+        """Настройки снимков данных"""
+        defaults = {'dir': "", 'keep': 0}
+        return {**defaults, **(self._data.get('backup') or {})}
+
+    @property
+    def carryover(self) -> Dict[str, Any]:
+        """Перенос незавершённых задач на следующий день"""
+        defaults = {'enabled': False, 'time': "", 'mode': "move", 'rules': [], 'catch_up_days': 60}
+        return {**defaults, **(self._data.get('carryover') or {})}
+
+    @property
+    def habits(self) -> Dict[str, Any]:
+        """Панель привычек: окно доли выполнения и минимум дней для показа"""
+        defaults = {'window': 30, 'min_days': 3}
+        return {**defaults, **(self._data.get('habits') or {})}
+
+    @property
+    def summary(self) -> Dict[str, Any]:
+        """Файл сводок дней: категории состояния, попадающие в запись (не больше четырёх)"""
+        defaults = {'state_categories': ["😌 Настроение", "💪 Уровень энергии",
+                                         "🧠 Ментальная концентрация", "🛌 Качество сна"]}
+        return {**defaults, **(self._data.get('summary') or {})}
+
+    @property
+    def autosave_delay(self) -> float:
+        """Задержка автосохранения состояния, секунд"""
+        return float(self._data.get('autosave_delay', 1.5))
+
+    def reload(self) -> None:
+        """Перечитать конфигурацию с диска"""
+        self._data = self._load_config()
+
 
 # Глобальный экземпляр конфигурации
 config = Config()
\ No newline at end of file
@@ -0,0 +1,222 @@
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from core.config import config
+
+# Границы корзин гистограммы, миллисекунды
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Стадии, по которым раскладывается время перезапуска
+STAGES = ("io", "validation", "service", "render")
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами"""
+
+    __slots__ = ("buckets", "count", "total_ms", "self_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.self_ms = 0.0  # без времени вложенных замеров
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, self_ms: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.self_ms += self_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def quantile(self, q: float) -> float:
+        """Оценка квантиля по верхней границе корзины"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+class Instrumentation:
+    """Счётчики и гистограммы горячих операций.
+
+    Выключенная инструментация стоит одной проверки флага на вызов."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._bytes: Dict[Tuple[str, str], int] = {}
+        # Стек вложенных замеров потока: время дочерних операций вычитается из родительской
+        self._local = threading.local()
+        self.configure()
+
+    def configure(self) -> None:
+        """Применить настройки из конфигурации"""
+        self.enabled = bool(config.instrumentation['enabled'])
+
+    def _enter(self) -> float:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, name: str, stage: str, start: float) -> None:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stack = self._local.stack
+        child_ms = stack.pop()
+        if stack:
+            stack[-1] += elapsed_ms
+        with self._lock:
+            histogram = self._histograms.get((name, stage))
+            if histogram is None:
+                histogram = self._histograms[(name, stage)] = Histogram()
+            histogram.observe(elapsed_ms, max(elapsed_ms - child_ms, 0.0))
+
+    def add_bytes(self, name: str, direction: str, size: int) -> None:
+        """Учесть прочитанные ("read") или записанные ("written") байты"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._bytes[(name, direction)] = self._bytes.get((name, direction), 0) + size
+
+    @contextmanager
+    def timed(self, name: str, stage: str = "service") -> Iterator[None]:
+        """Замер длительности блока кода"""
+        if not self.enabled:
+            yield
+            return
+        start = self._enter()
+        try:
+            yield
+        finally:
+            self._exit(name, stage, start)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._bytes.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Текущие значения всех метрик"""
+        with self._lock:
+            operations = [
+                {
+                    "name": name,
+                    "stage": stage,
+                    "count": histogram.count,
+                    "total_ms": round(histogram.total_ms, 3),
+                    "self_ms": round(histogram.self_ms, 3),
+                    "mean_ms": round(histogram.total_ms / histogram.count, 3) if histogram.count else 0.0,
+                    "p50_ms": histogram.quantile(0.5),
+                    "p95_ms": histogram.quantile(0.95),
+                    "max_ms": round(histogram.max_ms, 3),
+                    "buckets": list(histogram.buckets),
+                }
+                for (name, stage), histogram in self._histograms.items()
+            ]
+            io_bytes = [
+                {"name": name, "direction": direction, "bytes": size}
+                for (name, direction), size in self._bytes.items()
+            ]
+
+        stage_totals = {stage: 0.0 for stage in STAGES}
+        for operation in operations:
+            stage_totals[operation["stage"]] = stage_totals.get(operation["stage"], 0.0) + operation["self_ms"]
+
+        return {
+            "buckets_ms": list(LATENCY_BUCKETS_MS),
+            "operations": sorted(operations, key=lambda op: op["total_ms"], reverse=True),
+            "bytes": sorted(io_bytes, key=lambda item: (item["name"], item["direction"])),
+            "stage_totals_ms": {stage: round(total, 3) for stage, total in stage_totals.items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def save_json(self, file_path: Path) -> None:
+        """Сохранить снимок метрик в JSON файл"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(self.to_json(), encoding="utf-8")
+
+    def to_prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        lines = [
+            "# HELP daily_tracker_operation_seconds Длительность операций",
+            "# TYPE daily_tracker_operation_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            io_bytes = sorted(self._bytes.items())
+
+        for (name, stage), histogram in histograms:
+            labels = f'operation="{name}",stage="{stage}"'
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS_MS, histogram.buckets):
+                cumulative += bucket_count
+                lines.append(f'daily_tracker_operation_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'daily_tracker_operation_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"daily_tracker_operation_seconds_sum{{{labels}}} {histogram.total_ms / 1000:.6f}")
+            lines.append(f"daily_tracker_operation_seconds_count{{{labels}}} {histogram.count}")
+
+        lines.append("# HELP daily_tracker_io_bytes_total Прочитано и записано байт")
+        lines.append("# TYPE daily_tracker_io_bytes_total counter")
+        for (name, direction), size in io_bytes:
+            lines.append(f'daily_tracker_io_bytes_total{{operation="{name}",direction="{direction}"}} {size}')
+        return "\n".join(lines) + "\n"
+
+
+# Глобальный экземпляр
+instrumentation = Instrumentation()
+
+
+def instrumented(name: Optional[str] = None, stage: str = "service") -> Callable:
+    """Декоратор замера функции; имя по умолчанию - полное имя функции"""
+
+    def decorator(func: Callable) -> Callable:
+        metric_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return func(*args, **kwargs)
+            start = instrumentation._enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                instrumentation._exit(metric_name, stage, start)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_class(prefix: str, stage: str = "service") -> Callable[[type], type]:
+    """Декоратор класса: замер всех публичных методов как "<prefix>.<метод>" """
+
+    def decorator(cls: type) -> type:
+        for attr_name, attr in list(vars(cls).items()):
+            if attr_name.startswith("_"):
+                continue
+            metric_name = f"{prefix}.{attr_name}"
+            if isinstance(attr, staticmethod):
+                setattr(cls, attr_name, staticmethod(instrumented(metric_name, stage)(attr.__func__)))
+            elif isinstance(attr, classmethod):
+                setattr(cls, attr_name, classmethod(instrumented(metric_name, stage)(attr.__func__)))
+            elif callable(attr):
+                setattr(cls, attr_name, instrumented(metric_name, stage)(attr))
+        return cls
+
+    return decorator
@@ -0,0 +1,81 @@
+import cProfile
+import marshal
+import pstats
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+
+@dataclass
+class ProfileResult:
+    """Результат профилирования одного вызова"""
+    wall_ms: float
+    peak_memory: int  # байт, по данным tracemalloc
+    functions: List[Dict[str, Any]] = field(default_factory=list)
+    allocations: List[Dict[str, Any]] = field(default_factory=list)
+    raw: bytes = b""  # статистика в формате pstats (открывается pstats/snakeviz)
+    error: str = ""
+
+
+def _function_label(key: Tuple[str, int, str]) -> str:
+    filename, line, name = key
+    if filename == "~":
+        return name  # встроенные функции
+    return f"{name} ({filename}:{line})"
+
+
+def profile_call(func: Callable[[], Any], top: int = 30, allocation_top: int = 10) -> ProfileResult:
+    """Выполнить func под cProfile и tracemalloc.
+
+    Исключение func не прерывает сбор статистики: оно записывается в результат."""
+    profiler = cProfile.Profile()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    error = ""
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        func()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        profiler.disable()
+        wall_ms = (time.perf_counter() - start) * 1000
+        _, peak_memory = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if not was_tracing:
+            tracemalloc.stop()
+
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    functions = [
+        {
+            "function": _function_label(key),
+            "calls": total_calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for key, (_, total_calls, tottime, cumtime, _) in rows[:top]
+    ]
+
+    allocations = [
+        {
+            "location": str(stat.traceback),
+            "size_kb": round(stat.size / 1024, 1),
+            "blocks": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:allocation_top]
+    ]
+
+    return ProfileResult(
+        wall_ms=round(wall_ms, 3),
+        peak_memory=peak_memory,
+        functions=functions,
+        allocations=allocations,
+        raw=marshal.dumps(stats.stats),
+        error=error,
+    )
@@ -0,0 +1,184 @@
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from core.constants import CATEGORIES, DATA_DIR, TASK_STATUSES
+
+VOCABULARY_FILE = DATA_DIR / "index" / "vocabulary.json"
+
+
+class Vocabulary:
+    """Словарь значений с постоянными целочисленными кодами.
+
+    Код значения не меняется: новые значения только добавляются в конец.
+    В файлах данных по-прежнему хранятся строки - коды нужны для группировки,
+    фильтров и индексов в памяти."""
+
+    def __init__(self, kind: str, registry: "VocabularyRegistry"):
+        self.kind = kind
+        self._registry = registry
+        self._names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        # Встроенные значения из constants в их порядке и позиции их кодов в этом порядке
+        self._builtin: List[int] = []
+        self._builtin_positions: Dict[int, int] = {}
+
+    def _add(self, name: str) -> int:
+        code = self._codes[name] = len(self._names)
+        self._names.append(sys.intern(name))
+        return code
+
+    def code(self, name: str) -> int:
+        """Код значения; новое значение регистрируется и сохраняется"""
+        code = self._codes.get(name)
+        if code is not None:
+            return code
+        with self._registry.lock:
+            code = self._codes.get(name)
+            if code is None:
+                code = self._add(name)
+                self._registry.mark_dirty()
+        self._registry.save_if_dirty()
+        return code
+
+    def code_of(self, name: str) -> Optional[int]:
+        """Код без регистрации; None для неизвестного значения"""
+        return self._codes.get(name)
+
+    def name(self, code: int) -> str:
+        return self._names[code]
+
+    def names(self) -> List[str]:
+        """Все значения в порядке кодов"""
+        return list(self._names)
+
+    def key(self, name: str) -> Union[int, str]:
+        """Ключ группировки: код значения или само значение, если кода нет (без регистрации)"""
+        code = self._codes.get(name)
+        return name if code is None else code
+
+    def label(self, key: Union[int, str]) -> str:
+        """Значение по ключу из key() - например, format_func для selectbox"""
+        return self._names[key] if isinstance(key, int) else key
+
+    def options(self, extra: Iterable[str] = ()) -> List[Union[int, str]]:
+        """Ключи для selectbox: встроенные значения и extra (значения из данных).
+
+        Остальные когда-либо зарегистрированные значения (опечатки, импорт) в список не попадают."""
+        options: List[Union[int, str]] = list(self._builtin)
+        seen = set(self._builtin)
+        for name in extra:
+            key = self.key(name) if name else None
+            if key is not None and key not in seen:
+                seen.add(key)
+                options.append(key)
+        return options
+
+    def index(self, name: str) -> int:
+        """Позиция значения в options([name]) - для индекса selectbox"""
+        if not name:
+            return 0
+        position = self._builtin_positions.get(self._codes.get(name))
+        return len(self._builtin) if position is None else position
+
+    def extend(self, names: Iterable[str]) -> None:
+        """Зарегистрировать несколько значений разом"""
+        added = False
+        with self._registry.lock:
+            for name in names:
+                if name not in self._codes:
+                    self._add(name)
+                    added = True
+            if added:
+                self._registry.mark_dirty()
+        if added:
+            self._registry.save_if_dirty()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._codes
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class VocabularyRegistry:
+    """Словари категорий задач, статусов и категорий состояния.
+
+    Порядок кодов хранится в JSON-файле, поэтому коды устойчивы между
+    запусками даже при изменении списков в constants. Файл читается при
+    первом обращении к словарям, а не при импорте модуля."""
+
+    def __init__(self, file_path: Path = VOCABULARY_FILE):
+        self.file_path = file_path
+        self.lock = threading.RLock()
+        self._dirty = False
+        self._loaded: Optional[Dict[str, Vocabulary]] = None
+
+    @property
+    def categories(self) -> Vocabulary:
+        return self._vocabularies()["categories"]
+
+    @property
+    def statuses(self) -> Vocabulary:
+        return self._vocabularies()["statuses"]
+
+    @property
+    def state_categories(self) -> Vocabulary:
+        return self._vocabularies()["state_categories"]
+
+    def _vocabularies(self) -> Dict[str, Vocabulary]:
+        vocabularies = self._loaded
+        if vocabularies is None:
+            with self.lock:
+                if self._loaded is None:
+                    self._loaded = self._load()
+                vocabularies = self._loaded
+        return vocabularies
+
+    def _load(self) -> Dict[str, Vocabulary]:
+        persisted: Dict[str, List[str]] = {}
+        try:
+            if self.file_path.exists():
+                persisted = json.loads(self.file_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"Ошибка чтения словаря кодов {self.file_path}: {e}")
+
+        builtin = {"categories": CATEGORIES, "statuses": TASK_STATUSES, "state_categories": []}
+        vocabularies = {kind: Vocabulary(kind, self) for kind in builtin}
+        for kind, vocabulary in vocabularies.items():
+            for name in persisted.get(kind, []):
+                if name not in vocabulary:
+                    vocabulary._add(name)
+            for name in builtin[kind]:
+                if name not in vocabulary:
+                    vocabulary._add(name)
+                    self._dirty = True
+            vocabulary._builtin = [vocabulary._codes[name] for name in builtin[kind]]
+            vocabulary._builtin_positions = {code: i for i, code in enumerate(vocabulary._builtin)}
+        self._save_if_dirty(vocabularies)
+        return vocabularies
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+
+    def save_if_dirty(self) -> None:
+        """Сохранить порядок кодов, если появились новые значения"""
+        self._save_if_dirty(self._vocabularies())
+
+    def _save_if_dirty(self, vocabularies: Dict[str, Vocabulary]) -> None:
+        from services.file_service import file_service
+
+        with self.lock:
+            if not self._dirty:
+                return
+            data = {kind: vocabulary.names() for kind, vocabulary in vocabularies.items()}
+            self._dirty = False
+            try:
+                file_service.save_json(self.file_path, data)
+            except Exception as e:
+                print(f"Ошибка сохранения словаря кодов {self.file_path}: {e}")
+
+
+# Глобальный экземпляр
+vocabulary = VocabularyRegistry()
@@ -0,0 +1,207 @@
+import re
+import sys
+import uuid
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from core.constants import DAY_PERIODS
+from core.exceptions import DataValidationError
+from core.vocabulary import vocabulary
+from models.diary import Day, Task
+from models.state import DayState, StateValue
+
+# Разделители интервала: дефис и тире из POPULAR_TIME_RANGES; код разделителя - индекс в кортеже
+_TIME_SEPARATORS = ("-", "–")
+# Интервал "HH:MM-HH:MM" или "HH:MM–HH:MM"; остальные строки времени хранятся как есть
+_TIME_RANGE = re.compile(r"^(\d{2}):(\d{2})([-–])(\d{2}):(\d{2})$")
+NO_TIME = -1
+
+
+def _time_to_minutes(time_range: str) -> Tuple[int, int, int]:
+    """Интервал в минуты от полуночи и код разделителя;
+    (NO_TIME, NO_TIME, 0), если строку нельзя восстановить точно"""
+    match = _TIME_RANGE.match(time_range)
+    if not match:
+        return NO_TIME, NO_TIME, 0
+    start_h, start_m, end_h, end_m = (int(match.group(group)) for group in (1, 2, 4, 5))
+    if start_m > 59 or end_m > 59 or start_h > 24 or end_h > 24:
+        return NO_TIME, NO_TIME, 0
+    return start_h * 60 + start_m, end_h * 60 + end_m, _TIME_SEPARATORS.index(match.group(3))
+
+
+def _minutes_to_time(start: int, end: int, separator: int = 0) -> str:
+    return (f"{start // 60:02d}:{start % 60:02d}{_TIME_SEPARATORS[separator]}"
+            f"{end // 60:02d}:{end % 60:02d}")
+
+
+def _id_to_bytes(task_id: str) -> Optional[bytes]:
+    """UUID в 16 байт; None, если строка не в каноническом виде"""
+    try:
+        parsed = uuid.UUID(task_id)
+    except (ValueError, AttributeError, TypeError):
+        return None
+    return parsed.bytes if str(parsed) == task_id else None
+
+
+class CompactTask(NamedTuple):
+    """Задача в компактном виде: коды вместо строк"""
+    period: int
+    category: int
+    status: int
+    start: int  # минуты от полуночи или NO_TIME
+    end: int
+    progress: int
+
+
+class CompactHistory:
+    """Только для чтения: история дней в колонках array.
+
+    Задачи всех дней лежат подряд в общих массивах, день - это диапазон
+    [offsets[i], offsets[i + 1]). Категории и статусы хранятся кодами словаря,
+    время - минутами и кодом разделителя, прогресс - uint8, ID - 16 байтами.
+    Значения, которые нельзя упаковать без потерь, хранятся отдельно как исходные строки."""
+
+    def __init__(self):
+        self._dates: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._offsets = array("I", [0])
+
+        self._periods = array("B")
+        self._categories = array("H")
+        self._statuses = array("H")
+        self._starts = array("h")
+        self._ends = array("h")
+        self._separators = array("B")
+        self._progress = array("B")
+        self._ids = bytearray()
+        self._titles: List[str] = []
+
+        # Исключения: исходные строки времени и ID, которые не упаковались
+        self._raw_times: Dict[int, str] = {}
+        self._raw_ids: Dict[int, str] = {}
+        # Источник есть только у перенесённых копий - храним его разреженно
+        self._origins: Dict[int, str] = {}
+
+        # Состояние дня: (код категории состояния, значение, тип)
+        self._states: List[Tuple[Tuple[int, str, str], ...]] = []
+        self._notes: List[Tuple[str, ...]] = []
+
+    @classmethod
+    def from_days(cls, days: Iterable[Tuple[str, Day]]) -> "CompactHistory":
+        history = cls()
+        for day_date, day_data in days:
+            history.add_day(day_date, day_data)
+        return history
+
+    def add_day(self, day_date: str, day_data: Day) -> None:
+        """Упаковать день; история только пополняется"""
+        if day_date in self._positions:
+            raise DataValidationError(f"День {day_date} уже есть в истории")
+
+        for period_code, period in enumerate(DAY_PERIODS):
+            for task in day_data.get_tasks_by_period(period):
+                index = len(self._titles)
+                self._periods.append(period_code)
+                self._categories.append(vocabulary.categories.code(task.category))
+                self._statuses.append(vocabulary.statuses.code(task.status))
+
+                start, end, separator = _time_to_minutes(task.time)
+                if start == NO_TIME:
+                    self._raw_times[index] = task.time
+                self._starts.append(start)
+                self._ends.append(end)
+                self._separators.append(separator)
+                self._progress.append(task.progress)
+
+                id_bytes = _id_to_bytes(task.id)
+                if id_bytes is None:
+                    self._raw_ids[index] = task.id
+                    id_bytes = bytes(16)
+                self._ids += id_bytes
+                if task.origin is not None:
+                    self._origins[index] = task.origin
+                # Одинаковые названия задач повторяются изо дня в день - храним одну строку
+                self._titles.append(sys.intern(task.task))
+
+        self._positions[day_date] = len(self._dates)
+        self._dates.append(day_date)
+        self._offsets.append(len(self._titles))
+        self._states.append(tuple(
+            (vocabulary.state_categories.code(value.category), value.value, sys.intern(value.value_type))
+            for value in day_data.state.values
+        ))
+        self._notes.append(tuple(day_data.notes))
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __contains__(self, day_date: str) -> bool:
+        return day_date in self._positions
+
+    def dates(self) -> List[str]:
+        return sorted(self._dates)
+
+    def _task_range(self, day_date: str) -> range:
+        position = self._positions.get(day_date)
+        if position is None:
+            raise KeyError(day_date)
+        return range(self._offsets[position], self._offsets[position + 1])
+
+    def iter_tasks(self, day_date: str) -> Iterator[CompactTask]:
+        """Задачи дня без создания моделей"""
+        for index in self._task_range(day_date):
+            yield CompactTask(self._periods[index], self._categories[index], self._statuses[index],
+                              self._starts[index], self._ends[index], self._progress[index])
+
+    @staticmethod
+    def category_name(code: int) -> str:
+        return vocabulary.categories.name(code)
+
+    @staticmethod
+    def status_name(code: int) -> str:
+        return vocabulary.statuses.name(code)
+
+    def category_progress(self, day_date: str) -> Dict[str, int]:
+        """То же, что Day.calculate_category_progress, без распаковки дня"""
+        totals: Dict[int, List[int]] = {}
+        for index in self._task_range(day_date):
+            bucket = totals.setdefault(self._categories[index], [0, 0])
+            bucket[0] += self._progress[index]
+            bucket[1] += 1
+        return {vocabulary.categories.name(code): round(total / count) for code, (total, count) in totals.items()}
+
+    def _task(self, index: int) -> Task:
+        time_range = self._raw_times.get(index)
+        if time_range is None:
+            time_range = _minutes_to_time(self._starts[index], self._ends[index], self._separators[index])
+        task_id = self._raw_ids.get(index)
+        if task_id is None:
+            task_id = str(uuid.UUID(bytes=bytes(self._ids[index * 16:index * 16 + 16])))
+        # Данные уже проверялись при упаковке - повторная валидация не нужна
+        return Task.model_construct(
+            id=task_id,
+            task=self._titles[index],
+            time=time_range,
+            status=vocabulary.statuses.name(self._statuses[index]),
+            progress=self._progress[index],
+            category=vocabulary.categories.name(self._categories[index]),
+            origin=self._origins.get(index),
+        )
+
+    def get_day(self, day_date: str) -> Day:
+        """Распаковать день обратно в модель Day"""
+        periods: Dict[str, List[Task]] = {period: [] for period in DAY_PERIODS}
+        for index in self._task_range(day_date):
+            periods[DAY_PERIODS[self._periods[index]]].append(self._task(index))
+
+        position = self._positions[day_date]
+        state = DayState(значения=[
+            StateValue(category=vocabulary.state_categories.name(code), value=value, value_type=value_type)
+            for code, value, value_type in self._states[position]
+        ])
+        return Day(**periods, Состояние=state, Заметки=list(self._notes[position]))
+
+    def nbytes(self) -> int:
+        """Приблизительный объём колонок задач в байтах (без строк названий)"""
+        columns = (self._offsets, self._periods, self._categories, self._statuses,
+                   self._starts, self._ends, self._separators, self._progress)
+        return sum(column.itemsize * len(column) for column in columns) + len(self._ids)
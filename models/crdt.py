@@ -0,0 +1,232 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from core.constants import DAY_PERIODS
+from models.diary import Day, Task
+from models.state import DayState, StateValue
+
+# Метка записи: (миллисекунды, идентификатор копии данных). Сравнение
+# кортежей даёт детерминированный порядок и при равном времени.
+Stamp = Tuple[int, str]
+
+TASK_FIELDS = ["task", "time", "status", "progress", "category", "origin"]
+
+# Цифры позиций в последовательности (дробные ключи в системе счисления 36)
+POSITION_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+POSITION_BASE = len(POSITION_DIGITS)
+
+
+def key_between(lower: str, upper: Optional[str]) -> str:
+    """Ключ позиции строго между lower и upper ("" - начало, None - конец).
+
+    Ключи не заканчиваются на "0", поэтому между двумя разными ключами
+    всегда найдётся новый - вставка не требует перенумерации соседей."""
+    result = []
+    bounded = upper is not None
+    index = 0
+    while True:
+        low = POSITION_DIGITS.index(lower[index]) if index < len(lower) else 0
+        high = POSITION_DIGITS.index(upper[index]) if bounded and index < len(upper) else POSITION_BASE
+        if high - low > 1:
+            result.append(POSITION_DIGITS[(low + high) // 2])
+            return "".join(result)
+        result.append(POSITION_DIGITS[low])
+        if high - low == 1:
+            # Префикс уже меньше upper - дальше ограничения сверху нет
+            bounded = False
+        index += 1
+
+
+def _kept_in_order(order: List[str], positions: Dict[str, str]) -> set:
+    """Наибольшая подпоследовательность order, позиции которой уже строго возрастают"""
+    tails: List[Tuple[str, int]] = []
+    previous: Dict[int, Optional[int]] = {}
+    for index, task_id in enumerate(order):
+        position = positions.get(task_id)
+        if position is None:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if tails[middle][0] < position:
+                low = middle + 1
+            else:
+                high = middle
+        previous[index] = tails[low - 1][1] if low else None
+        if low == len(tails):
+            tails.append((position, index))
+        else:
+            tails[low] = (position, index)
+
+    kept = set()
+    index = tails[-1][1] if tails else None
+    while index is not None:
+        kept.add(order[index])
+        index = previous[index]
+    return kept
+
+
+def _newer(a: List[Any], b: List[Any]) -> List[Any]:
+    """Регистр LWW: [значение, метка]; побеждает более поздняя метка"""
+    return a if tuple(a[1]) >= tuple(b[1]) else b
+
+
+class DayDocument:
+    """Сливаемое (CRDT) представление дня.
+
+    Задачи хранятся по Task.id, каждое поле - регистр "последняя запись
+    побеждает"; место задачи (период и дробный ключ позиции) - тоже регистр,
+    поэтому перенос между периодами атомарен. Удаление - надгробие, а не
+    исчезновение ключа. Значения состояния - регистры по категории, заметки -
+    множество с признаком присутствия. Слияние коммутативно, ассоциативно и
+    идемпотентно: обе копии после обмена получают один и тот же день."""
+
+    VERSION = 1
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        # id -> {поле: [значение, метка]}, поле "slot" = [[период, позиция], метка], "deleted" = [bool, метка]
+        self.tasks: Dict[str, Dict[str, List[Any]]] = data.get("tasks", {})
+        # категория -> [[значение, тип] или None, метка]
+        self.state: Dict[str, List[Any]] = data.get("state", {})
+        # текст -> {"present": [bool, метка], "added": метка}
+        self.notes: Dict[str, Dict[str, List[Any]]] = data.get("notes", {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"v": self.VERSION, "tasks": self.tasks, "state": self.state, "notes": self.notes}
+
+    def max_stamp(self) -> Stamp:
+        stamps = [(0, "")]
+        for registers in self.tasks.values():
+            stamps.extend(tuple(register[1]) for register in registers.values())
+        stamps.extend(tuple(register[1]) for register in self.state.values())
+        stamps.extend(tuple(note["present"][1]) for note in self.notes.values())
+        return max(stamps)
+
+    def next_stamp(self, site: str, wall_ms: Optional[int] = None) -> Stamp:
+        """Метка новее всех в документе (часы разных устройств могут расходиться)"""
+        wall_ms = wall_ms if wall_ms is not None else int(time.time() * 1000)
+        return max(wall_ms, self.max_stamp()[0] + 1), site
+
+    # ---------- Состояние документа ----------
+
+    def materialize(self) -> Day:
+        """Текущий день по документу"""
+        periods: Dict[str, List[Tuple[str, str, Task]]] = {period: [] for period in DAY_PERIODS}
+        for task_id, registers in self.tasks.items():
+            if registers["deleted"][0]:
+                continue
+            period, position = registers["slot"][0]
+            # Документы, записанные до появления поля, его регистра не имеют
+            fields = {name: registers.get(name, [None])[0] for name in TASK_FIELDS}
+            task = Task(id=task_id, задача=fields["task"], время=fields["time"], статус=fields["status"],
+                        прогресс=fields["progress"], категория=fields["category"], источник=fields["origin"])
+            periods.setdefault(period, []).append((position, task_id, task))
+
+        state = DayState(значения=[
+            StateValue(category=category, value=register[0][0], value_type=register[0][1])
+            for category, register in sorted(self.state.items()) if register[0] is not None
+        ])
+        notes = [text for text, note in sorted(self.notes.items(), key=lambda item: (tuple(item[1]["added"]), item[0]))
+                 if note["present"][0]]
+
+        ordered = {period: [task for _, _, task in sorted(entries, key=lambda entry: entry[:2])]
+                   for period, entries in periods.items()}
+        return Day(Утро=ordered["Утро"], День=ordered["День"], Вечер=ordered["Вечер"],
+                   Состояние=state, Заметки=notes)
+
+    def reconcile(self, day: Day, stamp: Stamp) -> bool:
+        """Записать в документ отличия дня от текущего состояния с меткой stamp.
+
+        Так документ узнаёт о правках, сделанных в файле дня; возвращает True,
+        если что-то изменилось."""
+        changed = False
+        present = set()
+
+        for period in DAY_PERIODS:
+            tasks = day.get_tasks_by_period(period)
+            order = [task.id for task in tasks]
+            current = {task_id: self.tasks[task_id]["slot"][0][1] for task_id in order
+                       if task_id in self.tasks and not self.tasks[task_id]["deleted"][0]
+                       and self.tasks[task_id]["slot"][0][0] == period}
+            kept = _kept_in_order(order, current)
+
+            previous = ""
+            for index, task in enumerate(tasks):
+                present.add(task.id)
+                registers = self.tasks.get(task.id)
+                if registers is None:
+                    registers = self.tasks[task.id] = {"deleted": [False, list(stamp)]}
+                    changed = True
+                elif registers["deleted"][0]:
+                    registers["deleted"] = [False, list(stamp)]
+                    changed = True
+
+                if task.id in kept:
+                    previous = current[task.id]
+                else:
+                    upper = next((current[later] for later in order[index + 1:] if later in kept), None)
+                    previous = key_between(previous, upper)
+                    registers["slot"] = [[period, previous], list(stamp)]
+                    changed = True
+
+                values = {"task": task.task, "time": task.time, "status": task.status,
+                          "progress": task.progress, "category": task.category, "origin": task.origin}
+                for name, value in values.items():
+                    if name not in registers or registers[name][0] != value:
+                        registers[name] = [value, list(stamp)]
+                        changed = True
+
+        for task_id, registers in self.tasks.items():
+            if task_id not in present and not registers["deleted"][0]:
+                registers["deleted"] = [True, list(stamp)]
+                changed = True
+
+        values = {state_value.category: [state_value.value, state_value.value_type]
+                  for state_value in day.state.values}
+        for category in set(values) | set(self.state):
+            value = values.get(category)
+            register = self.state.get(category)
+            if register is None or register[0] != value:
+                self.state[category] = [value, list(stamp)]
+                changed = True
+
+        notes = set(day.notes)
+        for text in notes | set(self.notes):
+            note = self.notes.get(text)
+            if note is None:
+                self.notes[text] = {"present": [True, list(stamp)], "added": list(stamp)}
+                changed = True
+            elif note["present"][0] != (text in notes):
+                note["present"] = [text in notes, list(stamp)]
+                changed = True
+        return changed
+
+    # ---------- Слияние ----------
+
+    @classmethod
+    def merge(cls, a: "DayDocument", b: "DayDocument") -> "DayDocument":
+        """Слияние двух документов: по каждому регистру побеждает более поздняя метка"""
+        merged = cls()
+        for task_id in set(a.tasks) | set(b.tasks):
+            left, right = a.tasks.get(task_id), b.tasks.get(task_id)
+            if left is None or right is None:
+                merged.tasks[task_id] = {name: list(register) for name, register in (left or right).items()}
+                continue
+            merged.tasks[task_id] = {
+                name: list(_newer(left[name], right[name]) if name in left and name in right
+                           else left.get(name) or right[name])
+                for name in set(left) | set(right)
+            }
+
+        for category in set(a.state) | set(b.state):
+            left, right = a.state.get(category), b.state.get(category)
+            merged.state[category] = list(_newer(left, right) if left and right else left or right)
+
+        for text in set(a.notes) | set(b.notes):
+            left, right = a.notes.get(text), b.notes.get(text)
+            if left is None or right is None:
+                merged.notes[text] = dict(left or right)
+                continue
+            merged.notes[text] = {"present": list(_newer(left["present"], right["present"])),
+                                  "added": min(left["added"], right["added"], key=tuple)}
+        return merged
@@ -1,7 +1,8 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
+from core.vocabulary import vocabulary
 from models.state import DayState
 import uuid
-from pydantic import Field, validator
+from pydantic import Field, model_serializer, validator
 from .base import SerializableModel
 
 
@@ -13,6 +14,8 @@ class Task(SerializableModel):
     status: str = Field("☐", description="Статус выполнения", alias="статус")
     progress: int = Field(0, ge=0, le=100, description="Прогресс выполнения (0-100)", alias="прогресс")
     category: str = Field("🏠 Быт", description="Категория задачи", alias="категория")
+    origin: Optional[str] = Field(None, description="ID исходной задачи, если это перенесённая копия",
+                                  alias="источник")
 
     @validator('task')
     def validate_task_name(cls, v):
@@ -26,6 +29,15 @@ class Task(SerializableModel):
             raise ValueError('Прогресс должен быть от 0 до 100')
         return v
 
+    @model_serializer(mode="wrap")
+    def _drop_empty_origin(self, handler):
+        # Ссылка на исходную задачу есть только у копий - у остальных задач файл не меняется
+        data = handler(self)
+        for key in ("источник", "origin"):
+            if key in data and data[key] is None:
+                del data[key]
+        return data
+
 
 class Day(SerializableModel):
     """Day model"""
@@ -57,15 +69,15 @@ class Day(SerializableModel):
 
     def calculate_category_progress(self) -> Dict[str, int]:
         """Calculate progress by categories"""
-        category_progress = {}
+        # Group by integer category codes; categories without a code are grouped by name.
+        # The lookup never registers new values: a typo must not become a permanent category
+        totals: Dict[Union[int, str], List[int]] = {}
+        categories = vocabulary.categories
 
         for period in [self.morning, self.day, self.evening]:
             for task in period:
-                if task.category not in category_progress:
-                    category_progress[task.category] = []
-                category_progress[task.category].append(task.progress)
+                bucket = totals.setdefault(categories.key(task.category), [0, 0])
+                bucket[0] += task.progress
+                bucket[1] += 1
 
-        return {
-            cat: round(sum(progress) / len(progress))
-            for cat, progress in category_progress.items() if progress
-        }
\ No newline at end of file
+        return {categories.label(key): round(total / count) for key, (total, count) in totals.items()}
\ No newline at end of file
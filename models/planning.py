@@ -0,0 +1,45 @@
+from typing import List, Optional
+from pydantic import Field, validator
+from core.constants import DAY_PERIODS
+from .base import SerializableModel
+
+
+class PlanRule(SerializableModel):
+    """Правило планирования дней.
+
+    Правило с шаблоном задаёт основу дня для выбранных дней недели;
+    правило с источником копирует блоки (периоды) из другого дня.
+    """
+    name: str = Field("", description="Название правила")
+    weekdays: List[int] = Field(default_factory=lambda: list(range(7)), description="Дни недели (0 - понедельник)")
+    template: Optional[str] = Field(None, description="Шаблон дня")
+    copy_from_weekday: Optional[int] = Field(None, description="Копировать из дня той же недели")
+    copy_from_date: Optional[str] = Field(None, description="Копировать из конкретной даты")
+    periods: List[str] = Field(default_factory=lambda: list(DAY_PERIODS), description="Копируемые периоды")
+
+    @validator('weekdays', each_item=True)
+    def validate_weekday(cls, v):
+        if not 0 <= v <= 6:
+            raise ValueError('День недели должен быть от 0 до 6')
+        return v
+
+    @validator('periods', each_item=True)
+    def validate_period(cls, v):
+        if v not in DAY_PERIODS:
+            raise ValueError(f'Неизвестный период: {v}')
+        return v
+
+    def is_copy_rule(self) -> bool:
+        return self.copy_from_weekday is not None or self.copy_from_date is not None
+
+
+class PlanReport(SerializableModel):
+    """Итог планирования диапазона дней"""
+    created: List[str] = Field(default_factory=list)
+    merged: List[str] = Field(default_factory=list)
+    replaced: List[str] = Field(default_factory=list)
+    skipped: List[str] = Field(default_factory=list)
+
+    def summary(self) -> str:
+        return (f"создано {len(self.created)}, дополнено {len(self.merged)}, "
+                f"перезаписано {len(self.replaced)}, пропущено {len(self.skipped)}")
@@ -1,5 +1,5 @@
-from typing import List, Optional
-from pydantic import Field
+from typing import Dict, List, Optional, Set, Tuple
+from pydantic import Field, PrivateAttr
 from .base import SerializableModel
 
 
@@ -19,29 +19,65 @@ class StateValue(SerializableModel):
     value: str = Field("", description="Value")
     value_type: str = Field("text", description="Value type")
 
+    def update(self, value: str, value_type: str) -> bool:
+        """Update value; returns True if anything actually changed"""
+        if self.value == value and self.value_type == value_type:
+            return False
+        self.value = value
+        self.value_type = value_type
+        return True
+
 
 class DayState(SerializableModel):
     """Day state model"""
     values: List[StateValue] = Field(default_factory=list, alias="значения")
 
+    # Changed categories since the last clear_dirty() and category -> value lookup
+    _dirty: Set[str] = PrivateAttr(default_factory=set)
+    _index: Dict[str, StateValue] = PrivateAttr(default_factory=dict)
+    _index_key: Tuple[int, int] = PrivateAttr(default=(0, -1))
+
+    def _lookup(self) -> Dict[str, StateValue]:
+        index_key = (id(self.values), len(self.values))
+        if self._index_key != index_key:
+            self._index = {}
+            for state_value in self.values:
+                self._index.setdefault(state_value.category, state_value)
+            self._index_key = index_key
+        return self._index
+
     def get_value(self, category_name: str) -> Optional[str]:
         """Get value by category name"""
-        for state_value in self.values:
-            if state_value.category == category_name:
-                return state_value.value
-        return None
+        state_value = self._lookup().get(category_name)
+        return state_value.value if state_value is not None else None
 
     def set_value(self, category_name: str, value: str, value_type: str):
         """Set value for category"""
-        for state_value in self.values:
-            if state_value.category == category_name:
-                state_value.value = value
-                state_value.value_type = value_type
-                return
+        state_value = self._lookup().get(category_name)
+        if state_value is not None:
+            if state_value.update(value, value_type):
+                self._dirty.add(category_name)
+            return
 
         # If category doesn't exist, add new one
-        self.values.append(StateValue(
+        state_value = StateValue(
             category=category_name,
             value=value,
             value_type=value_type
-        ))
\ No newline at end of file
+        )
+        self.values.append(state_value)
+        self._index[category_name] = state_value
+        self._index_key = (id(self.values), len(self.values))
+        self._dirty.add(category_name)
+
+    def is_dirty(self) -> bool:
+        """Were any values changed since the last clear_dirty()"""
+        return bool(self._dirty)
+
+    def dirty_categories(self) -> Set[str]:
+        """Categories changed since the last clear_dirty()"""
+        return set(self._dirty)
+
+    def clear_dirty(self) -> None:
+        """Mark all values as saved"""
+        self._dirty.clear()
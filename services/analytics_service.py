@@ -0,0 +1,321 @@
+import math
+import os
+import signal
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from core.constants import DAY_PERIODS
+from core.exceptions import DataValidationError, FileOperationError
+from core.validators import Validators
+from core.vocabulary import vocabulary
+from services.json_codec import json_codec
+
+DONE_STATUS = "✅"
+COMPLETION_KEY = "✔ Выполнение задач"
+
+ProgressCallback = Callable[[int, int], None]
+# Путь к файлу дня или (путь к пакету, даты из него)
+Source = Union[str, Tuple[str, List[str]]]
+
+
+def state_number(value: str, value_type: str) -> Optional[float]:
+    """Числовое значение состояния или None для текста"""
+    try:
+        if value_type == "percent":
+            return float(value.replace("%", "").strip())
+        if value_type == "scale_1_10":
+            return float(value.split("/")[0].split()[-1])
+        if value_type == "yes_no":
+            return 1.0 if "Да" in value else 0.0 if "Нет" in value else None
+    except (ValueError, IndexError):
+        return None
+    return None
+
+
+def _empty_partial() -> Dict[str, Any]:
+    return {
+        "days": 0,
+        "errors": [],
+        # ключ категории (код словаря или строка) -> [задач, выполнено, сумма прогресса]
+        "categories": {},
+        # месяц -> ключ категории -> [задач, сумма прогресса]
+        "months": {},
+        # ключ статуса -> задач
+        "statuses": {},
+        # переменная -> [n, сумма, сумма квадратов]
+        "state": {},
+        # (a, b) -> [n, Σa, Σb, Σab, Σa², Σb²] по дням, где есть обе переменные
+        "pairs": {},
+    }
+
+
+def _iter_sources(sources: List[Source]) -> Iterator[Tuple[str, str, Any]]:
+    """(метка, дата, bytes или исключение) по отдельным файлам и пакетам"""
+    from services.archive_service import iter_pack_records
+
+    for source in sources:
+        if isinstance(source, str):
+            try:
+                with open(source, "rb") as file:
+                    raw = file.read()
+            except OSError as e:
+                raw = e
+            yield source, Path(source).stem, raw
+            continue
+
+        # Пакет читается последовательно, без seek на каждый день
+        pack_path, dates = source
+        try:
+            for day_date, raw in iter_pack_records(Path(pack_path), set(dates)):
+                yield f"{pack_path}:{day_date}", day_date, raw
+        except (OSError, FileOperationError) as e:
+            yield pack_path, "", e
+
+
+def aggregate_files(sources: List[Source]) -> Dict[str, Any]:
+    """Частичные агрегаты по набору дней (выполняется в процессе-воркере).
+
+    Источник - путь к файлу дня или (путь к пакету, даты). Данные разбираются
+    json_codec без построения моделей - нужны только категории, статусы,
+    прогресс и значения состояния."""
+    partial = _empty_partial()
+    categories, months, statuses = partial["categories"], partial["months"], partial["statuses"]
+    state, pairs = partial["state"], partial["pairs"]
+    # Группировка по кодам словаря: сравниваются числа, а не строки с эмодзи
+    category_key, status_key = vocabulary.categories.key, vocabulary.statuses.key
+    done_key = status_key(DONE_STATUS)
+
+    for label, day_date, raw in _iter_sources(sources):
+        if isinstance(raw, Exception):
+            partial["errors"].append(f"{label}: {raw}")
+            continue
+        try:
+            data = json_codec.loads(raw)
+        except ValueError as e:
+            partial["errors"].append(f"{label}: {e}")
+            continue
+        if not isinstance(data, dict):
+            partial["errors"].append(f"{label}: ожидается объект дня")
+            continue
+
+        # Сначала разбираем весь день: день с неверными значениями не должен попасть в суммы частично
+        try:
+            tasks = [
+                (category_key(task.get("категория", "")), status_key(task.get("статус", "")),
+                 int(task.get("прогресс", 0) or 0))
+                for period in DAY_PERIODS for task in data.get(period) or []
+            ]
+            variables: Dict[str, float] = {}
+            for state_value in (data.get("Состояние") or {}).get("значения") or []:
+                number = state_number(str(state_value.get("value", "")), state_value.get("value_type", "text"))
+                if number is not None:
+                    variables[state_value.get("category", "")] = number
+        except (AttributeError, TypeError, ValueError) as e:
+            partial["errors"].append(f"{label}: неверные данные дня: {e}")
+            continue
+
+        month_bucket = months.setdefault(day_date[:7], {})
+        done = 0
+        for category, status, progress in tasks:
+            bucket = categories.setdefault(category, [0, 0, 0])
+            bucket[0] += 1
+            bucket[2] += progress
+            if status == done_key:
+                bucket[1] += 1
+                done += 1
+            month_category = month_bucket.setdefault(category, [0, 0])
+            month_category[0] += 1
+            month_category[1] += progress
+            statuses[status] = statuses.get(status, 0) + 1
+        if tasks:
+            variables[COMPLETION_KEY] = done / len(tasks) * 100
+
+        for name, number in variables.items():
+            sums = state.setdefault(name, [0, 0.0, 0.0])
+            sums[0] += 1
+            sums[1] += number
+            sums[2] += number * number
+        names = sorted(variables)
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                x, y = variables[a], variables[b]
+                sums = pairs.setdefault((a, b), [0, 0.0, 0.0, 0.0, 0.0, 0.0])
+                sums[0] += 1
+                sums[1] += x
+                sums[2] += y
+                sums[3] += x * y
+                sums[4] += x * x
+                sums[5] += y * y
+
+        partial["days"] += 1
+    return partial
+
+
+@dataclass
+class AnalyticsReport:
+    """Сводные результаты по всей истории"""
+    days: int = 0
+    shards_done: int = 0
+    shards_total: int = 0
+    cancelled: bool = False
+    errors: List[str] = field(default_factory=list)
+    categories: Dict[Union[int, str], List[float]] = field(default_factory=dict)
+    months: Dict[str, Dict[Union[int, str], List[float]]] = field(default_factory=dict)
+    statuses: Dict[Union[int, str], int] = field(default_factory=dict)
+    state: Dict[str, List[float]] = field(default_factory=dict)
+    pairs: Dict[Tuple[str, str], List[float]] = field(default_factory=dict)
+
+    def merge(self, partial: Dict[str, Any]) -> None:
+        """Добавить частичный результат одного шарда"""
+        self.days += partial["days"]
+        self.errors.extend(partial["errors"])
+        for target, source in ((self.categories, partial["categories"]), (self.state, partial["state"]),
+                               (self.pairs, partial["pairs"])):
+            for key, sums in source.items():
+                current = target.get(key)
+                target[key] = list(sums) if current is None else [a + b for a, b in zip(current, sums)]
+        for month, month_categories in partial["months"].items():
+            target = self.months.setdefault(month, {})
+            for category, sums in month_categories.items():
+                current = target.get(category)
+                target[category] = list(sums) if current is None else [a + b for a, b in zip(current, sums)]
+        for status, count in partial["statuses"].items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+    def category_stats(self) -> List[Dict[str, Any]]:
+        """Задачи, доля выполненных и средний прогресс по категориям"""
+        label = vocabulary.categories.label
+        return sorted(
+            ({"category": label(category), "tasks": int(count), "done_rate": round(done / count * 100, 1),
+              "avg_progress": round(progress / count, 1)}
+             for category, (count, done, progress) in self.categories.items() if count),
+            key=lambda row: row["tasks"], reverse=True)
+
+    def monthly_trends(self) -> Dict[str, Dict[str, float]]:
+        """Средний прогресс категорий по месяцам"""
+        label = vocabulary.categories.label
+        return {month: {label(category): round(progress / count, 1)
+                        for category, (count, progress) in categories.items() if count}
+                for month, categories in sorted(self.months.items())}
+
+    def status_counts(self) -> Dict[str, int]:
+        """Число задач по статусам"""
+        return {vocabulary.statuses.label(status): count for status, count in self.statuses.items()}
+
+    def state_means(self) -> Dict[str, float]:
+        return {name: round(total / n, 2) for name, (n, total, _) in sorted(self.state.items()) if n}
+
+    def correlations(self, min_days: int = 10) -> List[Dict[str, Any]]:
+        """Корреляции Пирсона между показателями состояния и выполнением задач"""
+        rows = []
+        for (a, b), (n, sa, sb, sab, saa, sbb) in self.pairs.items():
+            if n < min_days:
+                continue
+            covariance = n * sab - sa * sb
+            variance = (n * saa - sa * sa) * (n * sbb - sb * sb)
+            if variance <= 0:
+                continue
+            rows.append({"a": a, "b": b, "days": int(n), "r": round(covariance / math.sqrt(variance), 3)})
+        return sorted(rows, key=lambda row: abs(row["r"]), reverse=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "days": self.days,
+            "shards": {"done": self.shards_done, "total": self.shards_total},
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "categories": self.category_stats(),
+            "statuses": self.status_counts(),
+            "monthly_trends": self.monthly_trends(),
+            "state_means": self.state_means(),
+            "correlations": self.correlations(),
+        }
+
+
+def _ignore_interrupts() -> None:
+    """Воркеры пула не реагируют на Ctrl+C: отменой управляет основной процесс"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class AnalyticsService:
+    """Пересчёт аналитики по всей истории в пуле процессов.
+
+    Файлы дней делятся на шарды по месяцам; каждый воркер возвращает
+    небольшие частичные суммы, которые сливаются в родительском процессе."""
+
+    def month_shards(self, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> Dict[str, List[Source]]:
+        """Файлы дней, сгруппированные по месяцам; каждый пакет - отдельный шард"""
+        for day_date in (date_from, date_to):
+            if day_date and not Validators.validate_date_format(day_date):
+                raise DataValidationError(f"Неверный формат даты: {day_date}")
+
+        from services.archive_service import archive_service
+        from services.diary_service import diary_service
+
+        shards: Dict[str, List[Source]] = defaultdict(list)
+        loose = set()
+        for day_date, file_path in diary_service.iter_day_files(date_from, date_to):
+            shards[day_date[:7]].append(str(file_path))
+            loose.add(day_date)
+
+        packed: Dict[Path, List[str]] = defaultdict(list)
+        for day_date, pack_path in archive_service.list_days(date_from, date_to).items():
+            if day_date not in loose:
+                packed[pack_path].append(day_date)
+        for pack_path, dates in sorted(packed.items()):
+            shards[f"pack:{pack_path.stem}"].append((str(pack_path), sorted(dates)))
+        return dict(shards)
+
+    def run(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+            workers: Optional[int] = None, progress: Optional[ProgressCallback] = None,
+            cancel: Optional[threading.Event] = None) -> AnalyticsReport:
+        """Пересчитать аналитику; workers=1 - в текущем процессе.
+
+        progress(готово, всего) вызывается после каждого шарда. Установленный
+        cancel останавливает выдачу новых шардов; отчёт содержит то, что успело
+        посчитаться, и cancelled=True."""
+        shards = self.month_shards(date_from, date_to)
+        report = AnalyticsReport(shards_total=len(shards))
+        workers = workers or os.cpu_count() or 1
+
+        def finished(partial: Dict[str, Any]) -> None:
+            report.merge(partial)
+            report.shards_done += 1
+            if progress:
+                progress(report.shards_done, report.shards_total)
+
+        if workers <= 1 or len(shards) <= 1:
+            for paths in shards.values():
+                if cancel is not None and cancel.is_set():
+                    report.cancelled = True
+                    break
+                finished(aggregate_files(paths))
+            return report
+
+        pending = list(shards.values())
+        running: Dict[Future, None] = {}
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(shards)), initializer=_ignore_interrupts)
+        try:
+            # Держим в очереди не больше двух шардов на воркер - так отмена срабатывает быстро
+            while pending or running:
+                if cancel is not None and cancel.is_set():
+                    report.cancelled = True
+                    break
+                while pending and len(running) < workers * 2:
+                    running[executor.submit(aggregate_files, pending.pop(0))] = None
+                done, _ = wait(list(running), timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    finished(future.result())
+        finally:
+            # При отмене не ждём уже запущенные шарды: их результат всё равно не войдёт в отчёт
+            executor.shutdown(wait=not report.cancelled, cancel_futures=True)
+        return report
+
+
+# Глобальный экземпляр сервиса
+analytics_service = AnalyticsService()
@@ -0,0 +1,303 @@
+import datetime
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from core.constants import DIARY_DIR
+from core.exceptions import DataValidationError, FileOperationError
+from core.instrumentation import instrumentation, instrumented
+from core.validators import Validators
+from services.file_service import file_service
+
+PACK_MAGIC = b"DTPACK1\n"
+INDEX_MAGIC = b"DTPKIDX\n"
+# Запись индекса: дата, смещение, длина сжатых данных, длина исходных, CRC32 исходных
+INDEX_ENTRY = struct.Struct("<10sQIII")
+# Хвост файла: смещение индекса, число записей, сигнатура
+FOOTER = struct.Struct("<QI8s")
+COMPRESSION_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class PackEntry:
+    """Положение одного дня внутри пакета"""
+    day_date: str
+    offset: int
+    length: int
+    raw_length: int
+    crc32: int
+
+
+def read_pack_index(pack_path: Path) -> Dict[str, PackEntry]:
+    """Прочитать индекс пакета из хвоста файла, не трогая сами записи"""
+    with open(pack_path, "rb") as file:
+        if file.read(len(PACK_MAGIC)) != PACK_MAGIC:
+            raise FileOperationError(f"Не пакет дней: {pack_path}")
+        file.seek(-FOOTER.size, 2)
+        index_offset, count, magic = FOOTER.unpack(file.read(FOOTER.size))
+        if magic != INDEX_MAGIC:
+            raise FileOperationError(f"Повреждён индекс пакета: {pack_path}")
+        file.seek(index_offset)
+        raw_index = file.read(count * INDEX_ENTRY.size)
+
+    entries = {}
+    for date_bytes, offset, length, raw_length, crc32 in INDEX_ENTRY.iter_unpack(raw_index):
+        day_date = date_bytes.decode("ascii")
+        entries[day_date] = PackEntry(day_date, offset, length, raw_length, crc32)
+    return entries
+
+
+def _decode_record(pack_path: Path, entry: PackEntry, compressed: bytes) -> bytes:
+    try:
+        raw = zlib.decompress(compressed)
+    except zlib.error as e:
+        raise FileOperationError(f"Повреждена запись {entry.day_date} в пакете {pack_path}: {e}")
+    if len(raw) != entry.raw_length or zlib.crc32(raw) != entry.crc32:
+        raise FileOperationError(f"Повреждена запись {entry.day_date} в пакете {pack_path}")
+    return raw
+
+
+def iter_pack_records(pack_path: Path, dates: Optional[Set[str]] = None) -> Iterator[Tuple[str, bytes]]:
+    """Последовательное чтение записей пакета (для полных проходов по истории).
+
+    Функция уровня модуля - её вызывают процессы-воркеры аналитики."""
+    entries = sorted(read_pack_index(pack_path).values(), key=lambda entry: entry.offset)
+    with open(pack_path, "rb") as file:
+        for entry in entries:
+            if dates is not None and entry.day_date not in dates:
+                continue
+            file.seek(entry.offset)
+            yield entry.day_date, _decode_record(pack_path, entry, file.read(entry.length))
+
+
+def build_pack(records: List[Tuple[str, bytes]]) -> bytes:
+    """Собрать пакет: сжатые по отдельности записи, затем индекс и хвост"""
+    chunks = [PACK_MAGIC]
+    index = []
+    offset = len(PACK_MAGIC)
+    for day_date, raw in sorted(records):
+        compressed = zlib.compress(raw, COMPRESSION_LEVEL)
+        index.append(INDEX_ENTRY.pack(day_date.encode("ascii"), offset, len(compressed), len(raw), zlib.crc32(raw)))
+        chunks.append(compressed)
+        offset += len(compressed)
+    chunks.extend(index)
+    chunks.append(FOOTER.pack(offset, len(index), INDEX_MAGIC))
+    return b"".join(chunks)
+
+
+class ArchiveService:
+    """Холодное хранение закрытых лет и месяцев в пакетах.
+
+    Пакет - один файл packs/ГГГГ.pack или packs/ГГГГ-ММ.pack: каждая запись
+    сжата отдельно, а индекс смещений лежит в конце файла, поэтому один день
+    читается одним seek без распаковки всего пакета. Отдельный файл дня
+    (после правки) всегда важнее записи в пакете."""
+
+    def __init__(self, pack_dir: Optional[Path] = None):
+        self.pack_dir = pack_dir or DIARY_DIR / "packs"
+        # путь пакета -> ((mtime, размер), индекс)
+        self._indexes: Dict[Path, Tuple[Tuple[int, int], Dict[str, PackEntry]]] = {}
+        self._lock = threading.Lock()
+
+    # ---------- Чтение ----------
+
+    def pack_path(self, period: str) -> Path:
+        return self.pack_dir / f"{period}.pack"
+
+    def list_packs(self) -> List[str]:
+        """Периоды, для которых есть пакеты"""
+        return [path.stem for path in file_service.list_files(self.pack_dir, "*.pack")]
+
+    def packed_days(self, period: str) -> List[str]:
+        """Дни в пакете периода"""
+        return sorted(self._index(self.pack_path(period)) or {})
+
+    def _index(self, pack_path: Path) -> Optional[Dict[str, PackEntry]]:
+        """Индекс пакета из кэша; перечитывается, если файл пакета заменён"""
+        try:
+            stat = pack_path.stat()
+        except OSError:
+            with self._lock:
+                self._indexes.pop(pack_path, None)
+            return None
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._indexes.get(pack_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        index = read_pack_index(pack_path)
+        with self._lock:
+            self._indexes[pack_path] = (version, index)
+        return index
+
+    def _locate(self, day_date: str) -> Optional[Tuple[Path, PackEntry]]:
+        """Годовой или месячный пакет, содержащий день"""
+        for period in (day_date[:4], day_date[:7]):
+            pack_path = self.pack_path(period)
+            index = self._index(pack_path)
+            if index and day_date in index:
+                return pack_path, index[day_date]
+        return None
+
+    def contains(self, day_date: str) -> bool:
+        return self._locate(day_date) is not None
+
+    def day_version(self, day_date: str) -> Optional[Tuple[int, int]]:
+        """Версия дня в пакете: mtime пакета и CRC записи"""
+        located = self._locate(day_date)
+        if located is None:
+            return None
+        pack_path, entry = located
+        return pack_path.stat().st_mtime_ns, entry.crc32
+
+    @instrumented("archive.read_day", stage="io")
+    def read_day(self, day_date: str) -> Optional[bytes]:
+        """Исходные байты файла дня из пакета или None"""
+        located = self._locate(day_date)
+        if located is None:
+            return None
+        pack_path, entry = located
+        try:
+            with open(pack_path, "rb") as file:
+                file.seek(entry.offset)
+                compressed = file.read(entry.length)
+        except OSError as e:
+            raise FileOperationError(f"Ошибка чтения пакета {pack_path}: {e}")
+        instrumentation.add_bytes("archive.read_day", "read", len(compressed))
+        return _decode_record(pack_path, entry, compressed)
+
+    def list_days(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Dict[str, Path]:
+        """Дни в пакетах, пересекающихся с диапазоном: дата -> путь пакета"""
+        days = {}
+        for period in self.list_packs():
+            if (date_from and period < date_from[:len(period)]) or (date_to and period > date_to[:len(period)]):
+                continue
+            pack_path = self.pack_path(period)
+            for day_date in self._index(pack_path) or {}:
+                if (date_from and day_date < date_from) or (date_to and day_date > date_to):
+                    continue
+                days[day_date] = pack_path
+        return days
+
+    def day_versions(self, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+        """Версии всех дней в пакетах (как в day_version) без чтения записей"""
+        versions = {}
+        for period in self.list_packs():
+            if (date_from and period < date_from[:len(period)]) or (date_to and period > date_to[:len(period)]):
+                continue
+            pack_path = self.pack_path(period)
+            index = self._index(pack_path)
+            if not index:
+                continue
+            pack_mtime = pack_path.stat().st_mtime_ns
+            for day_date, entry in index.items():
+                if (date_from and day_date < date_from) or (date_to and day_date > date_to):
+                    continue
+                versions[day_date] = (pack_mtime, entry.crc32)
+        return versions
+
+    def listing_version(self) -> Tuple[int, int]:
+        try:
+            return self.pack_dir.stat().st_mtime_ns, 0
+        except OSError:
+            return 0, 0
+
+    # ---------- Упаковка ----------
+
+    @staticmethod
+    def _check_period(period: str) -> None:
+        if len(period) == 4 and period.isdigit():
+            return
+        if len(period) == 7 and Validators.validate_date_format(f"{period}-01"):
+            return
+        raise DataValidationError(f"Период должен быть ГГГГ или ГГГГ-ММ: {period}")
+
+    @staticmethod
+    def is_closed(period: str, today: Optional[datetime.date] = None) -> bool:
+        """Закрыт ли период: год или месяц целиком в прошлом"""
+        today = today or datetime.date.today()
+        return period < (f"{today.year:04d}" if len(period) == 4 else f"{today.year:04d}-{today.month:02d}")
+
+    def pack(self, period: str, force: bool = False) -> int:
+        """Упаковать отдельные файлы дней периода; возвращает число дней в пакете.
+
+        Существующий пакет периода (и месячные пакеты при упаковке года)
+        объединяются с новыми файлами. Отдельные файлы удаляются только после
+        проверки записанного пакета; файл, изменённый во время упаковки, остаётся."""
+        from services.diary_service import diary_service
+
+        self._check_period(period)
+        if not force and not self.is_closed(period):
+            raise DataValidationError(f"Период {period} ещё не закрыт")
+        if len(period) == 7 and self._index(self.pack_path(period[:4])) is not None:
+            raise DataValidationError(f"Год {period[:4]} уже упакован целиком")
+
+        date_from = f"{period}-01-01"[:10]
+        date_to = f"{period}-12-31" if len(period) == 4 else f"{period}-31"
+        merged_packs = [self.pack_path(period)]
+        if len(period) == 4:
+            merged_packs += [self.pack_path(name) for name in self.list_packs() if name.startswith(f"{period}-")]
+
+        records: Dict[str, bytes] = {}
+        for pack_path in merged_packs:
+            if pack_path.exists():
+                records.update(iter_pack_records(pack_path))
+
+        loose: List[Tuple[str, Path, Tuple[int, int]]] = []
+        for day_date, file_path in diary_service.iter_day_files(date_from, date_to):
+            try:
+                stat = file_path.stat()
+                records[day_date] = file_path.read_bytes()
+            except OSError as e:
+                raise FileOperationError(f"Ошибка чтения дня {day_date}: {e}")
+            loose.append((day_date, file_path, (stat.st_mtime_ns, stat.st_size)))
+
+        if not records:
+            return 0
+
+        target = self.pack_path(period)
+        file_service.save_bytes(target, build_pack(list(records.items())))
+        written = read_pack_index(target)
+        if set(written) != set(records):
+            raise FileOperationError(f"Пакет {target} записан не полностью")
+
+        for pack_path in merged_packs[1:]:
+            pack_path.unlink(missing_ok=True)
+        for day_date, file_path, version in loose:
+            diary_service.remove_loose_file(day_date, file_path, version)
+        return len(records)
+
+    def unpack(self, period: str) -> int:
+        """Вернуть дни пакета в отдельные файлы и удалить пакет"""
+        from services.diary_service import diary_service
+
+        self._check_period(period)
+        pack_path = self.pack_path(period)
+        if not pack_path.exists():
+            raise DataValidationError(f"Нет пакета для периода {period}")
+
+        restored = 0
+        for day_date, raw in iter_pack_records(pack_path):
+            # Более новый отдельный файл (правка после упаковки) не трогаем
+            if not diary_service.has_loose_file(day_date):
+                file_service.save_bytes(diary_service.day_path(day_date), raw)
+                restored += 1
+        pack_path.unlink()
+        return restored
+
+    def closed_periods(self, months: bool = False) -> List[str]:
+        """Закрытые годы (или месяцы) с отдельными файлами дней"""
+        from services.diary_service import diary_service
+
+        width = 7 if months else 4
+        periods = {day_date[:width] for day_date, _ in diary_service.iter_day_files()}
+        return sorted(period for period in periods if self.is_closed(period))
+
+
+# Глобальный экземпляр сервиса
+archive_service = ArchiveService()
@@ -0,0 +1,137 @@
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from core.config import config
+from core.exceptions import DayNotFoundError, ProjectNotFoundError
+from models.diary import Day
+from models.projects import Project
+from models.state import StateCategory
+
+T = TypeVar("T")
+
+
+class AsyncService:
+    """Асинхронные варианты операций сервисов.
+
+    Синхронный код выполняется в ограниченном пуле потоков; семафор
+    ограничивает число одновременно выполняемых операций на цикл событий,
+    поэтому массовые выборки не забивают пул и не открывают тысячи файлов разом."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_concurrency: Optional[int] = None):
+        settings = config.async_io
+        self.max_workers = max_workers or settings['max_workers']
+        self.max_concurrency = max_concurrency or settings['max_concurrency']
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # Семафор привязан к циклу событий - свой для каждого цикла
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="async-io")
+            return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Выполнить синхронную функцию в пуле с учётом ограничения параллелизма"""
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        """Остановить пул потоков (дождавшись текущих операций)"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    # ---------- Дни ----------
+
+    async def load_day(self, day_date: str) -> Day:
+        from services.diary_service import diary_service
+        return await self.run(diary_service.load_day, day_date)
+
+    async def load_days(self, dates: Iterable[str], skip_missing: bool = False) -> Dict[str, Day]:
+        """Загрузить несколько дней параллельно; порядок ключей - как в dates"""
+        dates = list(dates)
+
+        async def load(day_date: str) -> Tuple[str, Optional[Day]]:
+            try:
+                return day_date, await self.load_day(day_date)
+            except DayNotFoundError:
+                if skip_missing:
+                    return day_date, None
+                raise
+
+        results = await asyncio.gather(*(load(day_date) for day_date in dates))
+        return {day_date: day_data for day_date, day_data in results if day_data is not None}
+
+    async def save_day(self, day_date: str, day_data: Day) -> None:
+        from services.diary_service import diary_service
+        await self.run(diary_service.save_day, day_date, day_data)
+
+    async def save_days(self, days: Dict[str, Day]) -> None:
+        """Сохранить несколько дней параллельно"""
+        await asyncio.gather(*(self.save_day(day_date, day_data) for day_date, day_data in days.items()))
+
+    async def list_days(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[str]:
+        from services.diary_service import diary_service
+        return await self.run(diary_service.list_days, date_from, date_to)
+
+    async def day_version(self, day_date: str) -> Optional[Tuple[int, int]]:
+        from services.diary_service import diary_service
+        return await self.run(diary_service.day_version, day_date)
+
+    # ---------- Проекты ----------
+
+    async def load_project(self, project_name: str) -> Project:
+        from services.project_service import project_service
+        return await self.run(project_service.load_project, project_name)
+
+    async def load_projects(self, names: Iterable[str], skip_missing: bool = False) -> Dict[str, Project]:
+        """Загрузить несколько проектов параллельно"""
+        names = list(names)
+
+        async def load(name: str) -> Tuple[str, Optional[Project]]:
+            try:
+                return name, await self.load_project(name)
+            except ProjectNotFoundError:
+                if skip_missing:
+                    return name, None
+                raise
+
+        results = await asyncio.gather(*(load(name) for name in names))
+        return {name: project_data for name, project_data in results if project_data is not None}
+
+    async def save_project(self, project_name: str, project_data: Project) -> None:
+        from services.project_service import project_service
+        await self.run(project_service.save_project, project_name, project_data)
+
+    async def list_projects(self) -> List[str]:
+        from services.project_service import project_service
+        return await self.run(project_service.list_projects)
+
+    async def project_version(self, project_name: str) -> Optional[Tuple[int, int]]:
+        from services.project_service import project_service
+        return await self.run(project_service.project_version, project_name)
+
+    # ---------- Состояние ----------
+
+    async def load_state_categories(self) -> List[StateCategory]:
+        from services.state_service import state_service
+        return await self.run(state_service.load_categories)
+
+
+# Глобальный экземпляр сервиса
+async_service = AsyncService()
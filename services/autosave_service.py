@@ -0,0 +1,61 @@
+import threading
+from typing import Callable, Dict, Optional
+from core.config import config
+
+
+class AutosaveService:
+    """Отложенное сохранение: серия изменений подряд даёт одну запись"""
+
+    def __init__(self):
+        self._timers: Dict[str, threading.Timer] = {}
+        self._pending: Dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, key: str, save: Callable[[], None], delay: Optional[float] = None) -> None:
+        """Запланировать сохранение; новое изменение того же ключа откладывает запись"""
+        delay = config.autosave_delay if delay is None else delay
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            self._pending[key] = save
+            timer = threading.Timer(delay, self._run, args=(key,))
+            timer.name = f"autosave-{key}"
+            self._timers[key] = timer
+            timer.start()
+
+    def is_pending(self, key: str) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def cancel(self, key: str) -> None:
+        """Отменить отложенное сохранение (например, если документ сохранён целиком)"""
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            self._pending.pop(key, None)
+
+    def flush(self, key: Optional[str] = None) -> None:
+        """Немедленно выполнить отложенные сохранения"""
+        with self._lock:
+            keys = [key] if key is not None else list(self._pending)
+        for pending_key in keys:
+            self._run(pending_key)
+
+    def _run(self, key: str) -> None:
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            save = self._pending.pop(key, None)
+        if save is None:
+            return
+        try:
+            save()
+        except Exception as e:
+            print(f"Ошибка автосохранения {key}: {e}")
+
+
+# Глобальный экземпляр сервиса
+autosave_service = AutosaveService()
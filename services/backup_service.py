@@ -0,0 +1,299 @@
+import datetime
+import hashlib
+import os
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from core.config import config
+from core.constants import BASE_DIR, DATA_DIR, DIARY_DIR, PROJECTS_DIR
+from core.exceptions import DataValidationError, FileOperationError
+from core.validators import Validators
+from services.file_service import file_service
+from services.json_codec import json_codec
+
+HASH_CHUNK = 1024 * 1024
+
+
+@dataclass
+class SnapshotResult:
+    """Итог снимка"""
+    snapshot_id: Optional[str]
+    files: int = 0
+    hashed: int = 0
+    new_objects: int = 0
+    new_bytes: int = 0
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        if self.snapshot_id is None:
+            return f"Изменений нет, файлов: {self.files}"
+        return (f"Снимок {self.snapshot_id}: файлов {self.files}, изменено {len(self.changed)}, "
+                f"удалено {len(self.removed)}, новых объектов {self.new_objects} "
+                f"({self.new_bytes / 1024:.1f} КБ)")
+
+
+class BackupService:
+    """Инкрементальные снимки данных с дедупликацией по содержимому.
+
+    Содержимое файлов дней и проектов хранится в objects/ под своим SHA-256
+    (каждый уникальный вариант файла - один раз), а снимок - это манифест
+    "путь -> хеш, размер, mtime". Файлы, у которых mtime и размер совпадают
+    с последним манифестом, не читаются и не хешируются повторно."""
+
+    def __init__(self):
+        self.data_dir = DATA_DIR
+        self.roots = [DIARY_DIR, PROJECTS_DIR]
+        self._lock = threading.Lock()
+
+    @property
+    def backup_dir(self) -> Path:
+        configured = config.backup['dir']
+        if not configured:
+            return BASE_DIR / "backups"
+        path = Path(configured).expanduser()
+        return path if path.is_absolute() else BASE_DIR / path
+
+    @property
+    def objects_dir(self) -> Path:
+        return self.backup_dir / "objects"
+
+    @property
+    def manifests_dir(self) -> Path:
+        return self.backup_dir / "manifests"
+
+    # ---------- Снимки ----------
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        """Отслеживаемые файлы данных: относительный путь -> stat"""
+        files = {}
+        for root in self.roots:
+            for dir_path, _, file_names in os.walk(root):
+                for file_name in file_names:
+                    if file_name.startswith(".") or file_name.endswith((".tmp", "~")):
+                        continue
+                    path = Path(dir_path) / file_name
+                    try:
+                        files[path.relative_to(self.data_dir).as_posix()] = path.stat()
+                    except OSError:
+                        continue
+        return files
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _store_bytes(self, content: bytes, digest: str) -> Optional[int]:
+        """Сохранить содержимое в хранилище; размер записи или None, если объект уже есть"""
+        object_path = self._object_path(digest)
+        if object_path.exists():
+            return None
+        compressed = zlib.compress(content, 6)
+        file_service.save_bytes(object_path, compressed)
+        return len(compressed)
+
+    def snapshot(self, force: bool = False) -> SnapshotResult:
+        """Снять снимок; без изменений с прошлого снимка новый манифест не создаётся"""
+        with self._lock:
+            result = self._snapshot(force)
+            if result.snapshot_id is not None:
+                self._apply_retention()
+            return result
+
+    def _snapshot(self, force: bool) -> SnapshotResult:
+        """Снимок без применения backup.keep (вызывается под блокировкой)"""
+        snapshots = self.list_snapshots()
+        previous = self.load_manifest(snapshots[-1]) if snapshots else None
+        previous_files: Dict[str, Dict[str, Any]] = previous["files"] if previous else {}
+
+        result = SnapshotResult(snapshot_id=None)
+        entries: Dict[str, Dict[str, Any]] = {}
+        for rel_path, stat in sorted(self._scan().items()):
+            old = previous_files.get(rel_path)
+            if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                entries[rel_path] = old
+                continue
+
+            path = self.data_dir / rel_path
+            try:
+                content = path.read_bytes()
+            except OSError as e:
+                print(f"Ошибка чтения файла {path} для снимка: {e}")
+                continue
+            digest = hashlib.sha256(content).hexdigest()
+            result.hashed += 1
+            written = self._store_bytes(content, digest)
+            if written is not None:
+                result.new_objects += 1
+                result.new_bytes += written
+            entries[rel_path] = {"hash": digest, "size": len(content), "mtime_ns": stat.st_mtime_ns}
+            if not old or old["hash"] != digest:
+                result.changed.append(rel_path)
+
+        result.files = len(entries)
+        result.removed = sorted(set(previous_files) - set(entries))
+        if previous is not None and not force and not result.changed and not result.removed:
+            return result
+
+        now = datetime.datetime.now()
+        snapshot_id = f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        manifest = {"id": snapshot_id, "created": now.isoformat(timespec="seconds"), "files": entries}
+        file_service.save_bytes(self.manifests_dir / f"{snapshot_id}.json", json_codec.dumps_compact(manifest))
+        result.snapshot_id = snapshot_id
+        return result
+
+    def _apply_retention(self) -> None:
+        """Оставить не больше backup.keep снимков (0 - хранить все)"""
+        keep = int(config.backup['keep'])
+        snapshots = self.list_snapshots()
+        if keep <= 0 or len(snapshots) <= keep:
+            return
+        for snapshot_id in snapshots[:-keep]:
+            (self.manifests_dir / f"{snapshot_id}.json").unlink(missing_ok=True)
+        self.collect_garbage()
+
+    def collect_garbage(self) -> int:
+        """Удалить объекты, на которые не ссылается ни один манифест"""
+        referenced = set()
+        for snapshot_id in self.list_snapshots():
+            referenced.update(entry["hash"] for entry in self.load_manifest(snapshot_id)["files"].values())
+        removed = 0
+        for object_path in file_service.list_files(self.objects_dir, "*/*"):
+            if object_path.parent.name + object_path.name not in referenced:
+                object_path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    # ---------- Манифесты ----------
+
+    def list_snapshots(self) -> List[str]:
+        """Идентификаторы снимков от старых к новым"""
+        return [path.stem for path in file_service.list_files(self.manifests_dir, "*.json")]
+
+    def load_manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        path = self.manifests_dir / f"{snapshot_id}.json"
+        if not path.exists():
+            raise DataValidationError(f"Снимок не найден: {snapshot_id}")
+        return file_service.load_json(path)
+
+    def find_snapshot(self, moment: str) -> str:
+        """Последний снимок, снятый не позже момента (ISO дата или дата-время)"""
+        try:
+            limit = datetime.datetime.fromisoformat(moment)
+        except ValueError:
+            raise DataValidationError(f"Неверный момент времени: {moment}")
+        if len(moment) == 10:
+            limit = limit.replace(hour=23, minute=59, second=59)
+
+        found = None
+        for snapshot_id in self.list_snapshots():
+            if datetime.datetime.strptime(snapshot_id[:15], "%Y%m%dT%H%M%S") <= limit:
+                found = snapshot_id
+        if found is None:
+            raise DataValidationError(f"Нет снимков до {moment}")
+        return found
+
+    def read_object(self, digest: str) -> bytes:
+        object_path = self._object_path(digest)
+        try:
+            content = zlib.decompress(object_path.read_bytes())
+        except (OSError, zlib.error) as e:
+            raise FileOperationError(f"Объект {digest} недоступен: {e}")
+        if hashlib.sha256(content).hexdigest() != digest:
+            raise FileOperationError(f"Объект {digest} повреждён")
+        return content
+
+    # ---------- Восстановление ----------
+
+    def restore_file(self, snapshot_id: str, rel_path: str, target: Optional[Path] = None) -> Path:
+        """Восстановить один файл из снимка (по умолчанию - на его место в данных)"""
+        entry = self.load_manifest(snapshot_id)["files"].get(rel_path)
+        if entry is None:
+            raise DataValidationError(f"Файла {rel_path} нет в снимке {snapshot_id}")
+        in_place = target is None
+        target = target or self.data_dir / rel_path
+        file_service.save_bytes(target, self.read_object(entry["hash"]))
+        if in_place:
+            self._refresh_indexes([rel_path])
+        return target
+
+    def restore_snapshot(self, snapshot_id: str) -> Tuple[int, int]:
+        """Вернуть данные к состоянию снимка: (восстановлено, удалено файлов).
+
+        Перед восстановлением снимается страховочный снимок текущего состояния.
+        Старые снимки сверх backup.keep удаляются только после восстановления:
+        иначе сборка мусора могла бы удалить объекты восстанавливаемого снимка."""
+        with self._lock:
+            manifest = self.load_manifest(snapshot_id)
+            self._snapshot(force=False)
+
+            current = self._scan()
+            restored = removed = 0
+            touched = []
+            for rel_path, entry in manifest["files"].items():
+                stat = current.get(rel_path)
+                if stat is not None and stat.st_size == entry["size"] and \
+                        self._hash_file(self.data_dir / rel_path) == entry["hash"]:
+                    continue
+                file_service.save_bytes(self.data_dir / rel_path, self.read_object(entry["hash"]))
+                touched.append(rel_path)
+                restored += 1
+
+            for rel_path in set(current) - set(manifest["files"]):
+                (self.data_dir / rel_path).unlink(missing_ok=True)
+                touched.append(rel_path)
+                removed += 1
+
+            self._apply_retention()
+
+        # Файлы записаны в обход save_day - производные индексы обновляем сами
+        self._refresh_indexes(touched)
+        return restored, removed
+
+    @staticmethod
+    def _refresh_indexes(rel_paths: List[str]) -> None:
+        """Обновить индексы по восстановленным или удалённым файлам"""
+        from services.diary_service import diary_service
+
+        days, projects, full = set(), set(), False
+        for rel_path in rel_paths:
+            path = Path(rel_path)
+            if path.parts[0] == DIARY_DIR.name and path.suffix == ".json" and \
+                    Validators.validate_date_format(path.stem):
+                days.add(path.stem)
+            elif path.parts[0] == PROJECTS_DIR.name and path.suffix == ".json":
+                projects.add(path.stem)
+            else:
+                # Пакеты дней и прочее - проще перестроить всё
+                full = True
+
+        if full:
+            diary_service.rebuild_indexes()
+            return
+        for day_date in sorted(days):
+            diary_service.reindex_day(day_date)
+        if projects:
+            from services.project_service import project_service
+            from services.search_service import search_service
+            for project_name in sorted(projects):
+                try:
+                    if project_service.project_exists(project_name):
+                        search_service.index_project(project_name, project_service.load_project(project_name))
+                    else:
+                        search_service.remove_project(project_name)
+                except Exception as e:
+                    print(f"Ошибка индексации проекта {project_name}: {e}")
+
+
+# Глобальный экземпляр сервиса
+backup_service = BackupService()
@@ -0,0 +1,222 @@
+import datetime
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from core.config import config
+from core.constants import DAY_PERIODS
+from core.exceptions import DataValidationError
+from core.validators import Validators
+from models.diary import Day, Task
+from services.file_service import file_service
+from services.search_service import INDEX_DIR
+
+CARRY_MODES = ["move", "duplicate", "skip"]
+
+
+@dataclass
+class CarryOverReport:
+    """Итог переноса"""
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    target: Optional[str] = None
+    moved: List[str] = field(default_factory=list)
+    duplicated: List[str] = field(default_factory=list)
+    skipped: int = 0
+
+    def summary(self) -> str:
+        if self.target is None:
+            return "Новых закрытых дней нет"
+        return (f"{self.date_from} … {self.date_to} → {self.target}: перенесено {len(self.moved)}, "
+                f"скопировано {len(self.duplicated)}, оставлено {self.skipped}")
+
+
+class CarryOverService:
+    """Перенос незавершённых задач закрытых дней на следующий день.
+
+    Задачи выбираются одним запросом к индексу задач, каждый затронутый день
+    читается один раз, а все изменения записываются одним пакетом. После
+    пропуска нескольких дней задачи попадают сразу в первый незакрытый день,
+    без промежуточных копий в каждом пропущенном."""
+
+    def __init__(self, state_path: Optional[Path] = None):
+        self.state_path = state_path or INDEX_DIR / "carryover_state.json"
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- Настройки ----------
+
+    @property
+    def run_time(self) -> datetime.time:
+        """Время, после которого текущий день считается закрытым"""
+        value = config.carryover['time'] or (config.reminders[-1] if config.reminders else "22:00")
+        try:
+            return datetime.time.fromisoformat(value)
+        except ValueError:
+            raise DataValidationError(f"Неверное время переноса: {value}")
+
+    @staticmethod
+    def _rules() -> Tuple[str, List[Dict[str, Optional[str]]]]:
+        """Режим по умолчанию и проверенные правила из config.yaml"""
+        settings = config.carryover
+        default_mode = settings['mode']
+        if default_mode not in CARRY_MODES:
+            raise DataValidationError(f"Неизвестный режим переноса: {default_mode}")
+
+        rules = []
+        for rule in settings['rules'] or []:
+            rule = {'category': rule.get('category'), 'period': rule.get('period'),
+                    'mode': rule.get('mode', default_mode), 'target_period': rule.get('target_period')}
+            if rule['mode'] not in CARRY_MODES:
+                raise DataValidationError(f"Неизвестный режим переноса: {rule['mode']}")
+            for key in ('period', 'target_period'):
+                if rule[key] is not None and rule[key] not in DAY_PERIODS:
+                    raise DataValidationError(f"Неизвестный период в правиле переноса: {rule[key]}")
+            rules.append(rule)
+        return default_mode, rules
+
+    @staticmethod
+    def _resolve(default_mode: str, rules: List[Dict[str, Optional[str]]],
+                 category: str, period: str) -> Tuple[str, str]:
+        """Режим и период назначения: первое подходящее правило, иначе режим по умолчанию"""
+        for rule in rules:
+            if rule['category'] in (None, category) and rule['period'] in (None, period):
+                return rule['mode'], rule['target_period'] or period
+        return default_mode, period
+
+    # ---------- Перенос ----------
+
+    def closed_through(self, now: Optional[datetime.datetime] = None) -> str:
+        """Последний закрытый день: сегодня после времени переноса, иначе вчера"""
+        now = now or datetime.datetime.now()
+        closed = now.date() if now.time() >= self.run_time else now.date() - datetime.timedelta(days=1)
+        return closed.isoformat()
+
+    def last_done(self) -> Optional[str]:
+        """Последний день, незавершённые задачи которого уже перенесены"""
+        return file_service.load_json(self.state_path).get("done_through")
+
+    def run(self, through: Optional[str] = None, dry_run: bool = False) -> CarryOverReport:
+        """Перенести незавершённые задачи всех ещё не обработанных закрытых дней по through"""
+        from services.diary_service import diary_service
+        from services.task_index_service import task_index_service
+
+        with self._lock:
+            through = through or self.closed_through()
+            if not Validators.validate_date_format(through):
+                raise DataValidationError(f"Неверный формат даты: {through}")
+            default_mode, rules = self._rules()
+
+            end = datetime.date.fromisoformat(through)
+            last = self.last_done()
+            if last:
+                start = max(datetime.date.fromisoformat(last) + datetime.timedelta(days=1),
+                            end - datetime.timedelta(days=int(config.carryover['catch_up_days']) - 1))
+            else:
+                # Первый запуск не трогает историю - только последний закрытый день
+                start = end
+            report = CarryOverReport()
+            if start > end:
+                return report
+            report.date_from, report.date_to = start.isoformat(), through
+            report.target = target = (end + datetime.timedelta(days=1)).isoformat()
+
+            plan = []
+            for location in task_index_service.find_tasks(report.date_from, through, unfinished=True):
+                mode, period = self._resolve(default_mode, rules, location.category, location.period)
+                if mode == "skip":
+                    report.skipped += 1
+                else:
+                    plan.append((location, mode, period))
+
+            if plan:
+                changed = self._apply(plan, target, report, diary_service)
+                if not dry_run:
+                    diary_service.save_batch(changed)
+            if not dry_run:
+                file_service.save_json(self.state_path, {"done_through": through})
+            return report
+
+    @staticmethod
+    def _apply(plan, target: str, report: CarryOverReport, diary_service) -> Dict[str, Day]:
+        """Применить план к дням в памяти; возвращает изменённые дни"""
+        days: Dict[str, Day] = {day_date: diary_service.load_day(day_date)
+                                for day_date in sorted({location.date for location, _, _ in plan})}
+        days[target] = (diary_service.load_day(target) if diary_service.day_exists(target)
+                        else diary_service.create_day(target))
+        tasks_by_id: Dict[Tuple[str, str], Task] = {
+            (day_date, task.id): task
+            for day_date, day_data in days.items() if day_date != target
+            for period in DAY_PERIODS for task in day_data.get_tasks_by_period(period)
+        }
+        # Уже перенесённое (по id или по ссылке на исходную задачу) повторно не переносим
+        carried = {key for period in DAY_PERIODS for task in days[target].get_tasks_by_period(period)
+                   for key in (task.id, task.origin) if key}
+
+        changed = {target}
+        for location, mode, period in plan:
+            task = tasks_by_id.get((location.date, location.task_id))
+            origin = (task.origin or task.id) if task else None
+            if task is None or task.id in carried or origin in carried:
+                report.skipped += 1
+                continue
+            carried.update((task.id, origin))
+
+            if mode == "move":
+                tasks = days[location.date].get_tasks_by_period(location.period)
+                tasks[:] = [other for other in tasks if other is not task]
+                days[target].add_task(period, task)
+                report.moved.append(task.id)
+                changed.add(location.date)
+            else:
+                copy = task.model_copy(update={"id": str(uuid.uuid4()), "origin": origin})
+                days[target].add_task(period, copy)
+                report.duplicated.append(copy.id)
+        return {day_date: days[day_date] for day_date in sorted(changed)}
+
+    # ---------- Фоновое выполнение ----------
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Запуск переноса по расписанию в фоновом потоке (повторный вызов ничего не делает)"""
+        if not config.carryover['enabled'] or self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="carryover", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _seconds_until_run(self, now: Optional[datetime.datetime] = None) -> float:
+        now = now or datetime.datetime.now()
+        try:
+            moment = datetime.datetime.combine(now.date(), self.run_time)
+        except DataValidationError:
+            return 3600.0
+        if moment <= now:
+            moment += datetime.timedelta(days=1)
+        # Раз в час проверяем заново: время в config.yaml могло измениться
+        return min((moment - now).total_seconds() + 1, 3600.0)
+
+    def _run(self) -> None:
+        # Первый проход сразу - догоняем дни, пока приложение было закрыто
+        while not self._stop_event.is_set():
+            try:
+                report = self.run()
+                if report.moved or report.duplicated:
+                    print(f"🔁 Перенос задач: {report.summary()}")
+            except Exception as e:
+                print(f"Ошибка переноса задач: {e}")
+            self._stop_event.wait(self._seconds_until_run())
+
+
+# Глобальный экземпляр сервиса
+carryover_service = CarryOverService()
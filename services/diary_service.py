@@ -1,30 +1,221 @@
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
+from core.config import config
 from core.exceptions import DayNotFoundError, DataValidationError, FileOperationError
-from core.constants import DIARY_DIR, TEMPLATE_DIR
+from core.instrumentation import instrument_class, instrumentation
+from core.constants import DAY_PERIODS, DIARY_DIR, TEMPLATE_DIR
 from core.validators import Validators
 from models.diary import Day, Task
 from services.file_service import file_service
+from services.json_codec import json_codec
 
+LAYOUTS = ["flat", "sharded"]
 
+
+@instrument_class("diary")
 class DiaryService:
     """Service for working with days"""
 
-    def __init__(self):
-        self.data_dir = DIARY_DIR
+    def __init__(self, data_dir: Optional[Path] = None):
+        self.data_dir = data_dir or DIARY_DIR
         self.template_dir = TEMPLATE_DIR
+        # Per-day lock stripes: a layout move never overwrites a concurrent save of the same day
+        self._layout_locks = [threading.Lock() for _ in range(64)]
         file_service.ensure_dir(self.data_dir)
+        self._replay_batches()
+
+    # ---------- File layout ----------
+
+    @property
+    def layout(self) -> str:
+        """Layout for new writes: "flat" (diary/DATE.json) or "sharded" (diary/YYYY/MM/DATE.json)"""
+        layout = config.diary['layout']
+        if layout not in LAYOUTS:
+            raise DataValidationError(f"Unknown diary layout: {layout}")
+        return layout
+
+    def _layout_lock(self, day_date: str) -> threading.Lock:
+        return self._layout_locks[hash(day_date) % len(self._layout_locks)]
+
+    def _layout_path(self, day_date: str, layout: str) -> Path:
+        if layout == "sharded":
+            return self.data_dir / day_date[:4] / day_date[5:7] / f"{day_date}.json"
+        return self.data_dir / f"{day_date}.json"
+
+    def _candidate_paths(self, day_date: str) -> List[Path]:
+        """Possible locations of the day file, the configured layout first"""
+        layout = self.layout
+        other = "flat" if layout == "sharded" else "sharded"
+        return [self._layout_path(day_date, layout), self._layout_path(day_date, other)]
+
+    def day_path(self, day_date: str) -> Path:
+        """Path of the existing day file in either layout, or where it would be written"""
+        candidates = self._candidate_paths(day_date)
+        for path in candidates:
+            if path.exists():
+                return path
+        return candidates[0]
+
+    def iter_day_files(self, date_from: Optional[str] = None,
+                       date_to: Optional[str] = None) -> List[Tuple[str, Path]]:
+        """(date, path) of loose day files in date order; both layouts are read.
+
+        Only year and month directories overlapping the range are listed.
+        If a day exists in both layouts (interrupted move), the configured one wins."""
+        month_from = date_from[:7] if date_from else None
+        month_to = date_to[:7] if date_to else None
+        preferred = self.layout
+        found: Dict[str, Tuple[str, Path]] = {}
+
+        def add(file_path: Path, layout: str) -> None:
+            day_date = file_path.stem
+            if not Validators.validate_date_format(day_date):
+                return
+            if (date_from and day_date < date_from) or (date_to and day_date > date_to):
+                return
+            if day_date not in found or layout == preferred:
+                found[day_date] = (layout, file_path)
+
+        if not self.data_dir.exists():
+            return []
+        try:
+            entries = sorted(os.scandir(self.data_dir), key=lambda entry: entry.name)
+        except OSError as e:
+            raise FileOperationError(f"Error reading directory {self.data_dir}: {e}")
+
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".json"):
+                add(Path(entry.path), "flat")
+            elif entry.is_dir() and len(entry.name) == 4 and entry.name.isdigit():
+                year = entry.name
+                if (month_from and year < month_from[:4]) or (month_to and year > month_to[:4]):
+                    continue
+                for month_dir in file_service.list_files(Path(entry.path), "[0-1][0-9]"):
+                    month = f"{year}-{month_dir.name}"
+                    if (month_from and month < month_from) or (month_to and month > month_to):
+                        continue
+                    for file_path in file_service.list_files(month_dir, "*.json"):
+                        add(file_path, "sharded")
+
+        return [(day_date, found[day_date][1]) for day_date in sorted(found)]
+
+    def listing_version(self, date_from: Optional[str] = None,
+                        date_to: Optional[str] = None) -> Tuple[int, int]:
+        """Version of the day listing: newest mtime of the directories that hold the range.
+
+        A directory mtime changes when files are added or removed in it, so
+        the root, the year and the month directories together cover any change."""
+        directories = [self.data_dir]
+        month_from = date_from[:7] if date_from else None
+        month_to = date_to[:7] if date_to else None
+        for year_dir in file_service.list_files(self.data_dir, "[0-9][0-9][0-9][0-9]"):
+            if (month_from and year_dir.name < month_from[:4]) or (month_to and year_dir.name > month_to[:4]):
+                continue
+            directories.append(year_dir)
+            for month_dir in file_service.list_files(year_dir, "[0-1][0-9]"):
+                month = f"{year_dir.name}-{month_dir.name}"
+                if not ((month_from and month < month_from) or (month_to and month > month_to)):
+                    directories.append(month_dir)
+
+        newest = 0
+        for directory in directories:
+            try:
+                newest = max(newest, directory.stat().st_mtime_ns)
+            except OSError:
+                continue
+        from services.archive_service import archive_service
+        return max(newest, archive_service.listing_version()[0]), len(directories)
+
+    def has_loose_file(self, day_date: str) -> bool:
+        """Whether the day is stored as a separate file (not only in a pack)"""
+        return any(path.exists() for path in self._candidate_paths(day_date))
+
+    def remove_loose_file(self, day_date: str, file_path: Path, version: Tuple[int, int]) -> bool:
+        """Remove a packed day file unless it was changed after (mtime, size) = version"""
+        with self._layout_lock(day_date):
+            try:
+                stat = file_path.stat()
+                if (stat.st_mtime_ns, stat.st_size) != version:
+                    return False
+                file_path.unlink()
+            except FileNotFoundError:
+                return False
+            self._remove_empty_dirs(file_path.parent)
+        return True
+
+    def migrate_layout(self, target: Optional[str] = None,
+                       progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Move day files into the target layout one by one; returns the number moved.
+
+        Safe while the app is running: every move is a single os.replace, reads
+        look in both layouts, and save_day takes the same lock as the move."""
+        target = target or self.layout
+        if target not in LAYOUTS:
+            raise DataValidationError(f"Unknown diary layout: {target}")
+
+        pending = [(day_date, path) for day_date, path in self._all_day_files()
+                   if path != self._layout_path(day_date, target)]
+        moved = 0
+        for index, (day_date, source) in enumerate(pending, 1):
+            destination = self._layout_path(day_date, target)
+            with self._layout_lock(day_date):
+                try:
+                    if destination.exists() and destination.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+                        # Newer copy is already in place - drop the stale one
+                        source.unlink()
+                    else:
+                        destination.parent.mkdir(parents=True, exist_ok=True)
+                        os.replace(source, destination)
+                        moved += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    raise FileOperationError(f"Error moving day {day_date}: {e}")
+                self._remove_empty_dirs(source.parent)
+            if progress:
+                progress(index, len(pending))
+        return moved
+
+    def _all_day_files(self) -> List[Tuple[str, Path]]:
+        """Every day file in both layouts, including duplicates of the same date"""
+        files = [(path.stem, path) for path in file_service.list_files(self.data_dir, "*.json")]
+        sharded = file_service.list_files(self.data_dir, "[0-9][0-9][0-9][0-9]/[0-1][0-9]/*.json")
+        files.extend((path.stem, path) for path in sharded)
+        return [(day_date, path) for day_date, path in files if Validators.validate_date_format(day_date)]
+
+    def _remove_empty_dirs(self, directory: Path) -> None:
+        """Remove empty month and year directories left after a move"""
+        while directory != self.data_dir and self.data_dir in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
+
+    # ---------- Days ----------
 
     def load_day(self, day_date: str) -> Day:
         """Load day by date"""
-        day_file = self.data_dir / f"{day_date}.json"
-
-        if not day_file.exists():
-            raise DayNotFoundError(f"Day {day_date} not found")
+        day_file = self.day_path(day_date)
 
         try:
-            data = file_service.load_json(day_file)
-            return Day(**data)  # Pydantic сам разберется с alias
+            if day_file.exists():
+                data = file_service.load_json(day_file)
+            else:
+                # Closed periods may be packed; edits are saved to a loose file again
+                from services.archive_service import archive_service
+                raw = archive_service.read_day(day_date)
+                if raw is None:
+                    raise DayNotFoundError(f"Day {day_date} not found")
+                data = json_codec.loads(raw)
+            with instrumentation.timed("diary.validate_day", stage="validation"):
+                return Day(**data)  # Pydantic сам разберется с alias
+        except DayNotFoundError:
+            raise
         except Exception as e:
             raise FileOperationError(f"Error loading day {day_date}: {e}")
 
@@ -32,13 +223,174 @@ class DiaryService:
         """Save day"""
         try:
             Validators.validate_date_format(day_date)
-            day_file = self.data_dir / f"{day_date}.json"
-            file_service.save_json(day_file, day_data.model_dump(by_alias=True))
+            day_file, stale_file = self._candidate_paths(day_date)
+            with self._layout_lock(day_date):
+                file_service.save_json(day_file, day_data.model_dump(by_alias=True))
+                # The day is moved to the configured layout on its next save
+                if stale_file.exists():
+                    stale_file.unlink()
+                    self._remove_empty_dirs(stale_file.parent)
         except DataValidationError:
             raise
         except Exception as e:
             raise FileOperationError(f"Error saving day {day_date}: {e}")
 
+        self._after_save(day_date, day_data)
+
+    def save_days(self, days: Dict[str, Day], max_workers: Optional[int] = None) -> None:
+        """Save several days in parallel (each file is written atomically)"""
+        if not days:
+            return
+
+        def save_one(item):
+            day_date, day_data = item
+            try:
+                self.save_day(day_date, day_data)
+                return None
+            except Exception as e:
+                return f"{day_date}: {e}"
+
+        with ThreadPoolExecutor(max_workers=max_workers or min(8, len(days))) as executor:
+            failures = [error for error in executor.map(save_one, days.items()) if error]
+
+        if failures:
+            raise FileOperationError(f"Error saving {len(failures)} day(s): " + "; ".join(failures[:5]))
+
+    @staticmethod
+    def _derived_indexes() -> List:
+        """Indexes built from day files; each has index_day and remove_day"""
+        from services.habit_service import habit_service
+        from services.search_service import search_service
+        from services.summary_service import summary_service
+        from services.task_index_service import task_index_service
+        return [search_service, task_index_service, habit_service, summary_service]
+
+    def _after_save(self, day_date: str, day_data: Day) -> None:
+        """Update derived indexes after the day is saved"""
+        for index in self._derived_indexes():
+            try:
+                index.index_day(day_date, day_data)
+            except Exception as e:
+                print(f"Error indexing day {day_date} in {type(index).__name__}: {e}")
+
+    def reindex_day(self, day_date: str) -> None:
+        """Refresh derived indexes from disk after the day file was written bypassing save_day"""
+        if not self.day_exists(day_date):
+            for index in self._derived_indexes():
+                try:
+                    index.remove_day(day_date)
+                except Exception as e:
+                    print(f"Error removing day {day_date} from {type(index).__name__}: {e}")
+            return
+        self._after_save(day_date, self.load_day(day_date))
+
+    def rebuild_indexes(self) -> None:
+        """Rebuild every derived index from the files on disk"""
+        for index in self._derived_indexes():
+            try:
+                index.rebuild()
+            except Exception as e:
+                print(f"Error rebuilding {type(index).__name__}: {e}")
+
+    # ---------- Batches of days ----------
+
+    def save_batch(self, days: Dict[str, Day]) -> None:
+        """Save several days as one unit.
+
+        The new contents are written to a journal first; once it is on disk the
+        batch counts as committed, and a batch interrupted midway is finished
+        from the journal on the next start."""
+        journal = self.data_dir / f".batch-{uuid.uuid4().hex}.json"
+        file_service.save_bytes(journal, json_codec.dumps_compact(
+            {day_date: day_data.model_dump(by_alias=True) for day_date, day_data in days.items()}))
+        try:
+            for day_date, day_data in days.items():
+                self.save_day(day_date, day_data)
+        except Exception as e:
+            raise FileOperationError(f"Batch of {len(days)} day(s) interrupted, "
+                                     f"it will be completed on the next start: {e}")
+        journal.unlink(missing_ok=True)
+
+    def _replay_batches(self) -> None:
+        """Finish batches left unfinished by a stopped process"""
+        journals = sorted(self.data_dir.glob(".batch-*.json"), key=lambda path: path.stat().st_mtime_ns)
+        for journal in journals:
+            try:
+                for day_date, data in json_codec.loads(journal.read_bytes()).items():
+                    self.save_day(day_date, Day(**data))
+                journal.unlink()
+            except Exception as e:
+                print(f"Error replaying day batch {journal.name}: {e}")
+
+    # ---------- Moving tasks ----------
+
+    def move_task(self, task_id: str, target_date: str, target_period: Optional[str] = None) -> bool:
+        """Move a task to another day (and period); both day files change as one unit"""
+        return bool(self.reschedule_tasks([task_id], target_date, target_period))
+
+    def reschedule_tasks(self, task_ids: List[str], target_date: str,
+                         target_period: Optional[str] = None) -> List[str]:
+        """Move tasks from any days to target_date in one pass; returns the ids moved.
+
+        Locations come from the task index, every affected day is loaded once
+        and all of them are saved as one batch. Tasks keep their ids; without
+        target_period a task stays in its own period."""
+        from services.task_index_service import task_index_service
+
+        if not Validators.validate_date_format(target_date):
+            raise DataValidationError(f"Invalid date format: {target_date}")
+        if target_period is not None and target_period not in DAY_PERIODS:
+            raise DataValidationError(f"Unknown period: {target_period}")
+
+        located = task_index_service.locate_many(task_ids)
+        missing = [task_id for task_id in task_ids if task_id not in located]
+        if missing:
+            raise DataValidationError(f"Task not found: {missing[0]}")
+        moves = [located[task_id] for task_id in dict.fromkeys(task_ids)
+                 if located[task_id].date != target_date
+                 or (target_period is not None and located[task_id].period != target_period)]
+        if not moves:
+            return []
+
+        dates = sorted({move.date for move in moves} | {target_date})
+        days = {day_date: self.load_day(day_date) if self.day_exists(day_date) else self.create_day(day_date)
+                for day_date in dates}
+
+        taken: Dict[str, Tuple[str, Task]] = {}
+        for day_date in {move.date for move in moves}:
+            wanted = {move.task_id for move in moves if move.date == day_date}
+            for period in DAY_PERIODS:
+                tasks = days[day_date].get_tasks_by_period(period)
+                remaining = []
+                for task in tasks:
+                    if task.id in wanted and task.id not in taken:
+                        taken[task.id] = (period, task)
+                    else:
+                        remaining.append(task)
+                tasks[:] = remaining
+
+        stale = [move for move in moves if move.task_id not in taken]
+        if stale:
+            # The index lags behind the file (edited while the app was closed)
+            for day_date in {move.date for move in stale}:
+                task_index_service.index_day(day_date, self.load_day(day_date))
+            raise DataValidationError(f"Task {stale[0].task_id} is no longer in day {stale[0].date}, "
+                                      f"the task index has been refreshed")
+
+        for move in moves:
+            period, task = taken[move.task_id]
+            days[target_date].add_task(target_period or period, task)
+        self.save_batch(days)
+        return [move.task_id for move in moves]
+
+    def reschedule_unfinished(self, date_from: str, date_to: str, target_date: str,
+                              target_period: Optional[str] = None) -> List[str]:
+        """Move every unfinished task of a date range to target_date"""
+        from services.task_index_service import task_index_service
+
+        found = task_index_service.find_tasks(date_from, date_to, unfinished=True)
+        return self.reschedule_tasks([location.task_id for location in found], target_date, target_period)
+
     def create_day(self, day_date: str, template_name: Optional[str] = None) -> Day:
         """Create new day"""
         try:
@@ -62,24 +414,135 @@ class DiaryService:
         except Exception as e:
             raise FileOperationError(f"Error creating day {day_date}: {e}")
 
+    def create_days(self, dates: List[str], template_name: Optional[str] = None) -> Dict[str, Day]:
+        """Create several days at once (the template is compiled only once)"""
+        return {day_date: self.create_day(day_date, template_name) for day_date in dates}
+
+    def create_month(self, year: int, month: int, template_name: Optional[str] = None,
+                     overwrite: bool = False) -> List[str]:
+        """Create and save every day of a month in one batch; returns created dates"""
+        import calendar
+
+        _, days_in_month = calendar.monthrange(year, month)
+        dates = [f"{year:04d}-{month:02d}-{day:02d}" for day in range(1, days_in_month + 1)]
+        if not overwrite:
+            dates = [day_date for day_date in dates if not self.day_exists(day_date)]
+
+        self.save_days(self.create_days(dates, template_name))
+        return dates
+
+    def delete_day(self, day_date: str) -> None:
+        """Delete the day; packed days have to be unpacked first.
+
+        A loose file of a packed day only shadows the pack record, so deleting
+        just the file would bring the packed version back."""
+        from services.archive_service import archive_service
+
+        if archive_service.contains(day_date):
+            raise FileOperationError(f"Day {day_date} is packed, unpack its period first")
+        self.delete_day_files(day_date)
+
+        for index in self._derived_indexes():
+            try:
+                index.remove_day(day_date)
+            except Exception as e:
+                print(f"Error removing day {day_date} from {type(index).__name__}: {e}")
+
+    def delete_day_files(self, day_date: str) -> None:
+        """Delete loose files of the day in every layout without touching packs or indexes"""
+        try:
+            with self._layout_lock(day_date):
+                for path in self._candidate_paths(day_date):
+                    if path.exists():
+                        path.unlink()
+                        self._remove_empty_dirs(path.parent)
+        except OSError as e:
+            raise FileOperationError(f"Error deleting day {day_date}: {e}")
+
     def day_exists(self, day_date: str) -> bool:
         """Check if day exists"""
-        day_file = self.data_dir / f"{day_date}.json"
-        return day_file.exists()
+        if self.has_loose_file(day_date):
+            return True
+        from services.archive_service import archive_service
+        return archive_service.contains(day_date)
+
+    def day_version(self, day_date: str) -> Optional[Tuple[int, int]]:
+        """On-disk version of the day file (mtime, size); None if it does not exist"""
+        try:
+            stat = self.day_path(day_date).stat()
+        except OSError:
+            from services.archive_service import archive_service
+            return archive_service.day_version(day_date)
+        return stat.st_mtime_ns, stat.st_size
+
+    def day_versions(self, date_from: Optional[str] = None,
+                     date_to: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+        """Versions of every day as day_version reports them, without reading any day"""
+        from services.archive_service import archive_service
+
+        versions = archive_service.day_versions(date_from, date_to)
+        for day_date, path in self.iter_day_files(date_from, date_to):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            versions[day_date] = (stat.st_mtime_ns, stat.st_size)
+        return versions
 
-    def list_days(self) -> List[str]:
-        """List all days"""
-        files = file_service.list_files(self.data_dir, "*.json")
-        return sorted([f.stem for f in files], reverse=True)
+    def changed_days(self, indexed: Dict[str, Tuple[int, int]]) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+        """Compare versions an index was built from with the files on disk.
+
+        Returns the days added or changed since (with their current versions)
+        and the days that no longer exist. Used by derived indexes on start to
+        catch up with edits made while the app was closed."""
+        current = self.day_versions()
+        changed = {day_date: version for day_date, version in current.items()
+                   if indexed.get(day_date) != version}
+        removed = sorted(day_date for day_date in indexed if day_date not in current)
+        return changed, removed
+
+    def catch_up_index(self, index, indexed: Dict[str, Tuple[int, int]]) -> int:
+        """Re-index the days changed since the versions a derived index was built from.
+
+        index needs index_day(date, day, version) and remove_day(date);
+        returns the number of days re-indexed or removed."""
+        changed, removed = self.changed_days(indexed)
+        for day_date in removed:
+            index.remove_day(day_date)
+        for day_date, version in changed.items():
+            try:
+                index.index_day(day_date, self.load_day(day_date), version)
+            except Exception as e:
+                print(f"Error indexing day {day_date} in {type(index).__name__}: {e}")
+        return len(changed) + len(removed)
+
+    def list_days(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[str]:
+        """List days (newest first), optionally limited to a date range; packed days included"""
+        from services.archive_service import archive_service
+
+        days = {day_date for day_date, _ in self.iter_day_files(date_from, date_to)}
+        days.update(archive_service.list_days(date_from, date_to))
+        return sorted(days, reverse=True)
+
+    def load_compact_history(self, date_from: Optional[str] = None,
+                             date_to: Optional[str] = None) -> "CompactHistory":
+        """Load days into a compact read-only history; full models are dropped after packing"""
+        from models.compact import CompactHistory
+
+        history = CompactHistory()
+        for day_date in sorted(self.list_days(date_from, date_to)):
+            history.add_day(day_date, self.load_day(day_date))
+        return history
 
     def copy_day(self, source_date: str, target_date: str) -> None:
         """Copy day"""
         try:
             source_day = self.load_day(source_date)
 
-            # Reset progress for tasks
+            # Reset progress for tasks; copies get their own ids
             for period in [source_day.morning, source_day.day, source_day.evening]:
                 for task in period:
+                    task.id = str(uuid.uuid4())
                     task.progress = 0
                     task.status = "☐"
 
@@ -95,38 +558,10 @@ class DiaryService:
 
     def _create_from_template(self, day_date: str, template_name: str) -> Day:
         """Create day from template"""
-        template_file = self.template_dir / f"{template_name}.json"
-
-        if not template_file.exists():
-            raise FileOperationError(f"Template {template_name} not found")
+        from services.template_service import template_service
 
         try:
-            template_data = file_service.load_json(template_file)
-
-            # Заменяем плейсхолдеры в шаблоне
-            import uuid
-            import json
-
-            # Рекурсивно обходим данные и заменяем плейсхолдеры
-            def replace_placeholders(obj):
-                if isinstance(obj, dict):
-                    return {key: replace_placeholders(value) for key, value in obj.items()}
-                elif isinstance(obj, list):
-                    return [replace_placeholders(item) for item in obj]
-                elif isinstance(obj, str):
-                    # Заменяем {{дата}} на актуальную дату
-                    if "{{дата}}" in obj:
-                        obj = obj.replace("{{дата}}", day_date)
-                    # Заменяем {{uuid}} на реальные UUID
-                    if "{{uuid}}" in obj:
-                        obj = obj.replace("{{uuid}}", str(uuid.uuid4()))
-                    return obj
-                else:
-                    return obj
-
-            processed_data = replace_placeholders(template_data)
-            return Day(**processed_data)
-
+            return template_service.instantiate_day(template_name, day_date)
         except Exception as e:
             raise FileOperationError(f"Error loading template {template_name}: {e}")
 
@@ -0,0 +1,154 @@
+import csv
+import io
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from core.constants import DAY_PERIODS
+from core.exceptions import DataValidationError, FileOperationError
+from core.validators import Validators
+from models.diary import Day
+from services.json_codec import json_codec
+
+EXPORT_FORMATS = ["csv", "jsonl", "parquet"]
+RECORD_TYPES = ["task", "state", "note"]
+EXPORT_FIELDS = [
+    "date", "record_type", "period", "task_id", "task", "time", "status", "progress",
+    "category", "state_category", "value", "value_type", "note"
+]
+
+
+class ExportService:
+    """Потоковый экспорт истории дней"""
+
+    def __init__(self, parquet_batch_size: int = 10000):
+        self.parquet_batch_size = parquet_batch_size
+
+    def iter_days(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Iterator[Tuple[str, Day]]:
+        """Чтение дней по одному в хронологическом порядке"""
+        from services.diary_service import diary_service
+
+        for day_date in sorted(diary_service.list_days(date_from, date_to)):
+            try:
+                yield day_date, diary_service.load_day(day_date)
+            except Exception as e:
+                print(f"Ошибка чтения дня {day_date} при экспорте: {e}")
+
+    @staticmethod
+    def _empty_record(day_date: str, record_type: str) -> Dict[str, Any]:
+        record = dict.fromkeys(EXPORT_FIELDS, "")
+        record["date"] = day_date
+        record["record_type"] = record_type
+        record["progress"] = None
+        return record
+
+    def iter_records(self, days: Iterable[Tuple[str, Day]], categories: Optional[List[str]] = None,
+                     record_types: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Разворачивание дней в плоские записи задач, состояния и заметок"""
+        record_types = record_types or RECORD_TYPES
+        category_filter = set(categories) if categories else None
+
+        for day_date, day_data in days:
+            if "task" in record_types:
+                for period in DAY_PERIODS:
+                    for task in day_data.get_tasks_by_period(period):
+                        if category_filter and task.category not in category_filter:
+                            continue
+                        record = self._empty_record(day_date, "task")
+                        record.update(period=period, task_id=task.id, task=task.task, time=task.time,
+                                      status=task.status, progress=task.progress, category=task.category)
+                        yield record
+
+            if "state" in record_types:
+                for state_value in day_data.state.values:
+                    record = self._empty_record(day_date, "state")
+                    record.update(state_category=state_value.category, value=state_value.value,
+                                  value_type=state_value.value_type)
+                    yield record
+
+            if "note" in record_types:
+                for note in day_data.notes:
+                    record = self._empty_record(day_date, "note")
+                    record["note"] = note
+                    yield record
+
+    @staticmethod
+    def write_csv(records: Iterable[Dict[str, Any]], stream: BinaryIO) -> int:
+        """Запись CSV (UTF-8 с BOM для корректного открытия в Excel)"""
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        try:
+            writer = csv.DictWriter(text_stream, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            count = 0
+            for record in records:
+                writer.writerow(record)
+                count += 1
+            text_stream.flush()
+            return count
+        finally:
+            text_stream.detach()
+
+    @staticmethod
+    def write_jsonl(records: Iterable[Dict[str, Any]], stream: BinaryIO) -> int:
+        """Запись JSON Lines"""
+        count = 0
+        for record in records:
+            stream.write(json_codec.dumps_compact(record))
+            stream.write(b"\n")
+            count += 1
+        return count
+
+    def write_parquet(self, records: Iterable[Dict[str, Any]], stream: BinaryIO) -> int:
+        """Запись Parquet пакетами (нужен pyarrow)"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise FileOperationError("Для экспорта в Parquet установите pyarrow: pip install pyarrow")
+
+        schema = pa.schema([
+            (field, pa.int8() if field == "progress" else pa.string()) for field in EXPORT_FIELDS
+        ])
+        count = 0
+        with pq.ParquetWriter(stream, schema, compression="zstd") as writer:
+            batch: List[Dict[str, Any]] = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.parquet_batch_size:
+                    writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                    count += len(batch)
+                    batch = []
+            if batch:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+        return count
+
+    def export(self, export_format: str, stream: BinaryIO, date_from: Optional[str] = None,
+               date_to: Optional[str] = None, categories: Optional[List[str]] = None,
+               record_types: Optional[List[str]] = None) -> int:
+        """Экспорт в поток: чтение → разворачивание → запись; возвращает число записей"""
+        if export_format not in EXPORT_FORMATS:
+            raise DataValidationError(f"Неизвестный формат экспорта: {export_format}")
+        for day_date in (date_from, date_to):
+            if day_date and not Validators.validate_date_format(day_date):
+                raise DataValidationError(f"Неверный формат даты: {day_date}")
+
+        records = self.iter_records(self.iter_days(date_from, date_to), categories, record_types)
+        if export_format == "csv":
+            return self.write_csv(records, stream)
+        if export_format == "jsonl":
+            return self.write_jsonl(records, stream)
+        return self.write_parquet(records, stream)
+
+    def export_to_file(self, export_format: str, output_path: Path, **filters) -> int:
+        """Экспорт в файл"""
+        try:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, "wb") as stream:
+                return self.export(export_format, stream, **filters)
+        except (DataValidationError, FileOperationError):
+            raise
+        except Exception as e:
+            raise FileOperationError(f"Ошибка экспорта в {output_path}: {e}")
+
+
+# Глобальный экземпляр сервиса
+export_service = ExportService()
@@ -1,8 +1,12 @@
 import json
+import os
 import shutil
+import uuid
 from pathlib import Path
-from typing import Any, Dict, Optional, List  # ⬅️ ДОБАВЬТЕ List здесь
+from typing import Any, Callable, Dict, Optional, List, Tuple  # ⬅️ ДОБАВЬТЕ List здесь
 from core.exceptions import FileOperationError, DataValidationError
+from core.instrumentation import instrumentation, instrumented
+from services.json_codec import json_codec
 from core.validators import Validators
 
 
@@ -11,36 +15,78 @@ class FileService:
 
     def __init__(self):
         self.encoding = "utf-8"
+        self._write_listeners: List[Callable[[Path, Tuple[int, int]], None]] = []
 
+    def add_write_listener(self, listener: Callable[[Path, Tuple[int, int]], None]) -> None:
+        """Подписка на запись файлов самим приложением.
+
+        Слушатель получает путь и ожидаемую подпись файла (mtime_ns, size)
+        ещё до переименования, то есть раньше любых событий о нём."""
+        if listener not in self._write_listeners:
+            self._write_listeners.append(listener)
+
+    def _notify_written(self, file_path: Path, signature: Tuple[int, int]) -> None:
+        """Уведомить подписчиков о записи файла"""
+        for listener in self._write_listeners:
+            try:
+                listener(file_path, signature)
+            except Exception as e:
+                print(f"Ошибка обработчика записи файла {file_path}: {e}")
+
+    @instrumented("file.load_json", stage="io")
     def load_json(self, file_path: Path) -> Dict[str, Any]:
         """Загрузка JSON файла с обработкой ошибок"""
         try:
             if not file_path.exists():
                 return {}
 
-            content = file_path.read_text(encoding=self.encoding).strip()
-            if not content:
-                return {}
-
-            return json.loads(content)
+            raw = file_path.read_bytes()
+            instrumentation.add_bytes("file.load_json", "read", len(raw))
+            return json_codec.loads(raw)
         except json.JSONDecodeError as e:
             raise FileOperationError(f"Ошибка парсинга JSON в файле {file_path}: {e}")
         except Exception as e:
             raise FileOperationError(f"Ошибка чтения файла {file_path}: {e}")
 
+    @instrumented("file.save_json", stage="io")
     def save_json(self, file_path: Path, data: Dict[str, Any]) -> None:
         """Сохранение данных в JSON файл"""
         try:
             # Создаем директорию если не существует
             file_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Сохраняем с красивым форматированием
-            json_str = json.dumps(data, ensure_ascii=False, indent=2)
-            file_path.write_text(json_str, encoding=self.encoding)
+            # Формат записи (отступы, бэкенд) задаёт json_codec
+            content = json_codec.dumps(data)
+            self._write_atomic(file_path, content)
+            instrumentation.add_bytes("file.save_json", "written", len(content))
+
+        except Exception as e:
+            raise FileOperationError(f"Ошибка сохранения файла {file_path}: {e}")
 
+    @instrumented("file.save_bytes", stage="io")
+    def save_bytes(self, file_path: Path, content: bytes) -> None:
+        """Атомарная запись двоичного файла"""
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(file_path, content)
+            instrumentation.add_bytes("file.save_bytes", "written", len(content))
         except Exception as e:
             raise FileOperationError(f"Ошибка сохранения файла {file_path}: {e}")
 
+    def _write_atomic(self, file_path: Path, content: bytes) -> None:
+        """Запись через временный файл и атомарное переименование"""
+        temp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            temp_path.write_bytes(content)
+            # Переименование сохраняет mtime и размер: подпись известна заранее,
+            # и событие о замене файла уже застанет её записанной
+            stat = temp_path.stat()
+            self._notify_written(file_path, (stat.st_mtime_ns, stat.st_size))
+            os.replace(temp_path, file_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
     def copy_template(self, template_path: Path, target_path: Path) -> None:
         """Копирование шаблона"""
         try:
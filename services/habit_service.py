@@ -0,0 +1,364 @@
+import datetime
+import re
+import sqlite3
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from core.config import config
+from core.exceptions import FileOperationError
+from core.constants import DAY_PERIODS
+from models.diary import Day
+from services.search_service import INDEX_DIR
+from services.watcher_service import FileChange, watcher_service
+
+SCHEMA_VERSION = "2"
+# Бит 0 - 1970-01-01; более ранние даты в привычки не попадают
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def habit_key(task_name: str) -> str:
+    """Ключ привычки: слова названия в нижнем регистре без эмодзи и знаков.
+
+    "🧘 Медитация" и "медитация!" дают один ключ "медитация"."""
+    text = unicodedata.normalize("NFKC", task_name or "").lower().replace("ё", "е")
+    words = _WORD_RE.findall(text)
+    return " ".join(words) if words else text.strip()
+
+
+def _offset(day_date: str) -> int:
+    return datetime.date.fromisoformat(day_date).toordinal() - EPOCH
+
+
+def _date(offset: int) -> str:
+    return datetime.date.fromordinal(offset + EPOCH).isoformat()
+
+
+def _run_ending_at(bits: int, offset: int) -> int:
+    """Длина серии единичных битов, заканчивающейся на offset"""
+    if offset < 0:
+        return 0
+    gaps = ~bits & ((1 << (offset + 1)) - 1)
+    return offset + 1 - gaps.bit_length()
+
+
+def _longest_run(bits: int) -> int:
+    """Самая длинная серия единичных битов (число сдвигов = длина серии)"""
+    length = 0
+    while bits:
+        bits &= bits >> 1
+        length += 1
+    return length
+
+
+@dataclass
+class _Habit:
+    name: str
+    planned: int = 0  # бит дня: задача была в дне
+    done: int = 0  # бит дня: задача выполнена
+    longest: int = 0
+
+
+class HabitStats(NamedTuple):
+    """Показатели привычки на дату"""
+    key: str
+    name: str
+    days_planned: int
+    days_done: int
+    current_streak: int
+    longest_streak: int
+    rate: float  # доля выполненных среди запланированных дней окна
+    window_done: int
+    window_planned: int
+    last_done: Optional[str]
+
+
+class HabitService:
+    """Индекс привычек: повторяющиеся задачи по нормализованному названию.
+
+    Для каждой привычки хранятся два битовых множества по датам (задача
+    была в дне / выполнена), поэтому серии и доля выполнения считаются
+    несколькими операциями над целыми числами без чтения файлов дней.
+    Индекс обновляется при каждом сохранении дня."""
+
+    def __init__(self, index_path: Optional[Path] = None):
+        self.index_path = index_path or INDEX_DIR / "habits.sqlite3"
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._habits: Optional[Dict[str, _Habit]] = None
+        # Сверка с файлами на диске выполняется один раз за процесс
+        self._reconciled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открыть базу индекса и создать схему при необходимости"""
+        if self._conn is not None:
+            return self._conn
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка открытия индекса привычек {self.index_path}: {e}")
+
+        self._conn = conn
+        return conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection, drop: bool = False) -> None:
+        """Создать таблицы индекса; drop - пересоздать их (схема могла измениться)"""
+        if drop:
+            conn.executescript("""
+                DROP TABLE IF EXISTS habits;
+                DROP TABLE IF EXISTS day_habits;
+                DROP TABLE IF EXISTS versions;
+            """)
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS habits (
+                key TEXT PRIMARY KEY, name TEXT, planned BLOB, done BLOB, longest INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS day_habits (
+                date TEXT, key TEXT, done INTEGER, PRIMARY KEY (date, key)
+            );
+            CREATE TABLE IF NOT EXISTS versions (date TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+        """)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._connect().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _versions(self) -> Dict[str, Tuple[int, int]]:
+        """Версии файлов (mtime, size), по которым проиндексированы дни"""
+        rows = self._connect().execute("SELECT date, mtime_ns, size FROM versions")
+        return {day_date: (mtime_ns, size) for day_date, mtime_ns, size in rows}
+
+    @staticmethod
+    def _set_version(conn: sqlite3.Connection, day_date: str, version: Optional[Tuple[int, int]]) -> None:
+        if version is None:
+            conn.execute("DELETE FROM versions WHERE date = ?", (day_date,))
+        else:
+            conn.execute("INSERT OR REPLACE INTO versions VALUES (?, ?, ?)", (day_date, *version))
+
+    @staticmethod
+    def _to_blob(bits: int) -> bytes:
+        return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+    def _loaded(self) -> Dict[str, _Habit]:
+        """Битовые множества всех привычек в памяти (читаются из базы один раз)"""
+        if self._habits is None:
+            rows = self._connect().execute("SELECT key, name, planned, done, longest FROM habits")
+            self._habits = {key: _Habit(name, int.from_bytes(planned, "little"), int.from_bytes(done, "little"),
+                                        longest)
+                            for key, name, planned, done, longest in rows}
+        return self._habits
+
+    def _store(self, conn: sqlite3.Connection, key: str, habit: _Habit) -> None:
+        if habit.planned:
+            conn.execute("INSERT OR REPLACE INTO habits VALUES (?, ?, ?, ?, ?)",
+                         (key, habit.name, self._to_blob(habit.planned), self._to_blob(habit.done), habit.longest))
+        else:
+            conn.execute("DELETE FROM habits WHERE key = ?", (key,))
+            self._loaded().pop(key, None)
+
+    # ---------- Обновление индекса ----------
+
+    @staticmethod
+    def _day_entries(day_data: Day) -> Dict[str, Tuple[str, bool]]:
+        """Привычки дня: ключ -> (название, выполнена ли хоть одна такая задача)"""
+        entries: Dict[str, Tuple[str, bool]] = {}
+        for period in DAY_PERIODS:
+            for task in day_data.get_tasks_by_period(period):
+                key = habit_key(task.task)
+                if not key:
+                    continue
+                done = task.status == "✅" or task.progress >= 100
+                previous = entries.get(key)
+                entries[key] = (task.task, done or (previous is not None and previous[1]))
+        return entries
+
+    def _replace_day(self, conn: sqlite3.Connection, day_date: str,
+                     entries: Dict[str, Tuple[str, bool]]) -> None:
+        offset = _offset(day_date)
+        if offset < 0:
+            return
+        old = {key for (key,) in conn.execute("SELECT key FROM day_habits WHERE date = ?", (day_date,))}
+        conn.execute("DELETE FROM day_habits WHERE date = ?", (day_date,))
+        conn.executemany("INSERT INTO day_habits VALUES (?, ?, ?)",
+                         [(day_date, key, int(done)) for key, (_, done) in entries.items()])
+
+        habits = self._loaded()
+        bit = 1 << offset
+        for key in old | set(entries):
+            habit = habits.get(key)
+            if habit is None:
+                habit = habits[key] = _Habit(entries[key][0])
+            if key in entries:
+                name, done = entries[key]
+                # Название показываем по самому позднему дню
+                if offset >= habit.planned.bit_length() - 1:
+                    habit.name = name
+                habit.planned |= bit
+                habit.done = habit.done | bit if done else habit.done & ~bit
+            else:
+                habit.planned &= ~bit
+                habit.done &= ~bit
+            habit.longest = _longest_run(habit.done)
+            self._store(conn, key, habit)
+
+    def index_day(self, day_date: str, day_data: Day, version: Optional[Tuple[int, int]] = None) -> None:
+        """Обновить привычки по одному дню; version - версия файла, из которого прочитан день"""
+        if version is None:
+            from services.diary_service import diary_service
+            version = diary_service.day_version(day_date)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_day(conn, day_date, self._day_entries(day_data))
+                self._set_version(conn, day_date, version)
+
+    def remove_day(self, day_date: str) -> None:
+        """Убрать день из привычек"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_day(conn, day_date, {})
+                self._set_version(conn, day_date, None)
+
+    def rebuild(self) -> int:
+        """Полная перестройка индекса по всем дням"""
+        from services.diary_service import diary_service
+
+        habits: Dict[str, _Habit] = {}
+        day_rows = []
+        versions = sorted(diary_service.day_versions().items())
+        for day_date, _ in versions:
+            offset = _offset(day_date)
+            if offset < 0:
+                continue
+            try:
+                entries = self._day_entries(diary_service.load_day(day_date))
+            except Exception as e:
+                print(f"Ошибка индексации привычек дня {day_date}: {e}")
+                continue
+            for key, (name, done) in entries.items():
+                habit = habits.setdefault(key, _Habit(name))
+                habit.name = name
+                habit.planned |= 1 << offset
+                if done:
+                    habit.done |= 1 << offset
+                day_rows.append((day_date, key, int(done)))
+
+        with self._lock:
+            conn = self._connect()
+            self._create_schema(conn, drop=True)
+            with conn:
+                conn.executemany("INSERT INTO day_habits VALUES (?, ?, ?)", day_rows)
+                conn.executemany("INSERT INTO versions VALUES (?, ?, ?)",
+                                 [(day_date, *version) for day_date, version in versions])
+                self._habits = habits
+                for key, habit in habits.items():
+                    habit.longest = _longest_run(habit.done)
+                    self._store(conn, key, habit)
+                self._set_meta("schema_version", SCHEMA_VERSION)
+            self._reconciled = True
+        return len(habits)
+
+    def reconcile(self) -> int:
+        """Догнать файлы дней, изменённые, пока приложение было закрыто; возвращает число дней"""
+        from services.diary_service import diary_service
+
+        with self._lock:
+            count = diary_service.catch_up_index(self, self._versions())
+            self._reconciled = True
+        return count
+
+    def ensure_built(self) -> None:
+        """Построить индекс при первом использовании, при первом обращении в процессе - сверить с файлами"""
+        with self._lock:
+            if self._get_meta("schema_version") != SCHEMA_VERSION:
+                self.rebuild()
+            elif not self._reconciled:
+                self.reconcile()
+
+    def handle_change(self, change: FileChange) -> None:
+        """Обновление индекса при внешнем изменении файлов дней"""
+        if change.kind != "day":
+            return
+        from services.diary_service import diary_service
+        if change.key == "*":
+            self.rebuild()
+        elif change.deleted or not diary_service.day_exists(change.key):
+            self.remove_day(change.key)
+        else:
+            self.index_day(change.key, diary_service.load_day(change.key))
+
+    # ---------- Показатели ----------
+
+    @staticmethod
+    def _stats(key: str, habit: _Habit, today: int, window: int) -> HabitStats:
+        # Невыполненная пока сегодняшняя задача серию не прерывает
+        current = _run_ending_at(habit.done, today) or _run_ending_at(habit.done, today - 1)
+        start = max(today - window + 1, 0)
+        mask = ((1 << (today + 1)) - 1) ^ ((1 << start) - 1)
+        window_done = (habit.done & mask).bit_count()
+        window_planned = (habit.planned & mask).bit_count()
+        return HabitStats(
+            key=key,
+            name=habit.name,
+            days_planned=habit.planned.bit_count(),
+            days_done=habit.done.bit_count(),
+            current_streak=current,
+            longest_streak=habit.longest,
+            rate=window_done / window_planned if window_planned else 0.0,
+            window_done=window_done,
+            window_planned=window_planned,
+            last_done=_date(habit.done.bit_length() - 1) if habit.done else None,
+        )
+
+    def get_stats(self, task_name: str, today: Optional[str] = None,
+                  window: Optional[int] = None) -> Optional[HabitStats]:
+        """Показатели привычки по названию задачи (в любом написании)"""
+        key = habit_key(task_name)
+        with self._lock:
+            self.ensure_built()
+            habit = self._loaded().get(key)
+            if habit is None:
+                return None
+            today_offset = _offset(today or datetime.date.today().isoformat())
+            return self._stats(key, habit, today_offset, window or int(config.habits['window']))
+
+    def list_habits(self, today: Optional[str] = None, window: Optional[int] = None,
+                    min_days: Optional[int] = None) -> List[HabitStats]:
+        """Привычки, встречавшиеся не меньше min_days дней: сначала текущие серии"""
+        window = window or int(config.habits['window'])
+        min_days = int(config.habits['min_days']) if min_days is None else min_days
+        today_offset = _offset(today or datetime.date.today().isoformat())
+        with self._lock:
+            self.ensure_built()
+            stats = [self._stats(key, habit, today_offset, window)
+                     for key, habit in self._loaded().items() if habit.planned.bit_count() >= min_days]
+        return sorted(stats, key=lambda item: (-item.current_streak, -item.rate, -item.days_done, item.key))
+
+    def history(self, task_name: str, date_from: str, date_to: str) -> List[Tuple[str, bool, bool]]:
+        """По дням диапазона: (дата, была ли задача, выполнена ли)"""
+        with self._lock:
+            self.ensure_built()
+            habit = self._loaded().get(habit_key(task_name))
+        if habit is None:
+            return []
+        return [(_date(offset), bool(habit.planned >> offset & 1), bool(habit.done >> offset & 1))
+                for offset in range(max(_offset(date_from), 0), _offset(date_to) + 1)]
+
+
+# Глобальный экземпляр сервиса
+habit_service = HabitService()
+watcher_service.subscribe(habit_service.handle_change)
@@ -0,0 +1,342 @@
+import csv
+import io
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+from core.constants import DAY_PERIODS, TASK_STATUSES
+from core.exceptions import DataValidationError, FileOperationError
+from core.validators import Validators
+from models.diary import Day, Task
+
+IMPORT_FORMATS = ["csv", "jsonl", "ics"]
+
+# Названия колонок: английские (как в экспорте) и русские (как в JSON дней)
+FIELD_ALIASES = {
+    "date": "date", "дата": "date",
+    "period": "period", "период": "period",
+    "task": "task", "задача": "task", "summary": "task",
+    "time": "time", "время": "time",
+    "status": "status", "статус": "status",
+    "progress": "progress", "прогресс": "progress",
+    "category": "category", "категория": "category",
+    "task_id": "id", "id": "id",
+    "record_type": "record_type",
+}
+PERIOD_ALIASES = {
+    "morning": "Утро", "утро": "Утро",
+    "day": "День", "afternoon": "День", "день": "День",
+    "evening": "Вечер", "night": "Вечер", "вечер": "Вечер",
+}
+
+_TASK_LIST = TypeAdapter(List[Task])
+_ICS_DATETIME_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2}))?")
+
+
+@lru_cache(maxsize=65536)
+def _is_valid_date(day_date: str) -> bool:
+    """Проверка даты с кэшем: в импорте даты повторяются тысячи раз"""
+    return Validators.validate_date_format(day_date)
+
+
+@lru_cache(maxsize=65536)
+def _suggest_category(task_text: str) -> str:
+    """Автокатегория с кэшем по тексту задачи"""
+    from services.diary_service import diary_service
+    return diary_service._suggest_category(task_text)
+
+
+class ImportRowError(NamedTuple):
+    """Ошибка в строке импорта"""
+    line: int
+    message: str
+
+
+class ImportReport:
+    """Итог импорта"""
+
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self.rows_read = 0
+        self.tasks_imported = 0
+        self.duplicates_skipped = 0
+        self.days_created: List[str] = []
+        self.days_updated: List[str] = []
+        self.errors: List[ImportRowError] = []
+
+    def summary(self) -> str:
+        prefix = "Пробный импорт" if self.dry_run else "Импорт"
+        return (f"{prefix}: строк {self.rows_read}, задач {self.tasks_imported}, "
+                f"новых дней {len(self.days_created)}, обновлено дней {len(self.days_updated)}, "
+                f"дубликатов {self.duplicates_skipped}, ошибок {len(self.errors)}")
+
+
+class ImportService:
+    """Пакетный импорт задач из CSV, JSONL и календарей (iCalendar)"""
+
+    def __init__(self, chunk_size: int = 5000, max_workers: int = 8):
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    # ---------- Разбор входных данных ----------
+
+    @staticmethod
+    def detect_format(file_name: str) -> str:
+        """Формат по расширению файла"""
+        suffix = Path(file_name).suffix.lower().lstrip(".")
+        if suffix in ("json", "ndjson"):
+            return "jsonl"
+        if suffix == "ical":
+            return "ics"
+        if suffix not in IMPORT_FORMATS:
+            raise DataValidationError(f"Неизвестный формат импорта: {file_name}")
+        return suffix
+
+    @staticmethod
+    def _normalize_keys(raw: Dict[str, Any]) -> Dict[str, Any]:
+        row = {}
+        for key, value in raw.items():
+            field = FIELD_ALIASES.get(str(key).strip().lower())
+            if field:
+                row[field] = value.strip() if isinstance(value, str) else value
+        return row
+
+    def _iter_csv(self, stream: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        try:
+            reader = csv.DictReader(text_stream)
+            for row in reader:
+                yield reader.line_num, self._normalize_keys(row)
+        finally:
+            text_stream.detach()
+
+    def _iter_jsonl(self, stream: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for line_no, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, {"_error": f"некорректный JSON: {e}"}
+                continue
+            yield line_no, self._normalize_keys(raw) if isinstance(raw, dict) else {"_error": "ожидался объект"}
+
+    @staticmethod
+    def _parse_ics_datetime(value: str) -> Tuple[Optional[str], Optional[str]]:
+        match = _ICS_DATETIME_RE.match(value)
+        if not match:
+            return None, None
+        year, month, day, hour, minute = match.groups()
+        clock = f"{hour}:{minute}" if hour else None
+        return f"{year}-{month}-{day}", clock
+
+    def _iter_ics(self, stream: BinaryIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """События VEVENT: DTSTART/DTEND → дата и время, SUMMARY → задача"""
+        event: Optional[Dict[str, Any]] = None
+        event_line = 0
+        previous = ""
+        previous_no = 0
+
+        def handle(line_no: int, line: str):
+            nonlocal event, event_line
+            name, _, value = line.partition(":")
+            name = name.split(";", 1)[0].upper()
+            if name == "BEGIN" and value.upper() == "VEVENT":
+                event, event_line = {}, line_no
+            elif name == "END" and value.upper() == "VEVENT" and event is not None:
+                start_date, start_time = self._parse_ics_datetime(event.get("DTSTART", ""))
+                _, end_time = self._parse_ics_datetime(event.get("DTEND", ""))
+                row = {"date": start_date, "task": event.get("SUMMARY", "").replace("\\,", ",")}
+                if start_time:
+                    row["time"] = f"{start_time}-{end_time}" if end_time else start_time
+                if event.get("CATEGORIES"):
+                    row["category"] = event["CATEGORIES"].split(",")[0]
+                event = None
+                return event_line, row
+            elif event is not None:
+                event[name] = value
+            return None
+
+        # Строки продолжения (RFC 5545) начинаются с пробела или табуляции
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig")
+        try:
+            for line_no, raw_line in enumerate(text_stream, 1):
+                line = raw_line.rstrip("\r\n")
+                if line[:1] in (" ", "\t"):
+                    previous += line[1:]
+                    continue
+                if previous:
+                    result = handle(previous_no, previous)
+                    if result:
+                        yield result
+                previous, previous_no = line, line_no
+            if previous:
+                result = handle(previous_no, previous)
+                if result:
+                    yield result
+        finally:
+            text_stream.detach()
+
+    def iter_rows(self, stream: BinaryIO, import_format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Строки входного файла с номерами"""
+        if import_format == "csv":
+            return self._iter_csv(stream)
+        if import_format == "jsonl":
+            return self._iter_jsonl(stream)
+        if import_format == "ics":
+            return self._iter_ics(stream)
+        raise DataValidationError(f"Неизвестный формат импорта: {import_format}")
+
+    @staticmethod
+    def _chunks(rows: Iterable, size: int) -> Iterator[List]:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # ---------- Валидация ----------
+
+    @staticmethod
+    def _infer_period(time_range: str) -> str:
+        """Период дня по времени начала"""
+        try:
+            hour = int(time_range.strip()[:2].rstrip(":"))
+        except ValueError:
+            return "День"
+        if hour < 12:
+            return "Утро"
+        if hour < 18:
+            return "День"
+        return "Вечер"
+
+    def _prepare_row(self, row: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        """Проверка полей строки, не относящихся к модели Task"""
+        if "_error" in row:
+            raise DataValidationError(row["_error"])
+
+        day_date = str(row.get("date") or "")
+        if not _is_valid_date(day_date):
+            raise DataValidationError(f"неверная дата '{day_date}'")
+
+        task_text = str(row.get("task") or "")
+        time_range = str(row.get("time") or "")
+        raw_period = str(row.get("period") or "").strip()
+        period = PERIOD_ALIASES.get(raw_period.lower(), raw_period) if raw_period else self._infer_period(time_range)
+        if period not in DAY_PERIODS:
+            raise DataValidationError(f"неизвестный период '{raw_period}'")
+
+        progress = row.get("progress")
+        progress = 0 if progress in (None, "") else progress
+        status = row.get("status") or ("✅" if str(progress) == "100" else "☐")
+        if status not in TASK_STATUSES:
+            raise DataValidationError(f"неизвестный статус '{status}'")
+
+        task_data = {
+            "задача": task_text,
+            "время": time_range,
+            "статус": status,
+            "прогресс": progress,
+            "категория": row.get("category") or _suggest_category(task_text),
+        }
+        if row.get("id"):
+            task_data["id"] = str(row["id"])
+        return day_date, period, task_data
+
+    def validate_chunk(self, chunk: List[Tuple[int, Dict[str, Any]]],
+                       errors: List[ImportRowError]) -> List[Tuple[str, str, Task]]:
+        """Пакетная валидация: одна проверка TypeAdapter на весь блок, ошибки - по строкам"""
+        prepared = []
+        for line_no, row in chunk:
+            if row.get("record_type") not in (None, "", "task"):
+                continue
+            try:
+                prepared.append((line_no,) + self._prepare_row(row))
+            except DataValidationError as e:
+                errors.append(ImportRowError(line_no, str(e)))
+
+        task_data = [item[3] for item in prepared]
+        try:
+            tasks = _TASK_LIST.validate_python(task_data)
+        except ValidationError as e:
+            failed: Dict[int, str] = {}
+            for error in e.errors():
+                index = error["loc"][0]
+                field = ".".join(str(part) for part in error["loc"][1:])
+                failed.setdefault(index, f"{field}: {error['msg']}")
+            for index in sorted(failed):
+                errors.append(ImportRowError(prepared[index][0], failed[index]))
+            prepared = [item for index, item in enumerate(prepared) if index not in failed]
+            tasks = _TASK_LIST.validate_python([item[3] for item in prepared])
+
+        return [(item[1], item[2], task) for item, task in zip(prepared, tasks)]
+
+    # ---------- Импорт ----------
+
+    @staticmethod
+    def _merge_tasks(day_data: Day, tasks: List[Tuple[str, Task]]) -> Tuple[int, int]:
+        """Добавить задачи в день, пропуская уже существующие (по id или названию+времени)"""
+        added = skipped = 0
+        for period, task in tasks:
+            existing = day_data.get_tasks_by_period(period)
+            if any(t.id == task.id or (t.task == task.task and t.time == task.time) for t in existing):
+                skipped += 1
+                continue
+            day_data.add_task(period, task)
+            added += 1
+        return added, skipped
+
+    def import_stream(self, stream: BinaryIO, import_format: str, dry_run: bool = False) -> ImportReport:
+        """Импорт из потока: разбор блоками → пакетная валидация → группировка по датам → параллельная запись"""
+        from services.diary_service import diary_service
+
+        report = ImportReport(dry_run)
+        by_date: Dict[str, List[Tuple[str, Task]]] = {}
+
+        for chunk in self._chunks(self.iter_rows(stream, import_format), self.chunk_size):
+            report.rows_read += len(chunk)
+            for day_date, period, task in self.validate_chunk(chunk, report.errors):
+                by_date.setdefault(day_date, []).append((period, task))
+
+        def build_day(item):
+            day_date, tasks = item
+            exists = diary_service.day_exists(day_date)
+            day_data = diary_service.load_day(day_date) if exists else diary_service.create_day(day_date)
+            added, skipped = self._merge_tasks(day_data, tasks)
+            return day_date, day_data, exists, added, skipped
+
+        changed_days: Dict[str, Day] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for day_date, day_data, exists, added, skipped in executor.map(build_day, sorted(by_date.items())):
+                report.tasks_imported += added
+                report.duplicates_skipped += skipped
+                if not added:
+                    continue
+                (report.days_updated if exists else report.days_created).append(day_date)
+                changed_days[day_date] = day_data
+
+        if not dry_run:
+            diary_service.save_days(changed_days, max_workers=self.max_workers)
+        return report
+
+    def import_file(self, file_path: Path, import_format: Optional[str] = None, dry_run: bool = False) -> ImportReport:
+        """Импорт из файла"""
+        import_format = import_format or self.detect_format(file_path.name)
+        try:
+            with open(file_path, "rb") as stream:
+                return self.import_stream(stream, import_format, dry_run)
+        except (DataValidationError, FileOperationError):
+            raise
+        except Exception as e:
+            raise FileOperationError(f"Ошибка импорта из {file_path}: {e}")
+
+
+# Глобальный экземпляр сервиса
+import_service = ImportService()
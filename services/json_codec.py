@@ -0,0 +1,61 @@
+import json
+from typing import Any, Dict, Optional
+from core.config import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ["auto", "orjson", "stdlib"]
+
+
+class JsonCodec:
+    """Кодек JSON: orjson, если установлен, иначе стандартный json.
+
+    Чтение идёт прямо из bytes, без decode() и strip() всего файла.
+    В режиме совместимости запись побайтно совпадает с прежним форматом
+    (json.dumps(ensure_ascii=False, indent=2) в UTF-8)."""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.configure(settings)
+
+    def configure(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        """Применить настройки (по умолчанию - из config.yaml)"""
+        settings = settings or config.json_codec
+        backend = settings['backend']
+        if backend not in BACKENDS:
+            raise ValueError(f"Неизвестный JSON-бэкенд: {backend}")
+        self.use_orjson = orjson is not None and backend in ("auto", "orjson")
+        self.pretty = bool(settings['pretty'])
+        self.compat = bool(settings['compat'])
+
+    @property
+    def backend(self) -> str:
+        return "orjson" if self.use_orjson else "stdlib"
+
+    def loads(self, raw: bytes) -> Any:
+        """Разбор JSON из bytes; пустой файл или одни пробелы - пустой словарь"""
+        if not raw or raw.isspace():
+            return {}
+        if self.use_orjson:
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+    def dumps(self, data: Any) -> bytes:
+        """Данные для записи в файл (UTF-8)"""
+        if self.pretty:
+            if self.use_orjson and not self.compat:
+                return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        return self.dumps_compact(data)
+
+    def dumps_compact(self, data: Any) -> bytes:
+        """Компактный JSON одной строкой - для ответов API и JSONL"""
+        if self.use_orjson:
+            return orjson.dumps(data)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Глобальный экземпляр
+json_codec = JsonCodec()
@@ -0,0 +1,170 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set
+from core.constants import DAY_PERIODS
+from core.exceptions import DataValidationError
+from core.validators import Validators
+from models.diary import Day, Task
+from models.planning import PlanReport, PlanRule
+
+EXISTING_MODES = ["skip", "merge", "replace"]
+
+
+class PlannerService:
+    """Пакетное планирование дней по шаблонам и правилам повторения"""
+
+    @staticmethod
+    def weekly_rules(weekday_template: Optional[str] = None, weekend_template: Optional[str] = None,
+                     copy_period: Optional[str] = None, copy_from_weekday: int = 0) -> List[PlanRule]:
+        """Типовой набор: шаблон для будней, шаблон для выходных и копирование блока из понедельника"""
+        rules = []
+        if weekday_template:
+            rules.append(PlanRule(name="Будни", weekdays=[0, 1, 2, 3, 4], template=weekday_template))
+        if weekend_template:
+            rules.append(PlanRule(name="Выходные", weekdays=[5, 6], template=weekend_template))
+        if copy_period:
+            targets = [weekday for weekday in range(5) if weekday != copy_from_weekday]
+            rules.append(PlanRule(name=f"{copy_period} из дня {copy_from_weekday}", weekdays=targets,
+                                  copy_from_weekday=copy_from_weekday, periods=[copy_period]))
+        return rules
+
+    @staticmethod
+    def _date_range(date_from: str, date_to: str) -> List[date]:
+        for day_date in (date_from, date_to):
+            if not Validators.validate_date_format(day_date):
+                raise DataValidationError(f"Неверный формат даты: {day_date}")
+        start, end = date.fromisoformat(date_from), date.fromisoformat(date_to)
+        if end < start:
+            raise DataValidationError("Конечная дата раньше начальной")
+        return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+    @staticmethod
+    def _fresh_copy(task: Task) -> Task:
+        """Копия задачи с новым ID и сброшенным прогрессом"""
+        return task.model_copy(update={"id": str(uuid.uuid4()), "progress": 0, "status": "☐"})
+
+    @staticmethod
+    def _merge_into(target: Day, source: Day, periods: List[str]) -> int:
+        """Добавить задачи периодов, которых ещё нет (по названию и времени)"""
+        added = 0
+        for period in periods:
+            existing = {(task.task, task.time) for task in target.get_tasks_by_period(period)}
+            for task in source.get_tasks_by_period(period):
+                if (task.task, task.time) not in existing:
+                    target.add_task(period, PlannerService._fresh_copy(task))
+                    existing.add((task.task, task.time))
+                    added += 1
+        return added
+
+    def plan(self, date_from: str, date_to: str, rules: List[PlanRule], existing: str = "skip",
+             dry_run: bool = False) -> PlanReport:
+        """Создать или обновить дни диапазона по правилам одним пакетом"""
+        from services.diary_service import diary_service
+
+        if existing not in EXISTING_MODES:
+            raise DataValidationError(f"Неизвестный режим: {existing}")
+
+        dates = self._date_range(date_from, date_to)
+        date_keys = [d.strftime("%Y-%m-%d") for d in dates]
+        exists = {key: diary_service.day_exists(key) for key in date_keys}
+        report = PlanReport()
+        template_rules = [rule for rule in rules if rule.template]
+        copy_rules = [rule for rule in rules if rule.is_copy_rule()]
+
+        def template_rule_for(d: date) -> Optional[PlanRule]:
+            return next((rule for rule in template_rules if d.weekday() in rule.weekdays), None)
+
+        # Загружаем с диска только то, что понадобится: дни для слияния, дни, в которых
+        # заменяются только скопированные периоды, и источники копирования
+        needed = {key for d, key in zip(dates, date_keys) if exists[key] and (
+            existing == "merge" or (existing == "replace" and template_rule_for(d) is None))}
+        for rule in rules:
+            if rule.copy_from_date:
+                needed.add(rule.copy_from_date)
+            if rule.copy_from_weekday is not None:
+                for d in dates:
+                    source = d + timedelta(days=rule.copy_from_weekday - d.weekday())
+                    needed.add(source.strftime("%Y-%m-%d"))
+        needed = {key for key in needed if diary_service.day_exists(key)}
+        with ThreadPoolExecutor(max_workers=min(8, len(needed) or 1)) as executor:
+            loaded: Dict[str, Day] = dict(zip(needed, executor.map(diary_service.load_day, needed)))
+
+        planned: Dict[str, Day] = {}
+        added: Dict[str, int] = {}
+
+        skipped = set()
+        for d, key in zip(dates, date_keys):
+            if exists[key] and existing == "skip":
+                skipped.add(key)
+                continue
+
+            # Дни без подходящего шаблона планируются, только если в них попадёт скопированный блок
+            template_rule = template_rule_for(d)
+            if template_rule is None:
+                continue
+            new_day = diary_service.create_day(key, template_rule.template)
+
+            if exists[key] and existing == "merge":
+                day_data = loaded[key]
+                added[key] = self._merge_into(day_data, new_day, DAY_PERIODS)
+            else:
+                day_data = new_day
+                added[key] = 0
+            planned[key] = day_data
+
+        # Копирование блоков: источник берём из уже спланированных дней, иначе с диска
+        cleared: Dict[str, Set[str]] = {}
+        for d, key in zip(dates, date_keys):
+            if key in skipped:
+                continue
+            for rule in copy_rules:
+                if d.weekday() not in rule.weekdays:
+                    continue
+                if rule.copy_from_date:
+                    source_key = rule.copy_from_date
+                else:
+                    source_key = (d + timedelta(days=rule.copy_from_weekday - d.weekday())).strftime("%Y-%m-%d")
+                if source_key == key:
+                    continue
+                source = planned.get(source_key) or loaded.get(source_key)
+                if source is None:
+                    continue
+                target = planned.get(key)
+                if exists[key] and existing == "replace" and template_rule_for(d) is None:
+                    # Дня без шаблона правило касается только своих периодов:
+                    # они заменяются копией, остальное содержимое дня сохраняется
+                    target = target or loaded[key]
+                    for period in rule.periods:
+                        if period not in cleared.setdefault(key, set()):
+                            target.get_tasks_by_period(period).clear()
+                            cleared[key].add(period)
+                elif target is None:
+                    target = loaded[key] if exists[key] and existing == "merge" else diary_service.create_day(key)
+                count = self._merge_into(target, source, rule.periods)
+                if count:
+                    planned[key] = target
+                    added[key] = added.get(key, 0) + count
+
+        for key in date_keys:
+            if key not in planned:
+                # Ни одно правило не дало содержимого - день не трогаем
+                report.skipped.append(key)
+            elif not exists[key]:
+                report.created.append(key)
+            elif existing == "replace":
+                report.replaced.append(key)
+            elif added[key]:
+                report.merged.append(key)
+            else:
+                # Нечего добавить - файл не трогаем
+                report.skipped.append(key)
+                del planned[key]
+
+        if not dry_run:
+            diary_service.save_days(planned)
+        return report
+
+
+# Глобальный экземпляр сервиса
+planner_service = PlannerService()
@@ -1,12 +1,14 @@
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from core.exceptions import ProjectNotFoundError, DataValidationError, FileOperationError
+from core.instrumentation import instrument_class, instrumentation
 from core.constants import PROJECTS_DIR, PROJECT_TEMPLATES_DIR
 from core.validators import Validators
 from models.projects import Project, ProjectMetadata, ProjectSection, ProjectTask, ProjectOverall
 from services.file_service import file_service
 
 
+@instrument_class("project")
 class ProjectService:
     """Сервис для работы с проектами"""
 
@@ -24,7 +26,8 @@ class ProjectService:
 
         try:
             data = file_service.load_json(project_file)
-            return self._migrate_old_format(data, project_name)
+            with instrumentation.timed("project.validate_project", stage="validation"):
+                return self._migrate_old_format(data, project_name)
         except Exception as e:
             raise FileOperationError(f"Ошибка загрузки проекта {project_name}: {e}")
 
@@ -39,6 +42,16 @@ class ProjectService:
         except Exception as e:
             raise FileOperationError(f"Ошибка сохранения проекта {project_name}: {e}")
 
+        self._after_save(project_name, project_data)
+
+    def _after_save(self, project_name: str, project_data: Project) -> None:
+        """Обновление производных индексов после сохранения проекта"""
+        try:
+            from services.search_service import search_service
+            search_service.index_project(project_name, project_data)
+        except Exception as e:
+            print(f"Ошибка индексации проекта {project_name}: {e}")
+
     def create_project(self, project_name: str, template_name: Optional[str] = None) -> Project:
         """Создание нового проекта"""
         try:
@@ -59,6 +72,14 @@ class ProjectService:
         project_file = self.data_dir / f"{project_name}.json"
         return project_file.exists()
 
+    def project_version(self, project_name: str) -> Optional[Tuple[int, int]]:
+        """Версия файла проекта на диске (mtime, size); None если файла нет"""
+        try:
+            stat = (self.data_dir / f"{project_name}.json").stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def list_projects(self) -> List[str]:
         """Список всех проектов"""
         files = file_service.list_files(self.data_dir, "*.json")
@@ -73,19 +94,16 @@ class ProjectService:
         except Exception as e:
             raise FileOperationError(f"Ошибка удаления проекта {project_name}: {e}")
 
+        try:
+            from services.search_service import search_service
+            search_service.remove_project(project_name)
+        except Exception as e:
+            print(f"Ошибка удаления проекта {project_name} из индекса: {e}")
+
     def _create_from_template(self, project_name: str, template_name: str) -> Project:
         """Создание проекта из шаблона"""
-        template_file = self.template_dir / f"{template_name}.json"
-
-        if not template_file.exists():
-            raise FileOperationError(f"Шаблон проекта {template_name} не найден")
-
-        template_data = file_service.load_json(template_file)
-        migrated_data = self._migrate_old_format(template_data, project_name)
-
-        # Обновляем название в метаданных
-        migrated_data.metadata.название = project_name
-        return migrated_data
+        from services.template_service import template_service
+        return template_service.instantiate_project(template_name, project_name)
 
     def _create_empty_project(self, project_name: str) -> Project:
         """Создание пустого проекта"""
@@ -0,0 +1,400 @@
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from core.constants import DATA_DIR
+from core.exceptions import FileOperationError
+from core.vocabulary import vocabulary
+from models.diary import Day
+from models.projects import Project
+from services.watcher_service import FileChange, watcher_service
+
+INDEX_DIR = DATA_DIR / "index"
+SCHEMA_VERSION = "4"
+
+# Слова (включая кириллицу и цифры) или отдельные символы-эмодзи
+_TOKEN_RE = re.compile(r"[^\W_]+|[^\w\s]", re.UNICODE)
+_EMOJI_JOINERS = {"‍", "︎", "️"}
+
+
+class SearchResult(NamedTuple):
+    """Результат поиска"""
+    kind: str  # "task", "note" или "project_task"
+    ref: str  # дата дня или имя проекта
+    date: str
+    period: str  # период дня или секция проекта
+    category: str
+    status: str
+    progress: int
+    task_id: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивка текста на токены: слова в нижнем регистре и эмодзи как отдельные токены"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(text or ""):
+        token = match.group()
+        if token[0].isalnum():
+            tokens.append(token.lower().replace("ё", "е"))
+        elif token not in _EMOJI_JOINERS and unicodedata.category(token) == "So":
+            # unicode61 отбрасывает символы, поэтому кодируем эмодзи как слово
+            tokens.append(f"em{ord(token):x}")
+    return tokens
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Расстояние Левенштейна с ранним выходом при превышении limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchService:
+    """Полнотекстовый поиск по задачам, заметкам и задачам проектов"""
+
+    def __init__(self, index_path: Optional[Path] = None):
+        self.index_path = index_path or INDEX_DIR / "search.sqlite3"
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._has_fts = True
+        # Сверка с файлами на диске выполняется один раз за процесс
+        self._reconciled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открыть базу индекса и создать схему при необходимости"""
+        if self._conn is not None:
+            return self._conn
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка открытия поискового индекса {self.index_path}: {e}")
+
+        self._conn = conn
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection, drop: bool = False) -> None:
+        """Создать таблицы индекса; drop - пересоздать таблицы документов (схема могла измениться)"""
+        if drop:
+            conn.executescript("""
+                DROP TABLE IF EXISTS docs_vocab;
+                DROP TABLE IF EXISTS docs_fts;
+                DROP TABLE IF EXISTS docs;
+                DROP TABLE IF EXISTS versions;
+            """)
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT, ref TEXT, date TEXT, period TEXT,
+                category TEXT, status TEXT, progress INTEGER,
+                task_id TEXT, text TEXT,
+                category_code INTEGER, status_code INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS docs_ref ON docs(kind, ref);
+            CREATE INDEX IF NOT EXISTS docs_date ON docs(date);
+            CREATE INDEX IF NOT EXISTS docs_category ON docs(category_code);
+            CREATE TABLE IF NOT EXISTS versions (
+                kind TEXT, ref TEXT, mtime_ns INTEGER, size INTEGER,
+                PRIMARY KEY (kind, ref)
+            );
+        """)
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts "
+                         "USING fts5(tokens, tokenize='unicode61 remove_diacritics 0')")
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS docs_vocab USING fts5vocab(docs_fts, 'row')")
+            self._has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite собран без FTS5 - поиск по LIKE
+            self._has_fts = False
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._connect().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _versions(self, kind: str) -> Dict[str, Tuple[int, int]]:
+        """Версии файлов (mtime, size), по которым проиндексированы дни или проекты"""
+        rows = self._connect().execute("SELECT ref, mtime_ns, size FROM versions WHERE kind = ?", (kind,))
+        return {ref: (mtime_ns, size) for ref, mtime_ns, size in rows}
+
+    def _set_version(self, kind: str, ref: str, version: Optional[Tuple[int, int]]) -> None:
+        conn = self._connect()
+        if version is None:
+            conn.execute("DELETE FROM versions WHERE kind = ? AND ref = ?", (kind, ref))
+        else:
+            conn.execute("INSERT OR REPLACE INTO versions (kind, ref, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                         (kind, ref, *version))
+
+    # ---------- Обновление индекса ----------
+
+    def _replace_docs(self, kind_group: Tuple[str, ...], ref: str, rows: Iterable[tuple]) -> None:
+        """Заменить все документы одного дня или проекта"""
+        conn = self._connect()
+        placeholders = ",".join("?" * len(kind_group))
+        old_ids = [row[0] for row in conn.execute(
+            f"SELECT id FROM docs WHERE ref = ? AND kind IN ({placeholders})", (ref, *kind_group))]
+        if old_ids:
+            id_list = ",".join("?" * len(old_ids))
+            if self._has_fts:
+                conn.execute(f"DELETE FROM docs_fts WHERE rowid IN ({id_list})", old_ids)
+            conn.execute(f"DELETE FROM docs WHERE id IN ({id_list})", old_ids)
+
+        for row in rows:
+            cursor = conn.execute(
+                "INSERT INTO docs (kind, ref, date, period, category, status, progress, task_id, text, "
+                "category_code, status_code) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            if self._has_fts:
+                conn.execute("INSERT INTO docs_fts (rowid, tokens) VALUES (?, ?)",
+                             (cursor.lastrowid, " ".join(tokenize(row[8]))))
+
+    @staticmethod
+    def _day_rows(day_date: str, day_data: Day) -> Iterable[tuple]:
+        for period in ("Утро", "День", "Вечер"):
+            for task in day_data.get_tasks_by_period(period):
+                yield ("task", day_date, day_date, period, task.category, task.status,
+                       task.progress, task.id, task.task,
+                       vocabulary.categories.code_of(task.category), vocabulary.statuses.code_of(task.status))
+        for note in day_data.notes:
+            yield ("note", day_date, day_date, "", "", "", 0, "", note, None, None)
+
+    @staticmethod
+    def _project_rows(project_name: str, project_data: Project) -> Iterable[tuple]:
+        for section in project_data.sections:
+            for task in section.задачи:
+                status = "✅" if task.прогресс >= 100 else "☐"
+                # Секции проекта - не категории задач: кодов у них нет
+                yield ("project_task", project_name, "", section.название, section.название, status,
+                       task.прогресс, "", task.название, None, vocabulary.statuses.code_of(status))
+
+    def index_day(self, day_date: str, day_data: Day, version: Optional[Tuple[int, int]] = None) -> None:
+        """Переиндексировать один день; version - версия файла, из которого прочитан день"""
+        if version is None:
+            from services.diary_service import diary_service
+            version = diary_service.day_version(day_date)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_docs(("task", "note"), day_date, self._day_rows(day_date, day_data))
+                self._set_version("day", day_date, version)
+
+    def remove_day(self, day_date: str) -> None:
+        """Удалить день из индекса"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_docs(("task", "note"), day_date, [])
+                self._set_version("day", day_date, None)
+
+    def index_project(self, project_name: str, project_data: Project,
+                      version: Optional[Tuple[int, int]] = None) -> None:
+        """Переиндексировать один проект"""
+        if version is None:
+            from services.project_service import project_service
+            version = project_service.project_version(project_name)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_docs(("project_task",), project_name,
+                                   self._project_rows(project_name, project_data))
+                self._set_version("project", project_name, version)
+
+    def remove_project(self, project_name: str) -> None:
+        """Удалить проект из индекса"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_docs(("project_task",), project_name, [])
+                self._set_version("project", project_name, None)
+
+    def rebuild(self) -> int:
+        """Полная перестройка индекса по всем дням и проектам"""
+        from services.diary_service import diary_service
+        from services.project_service import project_service
+
+        indexed = 0
+        with self._lock:
+            conn = self._connect()
+            self._create_schema(conn, drop=True)
+            with conn:
+                for day_date, version in diary_service.day_versions().items():
+                    try:
+                        day_data = diary_service.load_day(day_date)
+                    except Exception as e:
+                        print(f"Ошибка индексации дня {day_date}: {e}")
+                        continue
+                    self._replace_docs(("task", "note"), day_date, self._day_rows(day_date, day_data))
+                    self._set_version("day", day_date, version)
+                    indexed += 1
+
+                for project_name in project_service.list_projects():
+                    version = project_service.project_version(project_name)
+                    try:
+                        project_data = project_service.load_project(project_name)
+                    except Exception as e:
+                        print(f"Ошибка индексации проекта {project_name}: {e}")
+                        continue
+                    self._replace_docs(("project_task",), project_name,
+                                       self._project_rows(project_name, project_data))
+                    self._set_version("project", project_name, version)
+                    indexed += 1
+
+                self._set_meta("schema_version", SCHEMA_VERSION)
+            self._reconciled = True
+        return indexed
+
+    def reconcile(self) -> int:
+        """Догнать файлы, изменённые, пока приложение было закрыто.
+
+        Сравнивает сохранённые версии (mtime, size) с файлами на диске и
+        переиндексирует только отличающиеся дни и проекты; возвращает их число."""
+        from services.diary_service import diary_service
+        from services.project_service import project_service
+
+        with self._lock:
+            days = diary_service.catch_up_index(self, self._versions("day"))
+
+            indexed_projects = self._versions("project")
+            projects = {name: project_service.project_version(name) for name in project_service.list_projects()}
+            stale_projects = [name for name in indexed_projects if name not in projects]
+            for project_name in stale_projects:
+                self.remove_project(project_name)
+            for project_name, version in projects.items():
+                if indexed_projects.get(project_name) == version:
+                    continue
+                stale_projects.append(project_name)
+                try:
+                    self.index_project(project_name, project_service.load_project(project_name), version)
+                except Exception as e:
+                    print(f"Ошибка индексации проекта {project_name}: {e}")
+
+            self._reconciled = True
+        return days + len(stale_projects)
+
+    def ensure_built(self) -> None:
+        """Построить индекс при первом использовании, при первом обращении в процессе - сверить с файлами"""
+        with self._lock:
+            if self._get_meta("schema_version") != SCHEMA_VERSION:
+                self.rebuild()
+            elif not self._reconciled:
+                self.reconcile()
+
+    def handle_change(self, change: FileChange) -> None:
+        """Обновление индекса при внешнем изменении файлов"""
+        if change.kind == "day":
+            from services.diary_service import diary_service
+            if change.key == "*":
+                self.rebuild()
+            elif change.deleted or not diary_service.day_exists(change.key):
+                self.remove_day(change.key)
+            else:
+                self.index_day(change.key, diary_service.load_day(change.key))
+        elif change.kind == "project":
+            from services.project_service import project_service
+            if change.key == "*":
+                self.rebuild()
+            elif change.deleted or not project_service.project_exists(change.key):
+                self.remove_project(change.key)
+            else:
+                self.index_project(change.key, project_service.load_project(change.key))
+
+    def categories_in_use(self) -> List[str]:
+        """Категории, которые сейчас есть у задач дней"""
+        with self._lock:
+            self.ensure_built()
+            rows = self._connect().execute(
+                "SELECT DISTINCT category FROM docs WHERE kind = 'task' AND category != '' ORDER BY category"
+            ).fetchall()
+        return [category for (category,) in rows]
+
+    # ---------- Поиск ----------
+
+    def _expand_token(self, token: str, prefix: bool, fuzzy: bool) -> List[str]:
+        """Варианты токена для MATCH: префикс и близкие по написанию термины"""
+        variants = [f'"{token}"*' if prefix else f'"{token}"']
+        if fuzzy and len(token) >= 4 and not token.startswith("em"):
+            limit = 1 if len(token) < 8 else 2
+            # Кандидаты с тем же первым символом - без полного обхода словаря
+            rows = self._connect().execute(
+                "SELECT term FROM docs_vocab WHERE term >= ? AND term < ?",
+                (token[0], chr(ord(token[0]) + 1))).fetchall()
+            for (term,) in rows:
+                if term != token and _edit_distance(token, term, limit) <= limit:
+                    variants.append(f'"{term}"')
+        return variants
+
+    def search(self, query: str, kinds: Optional[List[str]] = None, date_from: Optional[str] = None,
+               date_to: Optional[str] = None, category: Optional[str] = None, status: Optional[str] = None,
+               prefix: bool = True, fuzzy: bool = True, limit: int = 50) -> List[SearchResult]:
+        """Поиск с фильтрами по виду, диапазону дат, категории и статусу"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            self.ensure_built()
+            conn = self._connect()
+
+            conditions, params = [], []
+            if self._has_fts:
+                match = " AND ".join(
+                    "(" + " OR ".join(self._expand_token(token, prefix, fuzzy)) + ")" for token in tokens)
+                sql = ("SELECT d.kind, d.ref, d.date, d.period, d.category, d.status, d.progress, d.task_id, "
+                       "d.text FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid WHERE docs_fts MATCH ?")
+                params.append(match)
+            else:
+                sql = ("SELECT d.kind, d.ref, d.date, d.period, d.category, d.status, d.progress, d.task_id, "
+                       "d.text FROM docs d WHERE 1")
+                for token in tokens:
+                    conditions.append("lower(d.text) LIKE ?")
+                    params.append(f"%{token}%")
+
+            if kinds:
+                conditions.append(f"d.kind IN ({','.join('?' * len(kinds))})")
+                params.extend(kinds)
+            if date_from:
+                conditions.append("d.date >= ?")
+                params.append(date_from)
+            if date_to:
+                conditions.append("d.date <= ?")
+                params.append(date_to)
+            # Фильтры по кодам словаря; значения без кода индексируются без него и ищутся по строке
+            if category:
+                conditions.append("(d.category_code = ? OR (d.category_code IS NULL AND d.category = ?))")
+                params.extend((vocabulary.categories.code_of(category), category))
+            if status:
+                conditions.append("(d.status_code = ? OR (d.status_code IS NULL AND d.status = ?))")
+                params.extend((vocabulary.statuses.code_of(status), status))
+
+            for condition in conditions:
+                sql += f" AND {condition}"
+            sql += " ORDER BY bm25(docs_fts), d.date DESC" if self._has_fts else " ORDER BY d.date DESC"
+            sql += " LIMIT ?"
+            params.append(limit)
+
+            try:
+                return [SearchResult(*row) for row in conn.execute(sql, params)]
+            except sqlite3.Error as e:
+                raise FileOperationError(f"Ошибка поиска: {e}")
+
+
+# Глобальный экземпляр сервиса
+search_service = SearchService()
+watcher_service.subscribe(search_service.handle_change)
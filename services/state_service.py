@@ -2,10 +2,14 @@ from pathlib import Path
 from typing import List, Dict, Optional
 import yaml
 from core.exceptions import FileOperationError
+from core.instrumentation import instrument_class
+from core.vocabulary import vocabulary
 from models.state import StateCategory
+from services.watcher_service import FileChange, watcher_service
 
 
 
+@instrument_class("state")
 class StateService:
     """Сервис для управления категориями состояния"""
 
@@ -23,6 +27,7 @@ class StateService:
         self.default_categories_file = self.config_dir / "state_categories.yaml"
         self.user_categories_file = self.config_dir / "user_state_categories.yaml"
         self.additional_categories_file = self.config_dir / "additional_categories.yaml"
+        self._categories_cache: Optional[List[StateCategory]] = None
         self._ensure_config_dir()
 
     def _ensure_config_dir(self) -> None:
@@ -260,8 +265,22 @@ class StateService:
             except Exception as e:
                 raise FileOperationError(f"Ошибка создания категорий по умолчанию: {e}")
 
+    def handle_change(self, change: FileChange) -> None:
+        """Сброс кэша категорий при внешнем изменении конфигурации"""
+        if change.kind == "config" and change.key in (
+                "*", self.default_categories_file.name, self.user_categories_file.name):
+            self._categories_cache = None
+
     def load_categories(self) -> List[StateCategory]:
         """Загрузка категорий (сначала пользовательские, потом дефолтные)"""
+        if self._categories_cache is None:
+            self._categories_cache = self._read_categories()
+            # Коды категорий состояния для индексов и компактной истории
+            vocabulary.state_categories.extend(category.name for category in self._categories_cache)
+        return list(self._categories_cache)
+
+    def _read_categories(self) -> List[StateCategory]:
+        """Чтение категорий из YAML файлов"""
         categories = []
 
         # Загружаем пользовательские категории если есть
@@ -385,6 +404,7 @@ class StateService:
             data = {"categories": [cat.dict() for cat in categories]}
             with open(self.user_categories_file, 'w', encoding='utf-8') as f:
                 yaml.dump(data, f, allow_unicode=True, indent=2)
+            self._categories_cache = None
         except Exception as e:
             raise FileOperationError(f"Ошибка сохранения пользовательских категорий: {e}")
 
@@ -395,4 +415,5 @@ class StateService:
 
 
 # Глобальный экземпляр сервиса
-state_service = StateService()
\ No newline at end of file
+state_service = StateService()
+watcher_service.subscribe(state_service.handle_change)
\ No newline at end of file
@@ -0,0 +1,317 @@
+import datetime
+import mmap
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from core.config import config
+from core.constants import DAY_PERIODS, TASK_STATUSES
+from core.exceptions import DataValidationError, FileOperationError
+from models.diary import Day
+from services.analytics_service import state_number
+from services.file_service import file_service
+from services.search_service import INDEX_DIR
+from services.watcher_service import FileChange, watcher_service
+
+SUMMARY_MAGIC = b"DTSUMV2\n"
+# Заголовок: сигнатура, ординал первой даты, размер записи, CRC32 списка категорий состояния
+HEADER = struct.Struct("<8sIHI14x")
+STATE_SLOTS = 4
+# Запись дня: флаги, задачи по статусам (TASK_STATUSES), средний прогресс, значения состояния 0-100,
+# CRC32 версии файла дня (mtime, size), из которого построена запись
+RECORD = struct.Struct(f"<B{len(TASK_STATUSES)}BB{STATE_SLOTS}BI2x")
+FLAG_EXISTS = 1
+MISSING = 255
+
+
+def _version_crc(version: Optional[Tuple[int, int]]) -> int:
+    return zlib.crc32(struct.pack("<qq", *version)) if version is not None else 0
+
+
+class DaySummary(NamedTuple):
+    """Сводка дня из файла сводок"""
+    date: str
+    exists: bool
+    status_counts: Dict[str, int]
+    mean_progress: Optional[int]  # None - в дне нет задач
+    state: Dict[str, Optional[int]]  # категория -> значение 0-100
+
+    @property
+    def total(self) -> int:
+        return sum(self.status_counts.values())
+
+    @property
+    def done(self) -> int:
+        return self.status_counts.get("✅", 0)
+
+
+class SummaryService:
+    """Файл сводок: одна запись фиксированной длины на каждую дату.
+
+    Запись дня N лежит по смещению заголовок + N * размер записи, поэтому
+    сохранение дня перезаписывает 16 байт на месте, а диапазон в несколько
+    лет читается одним срезом отображённого в память файла - без проверки
+    существования и загрузки файлов дней."""
+
+    def __init__(self, summary_path: Optional[Path] = None):
+        self.summary_path = summary_path or INDEX_DIR / "daily_summary.bin"
+        self._lock = threading.RLock()
+        self._map: Optional[mmap.mmap] = None
+        self._map_key: Optional[Tuple[int, int]] = None
+        self._base: Optional[int] = None
+        # Сверка с файлами на диске выполняется один раз за процесс
+        self._reconciled = False
+
+    @staticmethod
+    def state_categories() -> List[str]:
+        categories = list(config.summary['state_categories'])[:STATE_SLOTS]
+        return categories + [""] * (STATE_SLOTS - len(categories))
+
+    def _categories_crc(self) -> int:
+        return zlib.crc32("\n".join(self.state_categories()).encode("utf-8"))
+
+    # ---------- Записи ----------
+
+    def _pack(self, day_data: Day, version: Optional[Tuple[int, int]]) -> bytes:
+        counts = [0] * len(TASK_STATUSES)
+        total = progress = 0
+        for period in DAY_PERIODS:
+            for task in day_data.get_tasks_by_period(period):
+                if task.status in TASK_STATUSES:
+                    index = TASK_STATUSES.index(task.status)
+                    counts[index] = min(counts[index] + 1, MISSING - 1)
+                total += 1
+                progress += task.progress
+        mean = round(progress / total) if total else MISSING
+
+        values = {item.category: item for item in day_data.state.values}
+        state = []
+        for category in self.state_categories():
+            item = values.get(category) if category else None
+            number = state_number(str(item.value), item.value_type) if item is not None else None
+            if number is not None:
+                # Шкала 1-10 и да/нет приводятся к тем же 0-100, что и проценты
+                number *= {"scale_1_10": 10, "yes_no": 100}.get(item.value_type, 1)
+            state.append(MISSING if number is None else max(0, min(100, round(number))))
+        return RECORD.pack(FLAG_EXISTS, *counts, mean, *state, _version_crc(version))
+
+    def _unpack(self, day_date: str, record: Tuple[int, ...]) -> DaySummary:
+        flags = record[0]
+        if not flags & FLAG_EXISTS:
+            return DaySummary(day_date, False, {}, None, {})
+        counts = record[1:1 + len(TASK_STATUSES)]
+        mean = record[1 + len(TASK_STATUSES)]
+        state = record[2 + len(TASK_STATUSES):2 + len(TASK_STATUSES) + STATE_SLOTS]
+        return DaySummary(
+            date=day_date,
+            exists=True,
+            status_counts={status: count for status, count in zip(TASK_STATUSES, counts) if count},
+            mean_progress=None if mean == MISSING else mean,
+            state={category: None if value == MISSING else value
+                   for category, value in zip(self.state_categories(), state) if category},
+        )
+
+    # ---------- Файл ----------
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _read_header(self) -> Optional[int]:
+        """Ординал первой даты файла или None, если файла нет или он устарел"""
+        try:
+            with open(self.summary_path, "rb") as file:
+                header = file.read(HEADER.size)
+        except OSError:
+            return None
+        if len(header) != HEADER.size:
+            return None
+        magic, base, record_size, crc = HEADER.unpack(header)
+        if magic != SUMMARY_MAGIC or record_size != RECORD.size or crc != self._categories_crc():
+            return None
+        return base
+
+    def _is_built(self) -> bool:
+        if self._base is None:
+            self._base = self._read_header()
+        return self._base is not None
+
+    def _write_record(self, day_date: str, record: bytes) -> None:
+        # Пока файла нет, писать некуда: первое чтение построит его целиком
+        if not self._is_built():
+            return
+        ordinal = datetime.date.fromisoformat(day_date).toordinal()
+        if ordinal < self._base:
+            # Дата раньше начала файла - проще перестроить его целиком
+            self.rebuild()
+            return
+        try:
+            with open(self.summary_path, "r+b") as file:
+                file.seek(HEADER.size + (ordinal - self._base) * RECORD.size)
+                file.write(record)
+        except FileNotFoundError:
+            self._base = None
+        except OSError as e:
+            raise FileOperationError(f"Ошибка записи файла сводок {self.summary_path}: {e}")
+
+    def index_day(self, day_date: str, day_data: Day, version: Optional[Tuple[int, int]] = None) -> None:
+        """Обновить запись дня на месте; version - версия файла, из которого прочитан день"""
+        if version is None:
+            from services.diary_service import diary_service
+            version = diary_service.day_version(day_date)
+        with self._lock:
+            self._write_record(day_date, self._pack(day_data, version))
+
+    def remove_day(self, day_date: str) -> None:
+        """Отметить день как несуществующий"""
+        with self._lock:
+            if self._is_built() and datetime.date.fromisoformat(day_date).toordinal() >= self._base:
+                self._write_record(day_date, bytes(RECORD.size))
+
+    def rebuild(self) -> int:
+        """Полная перестройка файла по всем дням"""
+        from services.diary_service import diary_service
+
+        with self._lock:
+            versions = diary_service.day_versions()
+            days = sorted(versions)
+            # Файл начинается с 1 января самого раннего года
+            first = datetime.date.fromisoformat(days[0]) if days else datetime.date.today()
+            base = datetime.date(first.year, 1, 1).toordinal()
+            last = datetime.date.fromisoformat(days[-1]).toordinal() if days else base
+
+            content = bytearray(HEADER.pack(SUMMARY_MAGIC, base, RECORD.size, self._categories_crc()))
+            content.extend(bytes((last - base + 1) * RECORD.size))
+            indexed = 0
+            for day_date in days:
+                try:
+                    record = self._pack(diary_service.load_day(day_date), versions[day_date])
+                except Exception as e:
+                    print(f"Ошибка сводки дня {day_date}: {e}")
+                    continue
+                offset = HEADER.size + (datetime.date.fromisoformat(day_date).toordinal() - base) * RECORD.size
+                content[offset:offset + RECORD.size] = record
+                indexed += 1
+
+            # Отображение старого файла мешает его замене (Windows)
+            self._close_map()
+            file_service.save_bytes(self.summary_path, bytes(content))
+            self._base = base
+            self._reconciled = True
+            return indexed
+
+    def reconcile(self) -> int:
+        """Догнать файлы дней, изменённые, пока приложение было закрыто.
+
+        Перезаписываются только записи, CRC версии которых не совпадает
+        с файлом дня на диске; возвращает число обновлённых дней."""
+        from services.diary_service import diary_service
+
+        with self._lock:
+            current = diary_service.day_versions()
+            try:
+                view = self._view()
+            except (OSError, ValueError) as e:
+                raise FileOperationError(f"Ошибка чтения файла сводок {self.summary_path}: {e}")
+            count = (len(view) - HEADER.size) // RECORD.size
+            stored = {
+                datetime.date.fromordinal(self._base + position).isoformat(): record[-1]
+                for position, record in enumerate(RECORD.iter_unpack(view[HEADER.size:HEADER.size + count * RECORD.size]))
+                if record[0] & FLAG_EXISTS
+            }
+            changed = [day_date for day_date, version in sorted(current.items())
+                       if stored.get(day_date) != _version_crc(version)]
+            removed = [day_date for day_date in stored if day_date not in current]
+
+            for day_date in removed:
+                self.remove_day(day_date)
+            for day_date in changed:
+                try:
+                    self.index_day(day_date, diary_service.load_day(day_date), current[day_date])
+                except Exception as e:
+                    print(f"Ошибка сводки дня {day_date}: {e}")
+            self._reconciled = True
+        return len(changed) + len(removed)
+
+    def ensure_built(self) -> None:
+        """Построить файл при первом использовании или после смены категорий состояния,
+        при первом обращении в процессе - сверить с файлами"""
+        with self._lock:
+            if not self._is_built():
+                self.rebuild()
+            elif not self._reconciled:
+                self.reconcile()
+
+    def handle_change(self, change: FileChange) -> None:
+        """Обновление сводок при внешнем изменении файлов дней"""
+        if change.kind != "day":
+            return
+        from services.diary_service import diary_service
+        if change.key == "*":
+            self.rebuild()
+        elif change.deleted or not diary_service.day_exists(change.key):
+            self.remove_day(change.key)
+        else:
+            self.index_day(change.key, diary_service.load_day(change.key))
+
+    # ---------- Чтение ----------
+
+    def _view(self) -> mmap.mmap:
+        """Файл сводок, отображённый в память; переотображается, если файл вырос или заменён"""
+        stat = os.stat(self.summary_path)
+        if self._map is not None and self._map_key == (stat.st_ino, stat.st_size):
+            return self._map
+        self._close_map()
+        with open(self.summary_path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map_key = (stat.st_ino, stat.st_size)
+        # Файл мог перестроить другой процесс - начало берём из его заголовка
+        self._base = self._read_header()
+        if self._base is None:
+            raise FileOperationError(f"Файл сводок {self.summary_path} устарел")
+        return self._map
+
+    def read_range(self, date_from: str, date_to: str) -> List[DaySummary]:
+        """Сводки всех дат диапазона (включая несуществующие дни) одним чтением"""
+        try:
+            start = datetime.date.fromisoformat(date_from).toordinal()
+            end = datetime.date.fromisoformat(date_to).toordinal()
+        except ValueError as e:
+            raise DataValidationError(f"Неверный диапазон дат: {e}")
+
+        with self._lock:
+            self.ensure_built()
+            try:
+                view = self._view()
+            except (OSError, ValueError) as e:
+                raise FileOperationError(f"Ошибка чтения файла сводок {self.summary_path}: {e}")
+            count = (len(view) - HEADER.size) // RECORD.size
+            low = max(start - self._base, 0)
+            high = min(end - self._base + 1, count)
+            chunk = view[HEADER.size + low * RECORD.size:HEADER.size + max(high, low) * RECORD.size]
+
+        summaries = []
+        records = iter(RECORD.iter_unpack(chunk))
+        empty = RECORD.unpack(bytes(RECORD.size))
+        for ordinal in range(start, end + 1):
+            position = ordinal - self._base
+            record = next(records) if low <= position < high else empty
+            summaries.append(self._unpack(datetime.date.fromordinal(ordinal).isoformat(), record))
+        return summaries
+
+    def get(self, day_date: str) -> DaySummary:
+        return self.read_range(day_date, day_date)[0]
+
+    def first_date(self) -> Optional[str]:
+        """Первая дата файла (1 января самого раннего года)"""
+        with self._lock:
+            self.ensure_built()
+            return datetime.date.fromordinal(self._base).isoformat() if self._base else None
+
+
+# Глобальный экземпляр сервиса
+summary_service = SummaryService()
+watcher_service.subscribe(summary_service.handle_change)
@@ -0,0 +1,482 @@
+import datetime
+import hashlib
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from core.config import config
+from core.constants import DIARY_DIR, PROJECTS_DIR
+from core.exceptions import DailyTrackerError, DataValidationError, FileOperationError
+from models.crdt import DayDocument
+from models.diary import Day
+from services.archive_service import ArchiveService
+from services.diary_service import DiaryService
+from services.file_service import file_service
+from services.json_codec import json_codec
+
+# Узел дерева -> {имя потомка: (хеш, лист ли это)}
+TreeLevel = Dict[str, Tuple[str, bool]]
+
+
+def _tree_path(key: str) -> List[str]:
+    """Путь листа в дереве: дни раскладываются по годам и месяцам"""
+    kind, name = key.split("/", 1)
+    if kind == "diary":
+        return [kind, name[:4], name[5:7], name]
+    return [kind, name]
+
+
+def _key_from_tree(path: str) -> str:
+    parts = path.split("/")
+    return f"{parts[0]}/{parts[-1]}"
+
+
+def _node_hash(level: TreeLevel) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(level):
+        digest.update(f"{name}\t{level[name][0]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class Replica:
+    """Синхронизируемые файлы одной копии данных: дни, проекты и config/*.yaml.
+
+    Ключи - "diary/ДАТА", "projects/ИМЯ.json", "config/ИМЯ.yaml"; день
+    читается из любой раскладки папок или из пакета. Хеши листьев кэшируются
+    по (mtime, размер), поэтому построение дерева - это stat файлов без чтения.
+    CRDT-документы дней лежат отдельно, в data/crdt/ГГГГ/ММ/ДАТА.json."""
+
+    def __init__(self, diary_dir: Path, projects_dir: Path, config_dir: Path, state_dir: Optional[Path] = None):
+        self.diary = DiaryService(diary_dir)
+        self.archive = ArchiveService(diary_dir / "packs")
+        self.projects_dir = projects_dir
+        self.config_dir = config_dir
+        self.crdt_dir = diary_dir.parent / "crdt"
+        self.state_dir = state_dir or diary_dir.parent / "index"
+        self._cache_path = self.state_dir / "sync_hashes.json"
+        self._hash_cache: Optional[Dict[str, List[Any]]] = None
+        self._tree: Optional[Dict[str, TreeLevel]] = None
+        self._leaves: Dict[str, str] = {}
+
+    @classmethod
+    def for_base_dir(cls, base_dir: Path) -> "Replica":
+        """Копия данных в папке установки (с подпапками data/ и config/)"""
+        if not (base_dir / "data").is_dir():
+            raise DataValidationError(f"В {base_dir} нет папки data/")
+        return cls(base_dir / "data" / "diary", base_dir / "data" / "projects", base_dir / "config")
+
+    @property
+    def replica_id(self) -> str:
+        id_file = self.state_dir / "replica_id"
+        if not id_file.exists():
+            file_service.save_bytes(id_file, uuid.uuid4().hex.encode("ascii"))
+        return id_file.read_text(encoding="ascii").strip()
+
+    # ---------- Листья и дерево ----------
+
+    def _sources(self) -> Dict[str, Tuple[Tuple[int, int], Optional[Path]]]:
+        """Ключ -> (признак версии, путь отдельного файла или None для дня в пакете)"""
+        sources: Dict[str, Tuple[Tuple[int, int], Optional[Path]]] = {}
+        for day_date in self.archive.list_days():
+            sources[f"diary/{day_date}"] = (self.archive.day_version(day_date), None)
+        for day_date, path in self.diary.iter_day_files():
+            stat = path.stat()
+            sources[f"diary/{day_date}"] = ((stat.st_mtime_ns, stat.st_size), path)
+        for kind, directory, pattern in (("projects", self.projects_dir, "*.json"),
+                                         ("config", self.config_dir, "*.yaml")):
+            for path in file_service.list_files(directory, pattern):
+                stat = path.stat()
+                sources[f"{kind}/{path.name}"] = ((stat.st_mtime_ns, stat.st_size), path)
+        return sources
+
+    def leaf_hashes(self) -> Dict[str, str]:
+        """Хеши содержимого всех ключей; читаются только изменившиеся файлы"""
+        if self._hash_cache is None:
+            self._hash_cache = file_service.load_json(self._cache_path) if self._cache_path.exists() else {}
+
+        hashes = {}
+        fresh_cache: Dict[str, List[Any]] = {}
+        changed = False
+        for key, (version, path) in self._sources().items():
+            cached = self._hash_cache.get(key)
+            if cached and tuple(cached[:2]) == tuple(version):
+                digest = cached[2]
+            else:
+                content = self.read(key)
+                if content is None:
+                    continue
+                digest = hashlib.sha256(content[0]).hexdigest()
+                changed = True
+            hashes[key] = digest
+            fresh_cache[key] = [version[0], version[1], digest]
+
+        if changed or len(fresh_cache) != len(self._hash_cache):
+            self._hash_cache = fresh_cache
+            file_service.save_bytes(self._cache_path, json_codec.dumps_compact(fresh_cache))
+        return hashes
+
+    def tree(self) -> Dict[str, TreeLevel]:
+        """Дерево Меркла: узел -> хеши потомков; корень - пустая строка"""
+        if self._tree is not None:
+            return self._tree
+
+        self._leaves = self.leaf_hashes()
+        levels: Dict[str, Dict[str, Optional[Tuple[str, bool]]]] = {"": {}}
+        for key, digest in self._leaves.items():
+            node = ""
+            parts = _tree_path(key)
+            for depth, part in enumerate(parts):
+                child = f"{node}/{part}" if node else part
+                if depth == len(parts) - 1:
+                    levels[node][part] = (digest, True)
+                else:
+                    levels[node].setdefault(part, None)
+                    levels.setdefault(child, {})
+                node = child
+
+        # Хеши поддеревьев снизу вверх
+        tree: Dict[str, TreeLevel] = {}
+        for node in sorted(levels, key=lambda name: name.count("/") + bool(name), reverse=True):
+            level = {}
+            for name, value in levels[node].items():
+                if value is None:
+                    child = f"{node}/{name}" if node else name
+                    value = (_node_hash(tree[child]), False)
+                level[name] = value
+            tree[node] = level
+        self._tree = tree
+        return tree
+
+    def refresh(self) -> None:
+        """Забыть построенное дерево - следующий запрос перестроит его по диску"""
+        self._tree = None
+
+    def tree_leaves(self) -> Dict[str, str]:
+        """Хеши листьев, по которым построено текущее дерево"""
+        self.tree()
+        return dict(self._leaves)
+
+    def root_hash(self) -> str:
+        return _node_hash(self.tree()[""])
+
+    def tree_hashes(self, node: str) -> TreeLevel:
+        return self.tree().get(node, {})
+
+    # ---------- Чтение и запись ----------
+
+    def _path(self, key: str) -> Path:
+        kind, name = key.split("/", 1)
+        if kind == "diary":
+            return self.diary.day_path(name)
+        if kind == "projects":
+            return self.projects_dir / name
+        return self.config_dir / name
+
+    def read(self, key: str) -> Optional[Tuple[bytes, int]]:
+        """Содержимое и mtime ключа; None, если его нет"""
+        kind, name = key.split("/", 1)
+        path = self._path(key)
+        try:
+            return path.read_bytes(), path.stat().st_mtime_ns
+        except FileNotFoundError:
+            if kind != "diary":
+                return None
+        raw = self.archive.read_day(name)
+        if raw is None:
+            return None
+        return raw, self.archive.day_version(name)[0]
+
+    def write(self, key: str, content: bytes) -> None:
+        file_service.save_bytes(self._path(key), content)
+        self._tree = None
+
+    def _document_path(self, day_date: str) -> Path:
+        return self.crdt_dir / day_date[:4] / day_date[5:7] / f"{day_date}.json"
+
+    def read_document(self, day_date: str) -> Optional[bytes]:
+        """CRDT-документ дня с последней синхронизации или None"""
+        try:
+            return self._document_path(day_date).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write_document(self, day_date: str, content: bytes) -> None:
+        file_service.save_bytes(self._document_path(day_date), content)
+
+    def _check_not_packed(self, day_date: str) -> None:
+        """Удалить отдельный файл упакованного дня нельзя: вернулась бы запись из пакета"""
+        if self.archive.contains(day_date):
+            raise FileOperationError(f"День {day_date} упакован, сначала распакуйте его период")
+
+    def delete(self, key: str) -> None:
+        kind, name = key.split("/", 1)
+        if kind == "diary":
+            self._check_not_packed(name)
+            self.diary.delete_day_files(name)
+        else:
+            self._path(key).unlink(missing_ok=True)
+        self._tree = None
+
+
+class AppReplica(Replica):
+    """Данные самого приложения: запись идёт через сервисы, чтобы обновлялись индексы"""
+
+    def __init__(self):
+        super().__init__(DIARY_DIR, PROJECTS_DIR, config.config_dir)
+
+    def write(self, key: str, content: bytes) -> None:
+        from services.diary_service import diary_service
+        from services.project_service import project_service
+
+        kind, name = key.split("/", 1)
+        if kind == "diary":
+            diary_service.save_day(name, Day(**json_codec.loads(content)))
+        elif kind == "projects":
+            project_name = name[:-len(".json")]
+            project_service.save_project(project_name,
+                                         project_service._migrate_old_format(json_codec.loads(content), project_name))
+        else:
+            file_service.save_bytes(self._path(key), content)
+        self._tree = None
+
+    def delete(self, key: str) -> None:
+        from services.diary_service import diary_service
+        from services.project_service import project_service
+
+        kind, name = key.split("/", 1)
+        if kind == "diary":
+            diary_service.delete_day(name)
+        elif kind == "projects":
+            project_service.delete_project(name[:-len(".json")])
+        else:
+            self._path(key).unlink(missing_ok=True)
+        self._tree = None
+
+
+class LocalTransport:
+    """Транспорт к копии данных в другой папке (сетевой диск, флешка, тесты).
+
+    Сетевой транспорт должен предоставлять те же операции."""
+
+    def __init__(self, replica: Replica):
+        self.replica = replica
+
+    def hello(self) -> str:
+        self.replica.refresh()
+        return self.replica.replica_id
+
+    def tree_hashes(self, node: str) -> TreeLevel:
+        return self.replica.tree_hashes(node)
+
+    def read(self, key: str) -> Optional[Tuple[bytes, int]]:
+        return self.replica.read(key)
+
+    def write(self, key: str, content: bytes) -> None:
+        self.replica.write(key, content)
+
+    def delete(self, key: str) -> None:
+        self.replica.delete(key)
+
+    def read_document(self, day_date: str) -> Optional[bytes]:
+        return self.replica.read_document(day_date)
+
+    def write_document(self, day_date: str, content: bytes) -> None:
+        self.replica.write_document(day_date, content)
+
+
+@dataclass
+class SyncReport:
+    """Итог синхронизации"""
+    peer: str
+    exchanges: int = 0
+    pulled: List[str] = field(default_factory=list)
+    pushed: List[str] = field(default_factory=list)
+    merged: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    def summary(self) -> str:
+        return (f"обменов деревом: {self.exchanges}, получено {len(self.pulled)}, "
+                f"отправлено {len(self.pushed)}, слито {len(self.merged)}, "
+                f"копий конфликтов {len(self.conflicts)}, ошибок {len(self.errors)}")
+
+
+class SyncService:
+    """Синхронизация двух копий данных по дереву Меркла.
+
+    Копии сравнивают хеши сверху вниз и спускаются только в отличающиеся
+    поддеревья, поэтому число обменов растёт с числом изменений, а не с
+    размером истории. Для каждого ключа хранится хеш на момент последней
+    синхронизации с этим партнёром: по нему видно, какая сторона изменилась.
+    День, изменённый с обеих сторон, сливается через CRDT-документы
+    (models/crdt.py): по Task.id и отдельно по каждому полю задачи."""
+
+    def __init__(self):
+        self._local: Optional[Replica] = None
+
+    @property
+    def local(self) -> Replica:
+        if self._local is None:
+            self._local = AppReplica()
+        return self._local
+
+    def open_transport(self, base_dir: Path) -> LocalTransport:
+        return LocalTransport(Replica.for_base_dir(base_dir))
+
+    # ---------- Состояние синхронизации ----------
+
+    @property
+    def state_file(self) -> Path:
+        return self.local.state_dir / "sync_state.json"
+
+    def _load_state(self) -> Dict[str, Any]:
+        return file_service.load_json(self.state_file) if self.state_file.exists() else {"peers": {}}
+
+    # ---------- Синхронизация ----------
+
+    def _diff(self, transport, node: str, report: SyncReport,
+              out: List[Tuple[str, Optional[str], Optional[str]]]) -> None:
+        mine = self.local.tree_hashes(node)
+        theirs = transport.tree_hashes(node)
+        report.exchanges += 1
+        for name in sorted(set(mine) | set(theirs)):
+            ours_entry, their_entry = mine.get(name), theirs.get(name)
+            if ours_entry and their_entry and ours_entry[0] == their_entry[0]:
+                continue
+            child = f"{node}/{name}" if node else name
+            if (ours_entry or their_entry)[1]:
+                out.append((_key_from_tree(child), ours_entry and ours_entry[0], their_entry and their_entry[0]))
+            else:
+                self._diff(transport, child, report, out)
+
+    @staticmethod
+    def _canonical(key: str, content: bytes) -> bytes:
+        """Содержимое в том виде, в каком его записывают сервисы приложения"""
+        kind, name = key.split("/", 1)
+        if kind == "diary":
+            return json_codec.dumps(Day(**json_codec.loads(content)).model_dump(by_alias=True))
+        if kind == "projects":
+            from services.project_service import project_service
+            project = project_service._migrate_old_format(json_codec.loads(content), name[:-len(".json")])
+            return json_codec.dumps(project.dict(by_alias=True))
+        return content
+
+    @staticmethod
+    def _day_document(raw_document: Optional[bytes], content: Optional[Tuple[bytes, int]],
+                      site: str) -> DayDocument:
+        """CRDT-документ стороны с учётом правок файла дня после прошлой синхронизации.
+
+        Правки получают метку времени изменения файла - так более поздняя
+        правка одного и того же поля побеждает."""
+        document = DayDocument(json_codec.loads(raw_document)) if raw_document else DayDocument()
+        if content is not None:
+            day = Day(**json_codec.loads(content[0]))
+            document.reconcile(day, document.next_stamp(site, content[1] // 1_000_000))
+        return document
+
+    def _resolve(self, key: str, base: Optional[str], ours: Optional[Tuple[bytes, int]],
+                 theirs: Optional[Tuple[bytes, int]], peer: str, report: SyncReport,
+                 document: Optional[DayDocument] = None) -> Optional[bytes]:
+        """Итоговое содержимое ключа (None - удалить с обеих сторон)"""
+        our_hash = hashlib.sha256(ours[0]).hexdigest() if ours else None
+        their_hash = hashlib.sha256(theirs[0]).hexdigest() if theirs else None
+
+        if our_hash == base:
+            report.pulled.append(key)
+            return theirs[0] if theirs else None
+        if their_hash == base:
+            report.pushed.append(key)
+            return ours[0] if ours else None
+        if ours is None or theirs is None:
+            # Удалено с одной стороны и изменено с другой - изменение важнее
+            report.merged.append(key)
+            return (ours or theirs)[0]
+
+        report.merged.append(key)
+        if document is not None:
+            # День изменён с обеих сторон - слияние CRDT-документов по полям задач
+            return json_codec.dumps(document.materialize().model_dump(by_alias=True))
+
+        # Проекты и конфигурация: побеждает более новый файл, второй сохраняется рядом
+        winner, loser = (theirs, ours) if theirs[1] > ours[1] else (ours, theirs)
+        conflict_path = self.local._path(key).with_name(f"{key.split('/', 1)[1]}.conflict-{peer[:8]}")
+        file_service.save_bytes(conflict_path, loser[0])
+        report.conflicts.append(str(conflict_path))
+        return winner[0]
+
+    def sync(self, transport, dry_run: bool = False) -> SyncReport:
+        """Синхронизировать локальные данные с партнёром через транспорт"""
+        peer = transport.hello()
+        if peer == self.local.replica_id:
+            raise DataValidationError("Нельзя синхронизировать копию данных саму с собой")
+
+        self.local.refresh()
+        state = self._load_state()
+        peer_state = state["peers"].get(peer, {})
+        base: Dict[str, str] = peer_state.get("hashes", {})
+        report = SyncReport(peer=peer)
+
+        differences: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self._diff(transport, "", report, differences)
+        if dry_run:
+            for key, our_hash, their_hash in differences:
+                target = report.pulled if our_hash == base.get(key) else \
+                    report.pushed if their_hash == base.get(key) else report.merged
+                target.append(key)
+            return report
+
+        # Общее состояние после синхронизации: совпавшие ключи - как в начале,
+        # разрешённые - итоговый хеш (правки, сделанные во время синхронизации, сюда не попадут)
+        hashes = self.local.tree_leaves()
+        for key, _, _ in differences:
+            try:
+                ours, theirs = self.local.read(key), transport.read(key)
+                if theirs:
+                    report.bytes_received += len(theirs[0])
+                kind, name = key.split("/", 1)
+                document = None
+                if kind == "diary":
+                    document = DayDocument.merge(
+                        self._day_document(self.local.read_document(name), ours, self.local.replica_id),
+                        self._day_document(transport.read_document(name), theirs, peer))
+                final = self._resolve(key, base.get(key), ours, theirs, peer, report, document)
+                if final is not None:
+                    final = self._canonical(key, final)
+                final_hash = hashlib.sha256(final).hexdigest() if final is not None else None
+                synced_hash = final_hash
+
+                for side, current in ((self.local, ours), (transport, theirs)):
+                    current_hash = hashlib.sha256(current[0]).hexdigest() if current else None
+                    if current_hash == final_hash:
+                        continue
+                    if final is None:
+                        side.delete(key)
+                    else:
+                        side.write(key, final)
+                        if side is transport:
+                            report.bytes_sent += len(final)
+
+                if document is not None and final is not None:
+                    # Документ обеих сторон должен давать ровно итоговый день
+                    document.reconcile(Day(**json_codec.loads(final)), document.next_stamp(self.local.replica_id))
+                    raw_document = json_codec.dumps_compact(document.to_dict())
+                    self.local.write_document(name, raw_document)
+                    transport.write_document(name, raw_document)
+            except (DailyTrackerError, OSError, ValueError) as e:
+                report.errors.append(f"{key}: {e}")
+                synced_hash = base.get(key)
+
+            if synced_hash is None:
+                hashes.pop(key, None)
+            else:
+                hashes[key] = synced_hash
+        state["peers"][peer] = {"synced_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                                "hashes": hashes}
+        file_service.save_bytes(self.state_file, json_codec.dumps_compact(state))
+        return report
+
+
+# Глобальный экземпляр сервиса
+sync_service = SyncService()
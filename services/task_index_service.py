@@ -0,0 +1,230 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from core.constants import DAY_PERIODS
+from core.exceptions import FileOperationError
+from models.diary import Day
+from services.search_service import INDEX_DIR
+from services.watcher_service import FileChange, watcher_service
+
+SCHEMA_VERSION = "2"
+
+
+class TaskLocation(NamedTuple):
+    """Где лежит задача"""
+    task_id: str
+    date: str
+    period: str
+    position: int
+    status: str
+    progress: int
+    category: str
+
+    def is_unfinished(self) -> bool:
+        return self.status == "☐" or self.progress < 100
+
+
+class TaskIndexService:
+    """Индекс задач по Task.id: id -> день и период.
+
+    Поддерживается при каждом сохранении и удалении дня, поэтому найти задачу
+    или выбрать задачи диапазона дат можно одним запросом без чтения файлов."""
+
+    def __init__(self, index_path: Optional[Path] = None):
+        self.index_path = index_path or INDEX_DIR / "tasks.sqlite3"
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Сверка с файлами на диске выполняется один раз за процесс
+        self._reconciled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открыть базу индекса и создать схему при необходимости"""
+        if self._conn is not None:
+            return self._conn
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema(conn)
+        except sqlite3.Error as e:
+            raise FileOperationError(f"Ошибка открытия индекса задач {self.index_path}: {e}")
+
+        self._conn = conn
+        return conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection, drop: bool = False) -> None:
+        """Создать таблицы индекса; drop - пересоздать их (схема могла измениться)"""
+        if drop:
+            conn.executescript("""
+                DROP TABLE IF EXISTS tasks;
+                DROP TABLE IF EXISTS versions;
+            """)
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT, date TEXT, period TEXT, position INTEGER,
+                status TEXT, progress INTEGER, category TEXT,
+                PRIMARY KEY (task_id, date)
+            );
+            CREATE INDEX IF NOT EXISTS tasks_date ON tasks(date);
+            CREATE TABLE IF NOT EXISTS versions (date TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+        """)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._connect().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _versions(self) -> Dict[str, Tuple[int, int]]:
+        """Версии файлов (mtime, size), по которым проиндексированы дни"""
+        rows = self._connect().execute("SELECT date, mtime_ns, size FROM versions")
+        return {day_date: (mtime_ns, size) for day_date, mtime_ns, size in rows}
+
+    # ---------- Обновление индекса ----------
+
+    @staticmethod
+    def _day_rows(day_date: str, day_data: Day) -> Iterable[tuple]:
+        for period in DAY_PERIODS:
+            for position, task in enumerate(day_data.get_tasks_by_period(period)):
+                yield task.id, day_date, period, position, task.status, task.progress, task.category
+
+    def _replace_day(self, conn: sqlite3.Connection, day_date: str, rows: Iterable[tuple],
+                     version: Optional[Tuple[int, int]]) -> None:
+        conn.execute("DELETE FROM tasks WHERE date = ?", (day_date,))
+        # Повтор id внутри одного дня (ручная правка файла) не должен ломать индекс
+        conn.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        if version is None:
+            conn.execute("DELETE FROM versions WHERE date = ?", (day_date,))
+        else:
+            conn.execute("INSERT OR REPLACE INTO versions VALUES (?, ?, ?)", (day_date, *version))
+
+    def index_day(self, day_date: str, day_data: Day, version: Optional[Tuple[int, int]] = None) -> None:
+        """Переиндексировать один день; version - версия файла, из которого прочитан день"""
+        if version is None:
+            from services.diary_service import diary_service
+            version = diary_service.day_version(day_date)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_day(conn, day_date, self._day_rows(day_date, day_data), version)
+
+    def remove_day(self, day_date: str) -> None:
+        """Удалить день из индекса"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._replace_day(conn, day_date, [], None)
+
+    def rebuild(self) -> int:
+        """Полная перестройка индекса по всем дням"""
+        from services.diary_service import diary_service
+
+        indexed = 0
+        with self._lock:
+            conn = self._connect()
+            self._create_schema(conn, drop=True)
+            with conn:
+                for day_date, version in diary_service.day_versions().items():
+                    try:
+                        day_data = diary_service.load_day(day_date)
+                    except Exception as e:
+                        print(f"Ошибка индексации задач дня {day_date}: {e}")
+                        continue
+                    self._replace_day(conn, day_date, self._day_rows(day_date, day_data), version)
+                    indexed += 1
+                self._set_meta("schema_version", SCHEMA_VERSION)
+            self._reconciled = True
+        return indexed
+
+    def reconcile(self) -> int:
+        """Догнать файлы дней, изменённые, пока приложение было закрыто; возвращает число дней"""
+        from services.diary_service import diary_service
+
+        with self._lock:
+            count = diary_service.catch_up_index(self, self._versions())
+            self._reconciled = True
+        return count
+
+    def ensure_built(self) -> None:
+        """Построить индекс при первом использовании, при первом обращении в процессе - сверить с файлами"""
+        with self._lock:
+            if self._get_meta("schema_version") != SCHEMA_VERSION:
+                self.rebuild()
+            elif not self._reconciled:
+                self.reconcile()
+
+    def handle_change(self, change: FileChange) -> None:
+        """Обновление индекса при внешнем изменении файлов дней"""
+        if change.kind != "day":
+            return
+        from services.diary_service import diary_service
+        if change.key == "*":
+            self.rebuild()
+        elif change.deleted or not diary_service.day_exists(change.key):
+            self.remove_day(change.key)
+        else:
+            self.index_day(change.key, diary_service.load_day(change.key))
+
+    # ---------- Запросы ----------
+
+    def _query(self, sql: str, params: Iterable) -> List[TaskLocation]:
+        with self._lock:
+            self.ensure_built()
+            try:
+                return [TaskLocation(*row) for row in self._connect().execute(sql, list(params))]
+            except sqlite3.Error as e:
+                raise FileOperationError(f"Ошибка запроса к индексу задач: {e}")
+
+    def locate(self, task_id: str) -> Optional[TaskLocation]:
+        """Где сейчас задача; при повторе id в разных днях - самый поздний день"""
+        return self.locate_many([task_id]).get(task_id)
+
+    def locate_many(self, task_ids: List[str]) -> Dict[str, TaskLocation]:
+        """Положение нескольких задач одним запросом"""
+        located: Dict[str, TaskLocation] = {}
+        unique = list(dict.fromkeys(task_ids))
+        # Ограничение SQLite на число параметров - запрашиваем порциями
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = self._query(f"SELECT * FROM tasks WHERE task_id IN ({','.join('?' * len(chunk))}) "
+                               f"ORDER BY date", chunk)
+            located.update((row.task_id, row) for row in rows)
+        return located
+
+    def find_tasks(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                   unfinished: bool = False, periods: Optional[List[str]] = None,
+                   categories: Optional[List[str]] = None) -> List[TaskLocation]:
+        """Задачи диапазона дат в порядке дней и периодов"""
+        conditions, params = [], []
+        if date_from:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("date <= ?")
+            params.append(date_to)
+        if unfinished:
+            conditions.append("(status = '☐' OR progress < 100)")
+        if periods:
+            conditions.append(f"period IN ({','.join('?' * len(periods))})")
+            params.extend(periods)
+        if categories:
+            conditions.append(f"category IN ({','.join('?' * len(categories))})")
+            params.extend(categories)
+
+        sql = "SELECT * FROM tasks"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        rows = self._query(sql + " ORDER BY date, position", params)
+        order = {period: index for index, period in enumerate(DAY_PERIODS)}
+        return sorted(rows, key=lambda row: (row.date, order.get(row.period, len(order)), row.position))
+
+
+# Глобальный экземпляр сервиса
+task_index_service = TaskIndexService()
+watcher_service.subscribe(task_index_service.handle_change)
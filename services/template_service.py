@@ -0,0 +1,133 @@
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from core.constants import PROJECT_TEMPLATES_DIR, TEMPLATE_DIR
+from core.exceptions import FileOperationError, TemplateError
+from models.diary import Day
+from models.projects import Project
+from services.file_service import file_service
+
+PLACEHOLDER_DATE = "{{дата}}"
+PLACEHOLDER_UUID = "{{uuid}}"
+
+# Путь к полю внутри модели: имена атрибутов и индексы списков
+FieldPath = Tuple[Any, ...]
+
+
+def _find_placeholders(obj: Any, path: FieldPath, found: List[Tuple[FieldPath, str]]) -> None:
+    """Записать пути ко всем строкам с плейсхолдерами"""
+    if isinstance(obj, BaseModel):
+        for field_name in type(obj).model_fields:
+            _find_placeholders(getattr(obj, field_name), path + (field_name,), found)
+    elif isinstance(obj, list):
+        for index, item in enumerate(obj):
+            _find_placeholders(item, path + (index,), found)
+    elif isinstance(obj, str) and "{{" in obj:
+        found.append((path, obj))
+
+
+def _set_path(root: Any, path: FieldPath, value: Any) -> None:
+    target = root
+    for step in path[:-1]:
+        target = target[step] if isinstance(step, int) else getattr(target, step)
+    if isinstance(path[-1], int):
+        target[path[-1]] = value
+    else:
+        setattr(target, path[-1], value)
+
+
+class CompiledTemplate:
+    """Проверенный шаблон с заранее найденными плейсхолдерами"""
+
+    def __init__(self, skeleton: BaseModel, signature: Tuple[int, int]):
+        self.skeleton = skeleton
+        self.signature = signature
+        self.placeholders: List[Tuple[FieldPath, str]] = []
+        _find_placeholders(skeleton, (), self.placeholders)
+
+    def fill(self, values: Dict[str, str]) -> BaseModel:
+        """Копия скелета с подставленными значениями"""
+        instance = self.skeleton.model_copy(deep=True)
+        for path, template_str in self.placeholders:
+            result = template_str
+            for placeholder, value in values.items():
+                result = result.replace(placeholder, value)
+            while PLACEHOLDER_UUID in result:
+                result = result.replace(PLACEHOLDER_UUID, str(uuid.uuid4()), 1)
+            _set_path(instance, path, result)
+        return instance
+
+
+class TemplateService:
+    """Реестр шаблонов дней и проектов: загрузка и проверка один раз, быстрое создание копий"""
+
+    def __init__(self):
+        self.template_dirs = {"day": TEMPLATE_DIR, "project": PROJECT_TEMPLATES_DIR}
+        self._compiled: Dict[Tuple[str, str], CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def list_templates(self, kind: str) -> List[str]:
+        """Имена доступных шаблонов"""
+        return sorted(f.stem for f in file_service.list_files(self.template_dirs[kind], "*.json"))
+
+    def invalidate(self, kind: Optional[str] = None, name: Optional[str] = None) -> None:
+        """Сбросить скомпилированные шаблоны"""
+        with self._lock:
+            for key in list(self._compiled):
+                if (kind is None or key[0] == kind) and (name is None or key[1] == name):
+                    del self._compiled[key]
+
+    def _template_file(self, kind: str, name: str) -> Path:
+        return self.template_dirs[kind] / f"{name}.json"
+
+    def get(self, kind: str, name: str) -> CompiledTemplate:
+        """Скомпилированный шаблон; перекомпилируется при изменении файла"""
+        template_file = self._template_file(kind, name)
+        try:
+            stat = template_file.stat()
+        except OSError:
+            self.invalidate(kind, name)
+            raise FileOperationError(f"Шаблон {name} не найден")
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            compiled = self._compiled.get((kind, name))
+            if compiled is not None and compiled.signature == signature:
+                return compiled
+
+        compiled = CompiledTemplate(self._compile(kind, name, template_file), signature)
+        with self._lock:
+            self._compiled[(kind, name)] = compiled
+        return compiled
+
+    def _compile(self, kind: str, name: str, template_file: Path) -> BaseModel:
+        """Загрузка и проверка шаблона"""
+        template_data = file_service.load_json(template_file)
+        try:
+            if kind == "day":
+                return Day(**template_data)
+
+            from services.project_service import project_service
+            return project_service._migrate_old_format(template_data, name)
+        except Exception as e:
+            raise TemplateError(f"Ошибка в шаблоне {name}: {e}")
+
+    def instantiate_day(self, template_name: str, day_date: str) -> Day:
+        """Новый день из шаблона: копия скелета, дата и свежие ID задач"""
+        day_data = self.get("day", template_name).fill({PLACEHOLDER_DATE: day_date})
+        for period in (day_data.morning, day_data.day, day_data.evening):
+            for task in period:
+                task.id = str(uuid.uuid4())
+        return day_data
+
+    def instantiate_project(self, template_name: str, project_name: str) -> Project:
+        """Новый проект из шаблона"""
+        project_data = self.get("project", template_name).skeleton.model_copy(deep=True)
+        project_data.metadata.название = project_name
+        return project_data
+
+
+# Глобальный экземпляр сервиса
+template_service = TemplateService()
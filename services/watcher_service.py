@@ -0,0 +1,311 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from core.config import config
+from core.constants import DIARY_DIR, PROJECTS_DIR
+from core.instrumentation import instrumentation
+from core.validators import Validators
+from services.file_service import file_service
+from services.json_codec import json_codec
+
+# Сколько подписей своих записей помнить для каждого файла
+OWN_WRITE_HISTORY = 4
+
+
+class FileChange(NamedTuple):
+    """Изменение файла данных"""
+    kind: str  # "day", "project" или "config"
+    key: str  # дата дня, имя проекта или имя файла конфигурации; "*" - все файлы вида
+    path: Path
+    deleted: bool
+
+
+class _PollingBackend:
+    """Наблюдение за файлами через периодическое сканирование"""
+
+    def __init__(self, roots: List[Path], interval: float):
+        self.roots = roots
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """Снимок (mtime, size) всех файлов в наблюдаемых папках"""
+        snapshot = {}
+        for root in self.roots:
+            for dir_path, _, file_names in os.walk(root):
+                for file_name in file_names:
+                    path = Path(dir_path) / file_name
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, stop_event: threading.Event) -> Optional[List[Path]]:
+        """Дождаться изменений и вернуть изменённые пути"""
+        if stop_event.wait(self.interval):
+            return []
+
+        current = self._scan()
+        changed = [path for path, signature in current.items() if self._snapshot.get(path) != signature]
+        changed.extend(path for path in self._snapshot if path not in current)
+        self._snapshot = current
+        return changed
+
+    def close(self) -> None:
+        self._snapshot = {}
+
+
+class _InotifyBackend:
+    """Наблюдение за файлами через inotify (Linux)"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0x00000800
+    IN_CLOEXEC = 0x00080000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, roots: List[Path], interval: float):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.interval = interval
+        self._watches: Dict[int, Path] = {}
+        for root in roots:
+            self._add_tree(root)
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), self.WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def _add_tree(self, root: Path) -> List[Path]:
+        """Подписаться на папку и все вложенные, вернуть найденные в них файлы"""
+        found = []
+        for dir_path, _, file_names in os.walk(root):
+            self._add_watch(Path(dir_path))
+            found.extend(Path(dir_path) / name for name in file_names)
+        return found
+
+    def poll(self, stop_event: threading.Event) -> Optional[List[Path]]:
+        """Дождаться событий inotify; None означает переполнение очереди"""
+        ready, _, _ = select.select([self._fd], [], [], self.interval)
+        if not ready or stop_event.is_set():
+            return []
+
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(buffer, offset)
+            offset += self.EVENT_HEADER.size
+            name = buffer[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                # Новые вложенные папки (например, шарды по годам) тоже наблюдаем
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    changed.extend(self._add_tree(path))
+                continue
+
+            if mask & self.IN_CREATE:
+                # Содержимое появится вместе с IN_CLOSE_WRITE
+                continue
+            changed.append(path)
+
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class WatcherService:
+    """Сервис наблюдения за внешними изменениями файлов данных"""
+
+    def __init__(self):
+        self.roots: Dict[Path, str] = {
+            DIARY_DIR: "day",
+            PROJECTS_DIR: "project",
+            config.config_dir: "config",
+        }
+        self._subscribers: List[Callable[[FileChange], None]] = []
+        self._generations: Dict[Tuple[str, str], int] = {}
+        # Подписи последних своих записей каждого файла: событие о предыдущей
+        # записи может прийти, когда подпись следующей уже зарегистрирована
+        self._own_writes: Dict[Path, List[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.backend_name: Optional[str] = None
+
+        file_service.add_write_listener(self.record_own_write)
+
+    def subscribe(self, callback: Callable[[FileChange], None]) -> None:
+        """Подписка на изменения файлов"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def generation(self, kind: str, key: str) -> int:
+        """Номер поколения файла: растёт при каждом внешнем изменении"""
+        with self._lock:
+            return self._generations.get((kind, key), 0) + self._generations.get((kind, "*"), 0)
+
+    def record_own_write(self, file_path: Path, signature: Tuple[int, int]) -> None:
+        """Запомнить запись самим приложением, чтобы не считать её внешней"""
+        with self._lock:
+            signatures = self._own_writes.setdefault(file_path, [])
+            signatures.append(signature)
+            del signatures[:-OWN_WRITE_HISTORY]
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Запуск наблюдателя в фоновом потоке (повторный вызов ничего не делает)"""
+        settings = config.watcher
+        if not settings['enabled'] or self.is_running():
+            return
+
+        backend = self._create_backend(settings['backend'], float(settings['poll_interval']))
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(backend,), name="file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Остановка наблюдателя"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _create_backend(self, backend_name: str, interval: float):
+        """Выбор механизма наблюдения: inotify на Linux, иначе опрос"""
+        roots = [root for root in self.roots if root.exists()]
+
+        if backend_name in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                backend = _InotifyBackend(roots, interval)
+                self.backend_name = "inotify"
+                return backend
+            except (OSError, AttributeError) as e:
+                print(f"⚠️ inotify недоступен, используется опрос: {e}")
+
+        self.backend_name = "polling"
+        return _PollingBackend(roots, interval)
+
+    def _run(self, backend) -> None:
+        try:
+            while not self._stop_event.is_set():
+                paths = backend.poll(self._stop_event)
+                if paths is None:
+                    self._dispatch([FileChange(kind, "*", root, False) for root, kind in self.roots.items()])
+                elif paths:
+                    self.notify_paths(paths)
+        finally:
+            backend.close()
+
+    def notify_paths(self, paths: List[Path]) -> None:
+        """Обработать изменённые пути (вызывается наблюдателем или вручную)"""
+        changes = {}
+        for path in paths:
+            change = self._classify(path)
+            if change is not None and not self._is_own_write(path):
+                changes[(change.kind, change.key)] = change
+        if changes:
+            self._dispatch(list(changes.values()))
+
+    def _is_own_write(self, file_path: Path) -> bool:
+        # Сначала stat, потом подписи: подпись записи регистрируется до её переименования
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        with self._lock:
+            return (stat.st_mtime_ns, stat.st_size) in self._own_writes.get(file_path, ())
+
+    def _classify(self, file_path: Path) -> Optional[FileChange]:
+        """Определить, к какому дню, проекту или файлу конфигурации относится путь"""
+        name = file_path.name
+        if name.startswith(".") or name.endswith((".tmp", "~")):
+            return None
+
+        for root, kind in self.roots.items():
+            try:
+                file_path.relative_to(root)
+            except ValueError:
+                continue
+
+            deleted = not file_path.exists()
+            if kind == "config":
+                if file_path.suffix in (".yaml", ".yml"):
+                    return FileChange(kind, name, file_path, deleted)
+                return None
+
+            if file_path.suffix != ".json":
+                return None
+            if kind == "day" and not Validators.validate_date_format(file_path.stem):
+                return None
+            if kind == "day" and deleted:
+                from services.diary_service import diary_service
+                if diary_service.day_exists(file_path.stem):
+                    # Файл перенесён в другую раскладку папок - сам день не изменился
+                    return None
+            return FileChange(kind, file_path.stem, file_path, deleted)
+
+        return None
+
+    def _dispatch(self, changes: List[FileChange]) -> None:
+        with self._lock:
+            for change in changes:
+                generation_key = (change.kind, change.key)
+                self._generations[generation_key] = self._generations.get(generation_key, 0) + 1
+
+        for change in changes:
+            if change.kind == "config" and change.key in (config.config_path.name, "*"):
+                config.reload()
+                instrumentation.configure()
+                json_codec.configure()
+            for callback in list(self._subscribers):
+                try:
+                    callback(change)
+                except Exception as e:
+                    print(f"Ошибка обработки изменения {change.path}: {e}")
+
+
+# Глобальный экземпляр сервиса
+watcher_service = WatcherService()
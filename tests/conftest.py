@@ -0,0 +1,70 @@
+import pytest
+from pathlib import Path
+from core.config import config
+from core.vocabulary import vocabulary
+from models.diary import Day, Task
+from services.archive_service import archive_service
+from services.backup_service import backup_service
+from services.carryover_service import carryover_service
+from services.diary_service import diary_service
+from services.habit_service import habit_service
+from services.project_service import project_service
+from services.search_service import search_service
+from services.summary_service import summary_service
+from services.task_index_service import task_index_service
+from services.watcher_service import watcher_service
+
+
+def make_task(name: str, time: str = "08:00-09:00", **fields) -> Task:
+    return Task(задача=name, время=time, **fields)
+
+
+def make_day(morning=(), day=(), evening=(), notes=()) -> Day:
+    return Day(Утро=list(morning), День=list(day), Вечер=list(evening), Заметки=list(notes))
+
+
+@pytest.fixture
+def data_dir(tmp_path: Path, monkeypatch) -> Path:
+    """Данные приложения во временной папке: дни, пакеты, индексы и снимки.
+
+    Глобальные экземпляры сервисов перенаправляются на tmp_path, поэтому
+    тесты не трогают data/ рабочей копии."""
+    data = tmp_path / "data"
+    diary_dir = data / "diary"
+    projects_dir = data / "projects"
+    index_dir = data / "index"
+    for directory in (diary_dir, projects_dir, index_dir):
+        directory.mkdir(parents=True)
+
+    monkeypatch.setattr(diary_service, "data_dir", diary_dir)
+    monkeypatch.setattr(project_service, "data_dir", projects_dir)
+    monkeypatch.setattr(watcher_service, "roots", {diary_dir: "day", projects_dir: "project"})
+    monkeypatch.setattr(archive_service, "pack_dir", diary_dir / "packs")
+    monkeypatch.setattr(archive_service, "_indexes", {})
+
+    indexes = (search_service, task_index_service, habit_service)
+    for index in indexes:
+        monkeypatch.setattr(index, "index_path", index_dir / index.index_path.name)
+        monkeypatch.setattr(index, "_conn", None)
+        monkeypatch.setattr(index, "_reconciled", False)
+    monkeypatch.setattr(habit_service, "_habits", None)
+    monkeypatch.setattr(summary_service, "summary_path", index_dir / summary_service.summary_path.name)
+    monkeypatch.setattr(summary_service, "_map", None)
+    monkeypatch.setattr(summary_service, "_map_key", None)
+    monkeypatch.setattr(summary_service, "_base", None)
+    monkeypatch.setattr(summary_service, "_reconciled", False)
+    monkeypatch.setattr(carryover_service, "state_path", index_dir / carryover_service.state_path.name)
+    # Словарь кодов перечитывается из пустой папки индексов при первом обращении
+    monkeypatch.setattr(vocabulary, "file_path", index_dir / vocabulary.file_path.name)
+    monkeypatch.setattr(vocabulary, "_loaded", None)
+
+    monkeypatch.setattr(backup_service, "data_dir", data)
+    monkeypatch.setattr(backup_service, "roots", [diary_dir, projects_dir])
+    monkeypatch.setitem(config._data, "backup", {"dir": str(tmp_path / "backups"), "keep": 0})
+
+    yield data
+
+    for index in indexes:
+        if index._conn is not None:
+            index._conn.close()
+    summary_service._close_map()
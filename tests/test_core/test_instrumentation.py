@@ -0,0 +1,71 @@
+import pytest
+
+from core.instrumentation import Histogram, instrumentation
+from services.diary_service import diary_service
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    monkeypatch.setattr(instrumentation, "enabled", True)
+    instrumentation.reset()
+    yield instrumentation
+    instrumentation.reset()
+
+
+def _operation(snapshot, name):
+    return next(op for op in snapshot["operations"] if op["name"] == name)
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = Histogram()
+    for elapsed_ms in (0.05, 0.3, 0.3, 7, 20000):
+        histogram.observe(elapsed_ms, elapsed_ms)
+
+    assert histogram.count == 5
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(1.0) == 20000
+
+
+def test_disabled_instrumentation_records_nothing(data_dir, monkeypatch):
+    monkeypatch.setattr(instrumentation, "enabled", False)
+    instrumentation.reset()
+
+    diary_service.save_day("2030-01-07", make_day(morning=[make_task("Планёрка")]))
+
+    assert instrumentation.snapshot()["operations"] == []
+
+
+def test_nested_timers_split_self_time(metrics):
+    with metrics.timed("outer"):
+        with metrics.timed("inner", stage="io"):
+            sum(range(100000))
+
+    snapshot = metrics.snapshot()
+    outer = _operation(snapshot, "outer")
+    inner = _operation(snapshot, "inner")
+    assert outer["total_ms"] >= inner["total_ms"]
+    assert outer["self_ms"] <= outer["total_ms"] - inner["total_ms"] + 0.01
+    assert snapshot["stage_totals_ms"]["io"] == inner["self_ms"]
+
+
+def test_service_calls_record_latency_and_bytes(data_dir, metrics):
+    diary_service.save_day("2030-01-07", make_day(morning=[make_task("Планёрка")]))
+    diary_service.load_day("2030-01-07")
+
+    snapshot = metrics.snapshot()
+    assert _operation(snapshot, "diary.save_day")["count"] == 1
+    assert _operation(snapshot, "diary.load_day")["count"] == 1
+    written = {item["name"]: item["bytes"] for item in snapshot["bytes"] if item["direction"] == "written"}
+    assert written and all(size > 0 for size in written.values())
+
+
+def test_prometheus_buckets_are_cumulative(metrics):
+    for _ in range(3):
+        with metrics.timed("op"):
+            pass
+
+    text = metrics.to_prometheus()
+
+    assert 'daily_tracker_operation_seconds_bucket{operation="op",stage="service",le="+Inf"} 3' in text
+    assert 'daily_tracker_operation_seconds_count{operation="op",stage="service"} 3' in text
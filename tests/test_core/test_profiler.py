@@ -0,0 +1,29 @@
+import marshal
+
+from core.profiler import profile_call
+
+
+def _busy():
+    return [str(i) for i in range(20000)]
+
+
+def test_profile_reports_functions_and_memory():
+    result = profile_call(_busy, top=5)
+
+    assert result.error == ""
+    assert result.wall_ms > 0
+    assert result.peak_memory > 0
+    assert len(result.functions) <= 5
+    assert any("_busy" in row["function"] for row in result.functions)
+    assert marshal.loads(result.raw)
+
+
+def test_profile_keeps_statistics_when_call_fails():
+    def failing():
+        _busy()
+        raise ValueError("сбой")
+
+    result = profile_call(failing)
+
+    assert result.error == "ValueError: сбой"
+    assert result.functions
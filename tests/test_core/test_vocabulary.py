@@ -0,0 +1,62 @@
+import json
+
+from core.constants import CATEGORIES, TASK_STATUSES
+from core.vocabulary import VocabularyRegistry, vocabulary
+from tests.conftest import make_day, make_task
+
+
+def test_file_is_read_and_written_on_first_use(tmp_path):
+    file_path = tmp_path / "vocabulary.json"
+    registry = VocabularyRegistry(file_path)
+    assert not file_path.exists()
+
+    assert registry.statuses.code_of(TASK_STATUSES[0]) == 0
+    assert file_path.exists()
+
+
+def test_codes_are_stable_across_restarts(tmp_path):
+    file_path = tmp_path / "vocabulary.json"
+    registry = VocabularyRegistry(file_path)
+    code = registry.categories.code("🎸 Музыка")
+
+    reloaded = VocabularyRegistry(file_path)
+
+    assert reloaded.categories.code_of("🎸 Музыка") == code
+    assert reloaded.categories.name(code) == "🎸 Музыка"
+    assert json.loads(file_path.read_text(encoding="utf-8"))["statuses"] == TASK_STATUSES
+
+
+def test_lookups_do_not_register_values(tmp_path):
+    registry = VocabularyRegistry(tmp_path / "vocabulary.json")
+
+    assert registry.categories.code_of("Опечатка") is None
+    assert registry.categories.key("Опечатка") == "Опечатка"
+    assert registry.categories.label(registry.categories.key(CATEGORIES[1])) == CATEGORIES[1]
+    assert "Опечатка" not in registry.categories
+
+
+def test_options_hold_builtin_and_current_values_only(tmp_path):
+    registry = VocabularyRegistry(tmp_path / "vocabulary.json")
+    categories = registry.categories
+    categories.code("Старая опечатка")
+    current = categories.code("🎸 Музыка")
+
+    options = categories.options(["🎸 Музыка", "Не зарегистрирована", CATEGORIES[0], ""])
+
+    assert [categories.label(key) for key in options] == CATEGORIES + ["🎸 Музыка", "Не зарегистрирована"]
+    assert current in options
+    for name in (CATEGORIES[2], "🎸 Музыка", "Не зарегистрирована"):
+        assert categories.label(categories.options([name])[categories.index(name)]) == name
+    assert categories.index("") == 0
+
+
+def test_category_progress_does_not_register_categories(data_dir):
+    day = make_day(morning=[make_task("a", категория="Опечтка-категории", прогресс=40),
+                            make_task("b", категория="Опечтка-категории", прогресс=60),
+                            make_task("c", прогресс=10)])
+
+    progress = day.calculate_category_progress()
+
+    assert progress["Опечтка-категории"] == 50
+    assert progress[day.morning[2].category] == 10
+    assert "Опечтка-категории" not in vocabulary.categories
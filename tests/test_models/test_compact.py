@@ -0,0 +1,46 @@
+from models.compact import CompactHistory
+from tests.conftest import make_day, make_task
+
+
+def test_get_day_is_lossless(data_dir):
+    day = make_day(
+        morning=[make_task("Зарядка", статус="✅", прогресс=100)],
+        day=[make_task("Без интервала", "весь день", id="not-a-uuid")],
+        notes=["заметка"],
+    )
+    day.state.set_value("😌 Настроение", "7", "scale_1_10")
+
+    history = CompactHistory.from_days([("2024-03-01", day)])
+
+    assert history.get_day("2024-03-01").model_dump(by_alias=True) == day.model_dump(by_alias=True)
+
+
+def test_en_dash_intervals_are_packed_and_restored(data_dir):
+    day = make_day(morning=[make_task("Тире", "09:00–10:00"), make_task("Дефис", "10:00-11:30")])
+
+    history = CompactHistory.from_days([("2024-03-01", day)])
+
+    assert history._raw_times == {}
+    assert [task.time for task in history.get_day("2024-03-01").morning] == ["09:00–10:00", "10:00-11:30"]
+    assert [(task.start, task.end) for task in history.iter_tasks("2024-03-01")] == [(540, 600), (600, 690)]
+
+
+def test_category_progress_matches_day(data_dir):
+    day = make_day(morning=[make_task("a", прогресс=40), make_task("b", прогресс=60),
+                            make_task("c", категория="🩺 Здоровье", прогресс=10)])
+
+    history = CompactHistory.from_days([("2024-03-01", day)])
+
+    assert history.category_progress("2024-03-01") == day.calculate_category_progress()
+
+
+def test_origin_is_kept_only_where_set(data_dir):
+    origin = "7d3c2a7e-1111-4a4a-8b8b-000000000000"
+    history = CompactHistory.from_days([
+        ("2024-03-01", make_day(morning=[make_task("Обычная")])),
+        ("2024-03-02", make_day(morning=[make_task("Обычная"), make_task("Перенесённая", источник=origin)])),
+    ])
+
+    assert [task.origin for task in history.get_day("2024-03-01").morning] == [None]
+    assert [task.origin for task in history.get_day("2024-03-02").morning] == [None, origin]
+    assert history._origins == {2: origin}
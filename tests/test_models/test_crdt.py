@@ -0,0 +1,109 @@
+import copy
+from models.crdt import DayDocument, key_between
+from tests.conftest import make_day, make_task
+
+
+def _document(day, site: str = "a", wall_ms: int = 1000) -> DayDocument:
+    document = DayDocument()
+    document.reconcile(day, document.next_stamp(site, wall_ms))
+    return document
+
+
+def _edited(document: DayDocument, day, site: str, wall_ms: int) -> DayDocument:
+    edited = DayDocument(copy.deepcopy(document.to_dict()))
+    edited.reconcile(day, edited.next_stamp(site, wall_ms))
+    return edited
+
+
+def _base_and_replicas():
+    first, second = make_task("Зарядка"), make_task("Почта", "10:00-11:00")
+    base = _document(make_day(morning=[first, second], notes=["заметка"]))
+
+    ours = make_day(morning=[first.model_copy(update={"status": "✅", "progress": 100}), second],
+                    notes=["заметка"])
+    theirs = make_day(morning=[first, second.model_copy(update={"time": "12:00-13:00"})],
+                      evening=[make_task("Чтение")], notes=["заметка", "вторая"])
+    return base, _edited(base, ours, "a", 2000), _edited(base, theirs, "b", 3000)
+
+
+def test_merge_is_commutative():
+    _, a, b = _base_and_replicas()
+    assert DayDocument.merge(a, b).to_dict() == DayDocument.merge(b, a).to_dict()
+
+
+def test_merge_is_idempotent():
+    _, a, b = _base_and_replicas()
+    merged = DayDocument.merge(a, b)
+    assert DayDocument.merge(merged, merged).to_dict() == merged.to_dict()
+    assert DayDocument.merge(merged, a).to_dict() == merged.to_dict()
+
+
+def test_merge_is_associative():
+    base, a, b = _base_and_replicas()
+    left = DayDocument.merge(DayDocument.merge(base, a), b)
+    right = DayDocument.merge(base, DayDocument.merge(a, b))
+    assert left.to_dict() == right.to_dict()
+
+
+def test_merge_keeps_edits_of_different_fields():
+    _, a, b = _base_and_replicas()
+    day = DayDocument.merge(a, b).materialize()
+
+    first, second = day.morning
+    assert (first.status, first.progress) == ("✅", 100)
+    assert second.time == "12:00-13:00"
+    assert [task.task for task in day.evening] == ["Чтение"]
+    assert day.notes == ["заметка", "вторая"]
+
+
+def test_later_edit_of_same_field_wins():
+    task = make_task("Зарядка")
+    base = _document(make_day(morning=[task]))
+    early = _edited(base, make_day(morning=[task.model_copy(update={"progress": 30})]), "a", 2000)
+    late = _edited(base, make_day(morning=[task.model_copy(update={"progress": 70})]), "b", 3000)
+
+    assert DayDocument.merge(early, late).materialize().morning[0].progress == 70
+
+
+def test_reconcile_same_day_is_noop():
+    day = make_day(morning=[make_task("Зарядка")], notes=["заметка"])
+    document = _document(day)
+    before = copy.deepcopy(document.to_dict())
+
+    assert document.reconcile(day, document.next_stamp("a", 5000)) is False
+    assert document.to_dict() == before
+
+
+def test_reconcile_round_trips_day():
+    day = make_day(morning=[make_task("Зарядка"), make_task("Почта")],
+                   evening=[make_task("Чтение", источник="7d3c2a7e-1111-4a4a-8b8b-000000000000")],
+                   notes=["заметка"])
+    day.state.set_value("😌 Настроение", "7", "scale_1_10")
+
+    assert _document(day).materialize().model_dump(by_alias=True) == day.model_dump(by_alias=True)
+
+
+def test_deleted_task_stays_deleted_after_merge():
+    task = make_task("Зарядка")
+    base = _document(make_day(morning=[task]))
+    deleted = _edited(base, make_day(), "a", 2000)
+
+    assert DayDocument.merge(base, deleted).materialize().morning == []
+    assert DayDocument.merge(deleted, base).materialize().morning == []
+
+
+def test_move_between_periods_is_atomic():
+    task = make_task("Зарядка")
+    base = _document(make_day(morning=[task]))
+    moved = _edited(base, make_day(evening=[task]), "a", 2000)
+
+    day = DayDocument.merge(base, moved).materialize()
+    assert day.morning == []
+    assert [item.id for item in day.evening] == [task.id]
+
+
+def test_key_between_orders_keys():
+    first = key_between("", None)
+    second = key_between(first, None)
+    middle = key_between(first, second)
+    assert first < middle < second
@@ -0,0 +1,27 @@
+from models.diary import Day
+from models.state import DayState
+
+
+def test_only_real_changes_mark_state_dirty():
+    state = DayState()
+    state.set_value("Настроение", "7", "scale_1_10")
+    state.set_value("Сон", "8", "scale_1_10")
+    state.clear_dirty()
+
+    state.set_value("Настроение", "7", "scale_1_10")
+    assert not state.is_dirty()
+
+    state.set_value("Сон", "6", "scale_1_10")
+    assert state.dirty_categories() == {"Сон"}
+    assert state.get_value("Сон") == "6"
+
+
+def test_loaded_state_starts_clean_and_keeps_lookup_in_sync():
+    day_data = Day(**{"Состояние": {"значения": [{"category": "Сон", "value": "8"}]}})
+    assert not day_data.state.is_dirty()
+
+    # Список значений заменён целиком - поиск по категориям строится заново
+    day_data.state.values = []
+    day_data.state.set_value("Сон", "5", "text")
+    assert [value.value for value in day_data.state.values] == ["5"]
+    assert day_data.state.dirty_categories() == {"Сон"}
@@ -0,0 +1,84 @@
+import threading
+import pytest
+from services.analytics_service import analytics_service
+from services.diary_service import diary_service
+from services.json_codec import json_codec
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture
+def six_months(data_dir):
+    days = {}
+    for month in range(1, 7):
+        for number in (1, 15):
+            done = make_task("Зарядка", статус="✅", прогресс=100)
+            days[f"2023-{month:02d}-{number:02d}"] = make_day(morning=[done, make_task("Почта", прогресс=50)])
+    diary_service.save_days(days)
+    return days
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_counts_every_day(six_months, workers):
+    report = analytics_service.run(workers=workers)
+
+    assert report.days == len(six_months)
+    assert (report.shards_done, report.shards_total) == (6, 6)
+    assert not report.cancelled
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancel_returns_partial_report(six_months, workers):
+    cancel = threading.Event()
+
+    def progress(done: int, total: int) -> None:
+        if done == 1:
+            cancel.set()
+
+    report = analytics_service.run(workers=workers, progress=progress, cancel=cancel)
+
+    assert report.cancelled
+    assert 1 <= report.shards_done < report.shards_total
+    assert report.days == 2 * report.shards_done
+
+
+def test_date_range_limits_shards(six_months):
+    report = analytics_service.run("2023-02-01", "2023-03-31", workers=1)
+
+    assert report.days == 4
+    assert report.shards_total == 2
+
+
+def test_report_groups_by_category_and_status(six_months):
+    report = analytics_service.run(workers=1).to_dict()
+
+    categories = {row["category"]: row for row in report["categories"]}
+    charge = six_months["2023-01-01"].morning[0]
+    assert report["statuses"] == {"✅": 12, "☐": 12}
+    assert categories[charge.category]["tasks"] == 24
+    assert categories[charge.category]["done_rate"] == 50.0
+    assert report["monthly_trends"]["2023-03"] == {charge.category: 75.0}
+
+
+def _write_raw_day(day_date: str, task) -> None:
+    """Файл дня, который модель приняла бы с приведением типов или не приняла вовсе"""
+    diary_service.day_path(day_date).write_bytes(json_codec.dumps({"Утро": [task], "День": [], "Вечер": []}))
+
+
+def test_string_progress_is_coerced(six_months):
+    _write_raw_day("2023-01-20", {"задача": "Строка", "время": "08:00-09:00", "прогресс": "50"})
+
+    report = analytics_service.run(workers=2)
+
+    assert report.errors == []
+    assert report.days == len(six_months) + 1
+
+
+@pytest.mark.parametrize("task", ["не задача", {"задача": "Мусор", "время": "08:00-09:00", "прогресс": "много"}])
+def test_bad_day_is_reported_and_skipped(six_months, task):
+    _write_raw_day("2023-01-20", task)
+
+    report = analytics_service.run(workers=2)
+
+    assert report.shards_done == report.shards_total
+    assert report.days == len(six_months)
+    assert len(report.errors) == 1 and "2023-01-20" in report.errors[0]
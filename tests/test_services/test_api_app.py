@@ -0,0 +1,92 @@
+import asyncio
+import json
+from api.app import create_app
+from core.constants import DAY_PERIODS
+from services.diary_service import diary_service
+
+
+async def _call(app, method: str, path: str, body=None, headers=()):
+    """Один запрос к ASGI-приложению: (статус, заголовки, тело)"""
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"",
+             "headers": [(name.encode(), value.encode()) for name, value in headers]}
+    messages, received = [], False
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start, body_message = messages[0], messages[-1]
+    return (start["status"], {name.decode(): value.decode() for name, value in start["headers"]},
+            body_message.get("body", b""))
+
+
+def _task_count(day_date: str) -> int:
+    day_data = diary_service.load_day(day_date)
+    return sum(len(day_data.get_tasks_by_period(period)) for period in DAY_PERIODS)
+
+
+def test_concurrent_task_posts_are_not_lost(data_dir):
+    app = create_app(token="")
+
+    async def post_all():
+        return await asyncio.gather(*(
+            _call(app, "POST", "/days/2024-07-01/tasks", {"задача": f"Задача {number}", "время": "09:00-10:00"})
+            for number in range(20)))
+
+    responses = asyncio.run(post_all())
+
+    assert [status for status, _, _ in responses] == [201] * 20
+    assert _task_count("2024-07-01") == 20
+
+
+def test_stale_if_match_is_rejected(data_dir):
+    app = create_app(token="")
+
+    async def scenario():
+        status, headers, _ = await _call(app, "POST", "/days/2024-07-01/tasks",
+                                         {"задача": "Зарядка", "время": "08:00-09:00"})
+        assert status == 201
+        etag = headers["etag"]
+        await _call(app, "POST", "/days/2024-07-01/tasks", {"задача": "Почта", "время": "09:00-10:00"})
+        return await _call(app, "PUT", "/days/2024-07-01/state", {"values": {"Заметка": "1"}},
+                           headers=[("if-match", etag)])
+
+    status, _, _ = asyncio.run(scenario())
+
+    assert status == 412
+    assert _task_count("2024-07-01") == 2
+
+
+def test_token_is_required_when_configured(data_dir):
+    app = create_app(token="s3cret")
+
+    assert asyncio.run(_call(app, "GET", "/health"))[0] == 401
+    assert asyncio.run(_call(app, "GET", "/health", headers=[("authorization", "Bearer s3cres")]))[0] == 401
+    assert asyncio.run(_call(app, "GET", "/health", headers=[("authorization", "Bearer s3cret")]))[0] == 200
+
+
+def test_etag_revalidation_and_cache_invalidation(data_dir):
+    app = create_app(token="")
+
+    async def scenario():
+        await _call(app, "POST", "/days/2024-07-01/tasks", {"задача": "Зарядка", "время": "08:00-09:00"})
+        first = await _call(app, "GET", "/days/2024-07-01")
+        revalidated = await _call(app, "GET", "/days/2024-07-01", headers=[("if-none-match", first[1]["etag"])])
+        await _call(app, "POST", "/days/2024-07-01/tasks", {"задача": "Почта", "время": "09:00-10:00"})
+        changed = await _call(app, "GET", "/days/2024-07-01", headers=[("if-none-match", first[1]["etag"])])
+        return first, revalidated, changed
+
+    first, revalidated, changed = asyncio.run(scenario())
+
+    assert first[0] == 200 and "last-modified" in first[1]
+    assert revalidated[0] == 304 and revalidated[2] == b""
+    assert changed[0] == 200
+    assert [task["задача"] for task in json.loads(changed[2])["Утро"]] == ["Зарядка", "Почта"]
@@ -0,0 +1,77 @@
+import pytest
+from core.exceptions import DataValidationError, FileOperationError
+from services.archive_service import archive_service
+from services.diary_service import diary_service
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture
+def march(data_dir):
+    days = {f"2020-03-{number:02d}": make_day(morning=[make_task(f"Задача {number}")], notes=[f"день {number}"])
+            for number in range(1, 6)}
+    diary_service.save_days(days)
+    return days
+
+
+def test_pack_replaces_loose_files(march):
+    assert archive_service.pack("2020-03") == len(march)
+
+    assert archive_service.packed_days("2020-03") == sorted(march)
+    for day_date, day_data in march.items():
+        assert not diary_service.has_loose_file(day_date)
+        assert diary_service.day_exists(day_date)
+        assert diary_service.load_day(day_date).model_dump(by_alias=True) == day_data.model_dump(by_alias=True)
+    assert sorted(diary_service.list_days()) == sorted(march)
+
+
+def test_unpack_restores_loose_files(march):
+    archive_service.pack("2020-03")
+
+    assert archive_service.unpack("2020-03") == len(march)
+
+    assert not archive_service.pack_path("2020-03").exists()
+    for day_date, day_data in march.items():
+        assert diary_service.has_loose_file(day_date)
+        assert diary_service.load_day(day_date).model_dump(by_alias=True) == day_data.model_dump(by_alias=True)
+
+
+def test_loose_file_shadows_pack_and_survives_unpack(march):
+    archive_service.pack("2020-03")
+    edited = make_day(morning=[make_task("Правка после упаковки")])
+    diary_service.save_day("2020-03-02", edited)
+
+    assert diary_service.load_day("2020-03-02").model_dump(by_alias=True) == edited.model_dump(by_alias=True)
+    assert archive_service.unpack("2020-03") == len(march) - 1
+    assert diary_service.load_day("2020-03-02").model_dump(by_alias=True) == edited.model_dump(by_alias=True)
+
+
+def test_pack_merges_months_into_year(data_dir):
+    diary_service.save_day("2020-01-10", make_day(notes=["январь"]))
+    diary_service.save_day("2020-02-10", make_day(notes=["февраль"]))
+    archive_service.pack("2020-01")
+
+    assert archive_service.pack("2020") == 2
+    assert not archive_service.pack_path("2020-01").exists()
+    assert diary_service.load_day("2020-01-10").notes == ["январь"]
+    with pytest.raises(DataValidationError):
+        archive_service.pack("2020-02")
+
+
+def test_open_period_is_not_packed(data_dir):
+    with pytest.raises(DataValidationError):
+        archive_service.pack("2999-01")
+
+
+def test_delete_packed_day_is_refused(march):
+    archive_service.pack("2020-03")
+    diary_service.save_day("2020-03-01", make_day(notes=["правка"]))
+
+    with pytest.raises(FileOperationError):
+        diary_service.delete_day("2020-03-01")
+    assert diary_service.load_day("2020-03-01").notes == ["правка"]
+
+
+def test_delete_loose_day(march):
+    diary_service.delete_day("2020-03-01")
+
+    assert not diary_service.day_exists("2020-03-01")
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.exceptions import DayNotFoundError
+from services.async_service import AsyncService, async_service
+from services.diary_service import diary_service
+from tests.conftest import make_day, make_task
+
+
+def test_save_and_load_days_keep_requested_order(data_dir):
+    days = {f"2024-05-{number:02d}": make_day(morning=[make_task(f"Задача {number}")]) for number in (3, 1, 2)}
+
+    async def scenario():
+        await async_service.save_days(days)
+        return await async_service.load_days(["2024-05-02", "2024-05-09", "2024-05-01"], skip_missing=True)
+
+    loaded = asyncio.run(scenario())
+
+    assert list(loaded) == ["2024-05-02", "2024-05-01"]
+    assert loaded["2024-05-01"].morning[0].task == "Задача 1"
+    assert sorted(diary_service.list_days()) == ["2024-05-01", "2024-05-02", "2024-05-03"]
+
+
+def test_missing_day_raises_without_skip(data_dir):
+    with pytest.raises(DayNotFoundError):
+        asyncio.run(async_service.load_days(["2024-05-01"]))
+
+
+def test_concurrency_is_limited():
+    service = AsyncService(max_workers=8, max_concurrency=2)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    async def scenario():
+        await asyncio.gather(*(service.run(work) for _ in range(10)))
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        service.shutdown()
+
+    assert peak == 2
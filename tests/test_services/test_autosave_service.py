@@ -0,0 +1,43 @@
+import threading
+from services.autosave_service import AutosaveService
+
+
+def test_series_of_changes_is_saved_once():
+    service, saved, done = AutosaveService(), [], threading.Event()
+
+    def save(value):
+        saved.append(value)
+        done.set()
+
+    for value in range(5):
+        service.schedule("day:2024-06-10", lambda value=value: save(value), delay=0.05)
+
+    assert done.wait(2)
+    assert saved == [4]
+    assert not service.is_pending("day:2024-06-10")
+
+
+def test_cancel_and_flush():
+    service, saved = AutosaveService(), []
+    service.schedule("a", lambda: saved.append("a"), delay=60)
+    service.schedule("b", lambda: saved.append("b"), delay=60)
+
+    service.cancel("a")
+    service.flush()
+
+    assert saved == ["b"]
+    assert not service.is_pending("a") and not service.is_pending("b")
+
+
+def test_failed_save_does_not_break_other_keys(capsys):
+    service, saved = AutosaveService(), []
+
+    def broken():
+        raise OSError("диск недоступен")
+
+    service.schedule("a", broken, delay=60)
+    service.schedule("b", lambda: saved.append("b"), delay=60)
+    service.flush()
+
+    assert saved == ["b"]
+    assert "диск недоступен" in capsys.readouterr().out
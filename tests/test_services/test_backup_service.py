@@ -0,0 +1,62 @@
+import time
+import pytest
+from core.config import config
+from services.backup_service import backup_service
+from services.diary_service import diary_service
+from services.search_service import search_service
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture
+def snapshots(data_dir, monkeypatch):
+    monkeypatch.setitem(config._data["backup"], "keep", 2)
+    snapshot_ids = []
+    for word in ("альфа", "бета", "гамма"):
+        if snapshot_ids:
+            # Идентификатор снимка - время с точностью до секунды
+            time.sleep(1.05)
+        diary_service.save_day("2024-06-01", make_day(morning=[make_task(word)]))
+        snapshot_ids.append(backup_service.snapshot().snapshot_id)
+    return snapshot_ids
+
+
+def test_retention_keeps_newest_snapshots(snapshots):
+    assert backup_service.list_snapshots() == snapshots[1:]
+
+
+def test_unchanged_data_gives_no_snapshot(data_dir):
+    diary_service.save_day("2024-06-01", make_day(notes=["заметка"]))
+    assert backup_service.snapshot().snapshot_id is not None
+    assert backup_service.snapshot().snapshot_id is None
+
+
+def test_restore_oldest_kept_snapshot(snapshots):
+    diary_service.save_day("2024-06-01", make_day(morning=[make_task("дельта")]))
+    diary_service.save_day("2024-06-02", make_day(notes=["новый день"]))
+
+    restored, removed = backup_service.restore_snapshot(snapshots[1])
+
+    assert (restored, removed) == (1, 1)
+    assert [task.task for task in diary_service.load_day("2024-06-01").morning] == ["бета"]
+    assert not diary_service.day_exists("2024-06-02")
+    # Страховочный снимок текущего состояния создан, лишние удалены после восстановления
+    assert len(backup_service.list_snapshots()) == 2
+
+
+def test_restore_refreshes_indexes(snapshots):
+    diary_service.save_day("2024-06-01", make_day(morning=[make_task("дельта")]))
+
+    backup_service.restore_snapshot(snapshots[1])
+
+    assert [result.date for result in search_service.search("бета")] == ["2024-06-01"]
+    assert search_service.search("дельта") == []
+
+
+def test_restore_file_in_place(data_dir, snapshots):
+    diary_service.save_day("2024-06-01", make_day(morning=[make_task("дельта")]))
+    rel_path = diary_service.day_path("2024-06-01").relative_to(data_dir).as_posix()
+
+    backup_service.restore_file(snapshots[-1], rel_path)
+
+    assert [task.task for task in diary_service.load_day("2024-06-01").morning] == ["гамма"]
+    assert [result.date for result in search_service.search("гамма")] == ["2024-06-01"]
@@ -0,0 +1,78 @@
+import datetime
+
+import pytest
+
+from core.config import config
+from services.carryover_service import carryover_service
+from services.diary_service import diary_service
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture
+def carryover(data_dir, monkeypatch):
+    def configure(**settings):
+        monkeypatch.setitem(config._data, "carryover", {"time": "22:00", **settings})
+    configure()
+    return configure
+
+
+def _tasks(day_date: str, period: str = "Утро"):
+    return diary_service.load_day(day_date).get_tasks_by_period(period)
+
+
+def test_day_closes_at_configured_time(carryover):
+    assert carryover_service.closed_through(datetime.datetime(2024, 6, 10, 21, 59)) == "2024-06-09"
+    assert carryover_service.closed_through(datetime.datetime(2024, 6, 10, 22, 0)) == "2024-06-10"
+
+
+def test_first_run_moves_unfinished_tasks_of_the_last_closed_day(carryover):
+    unfinished = make_task("Не успел", прогресс=40)
+    diary_service.save_day("2024-06-09", make_day(morning=[make_task("Старое")]))
+    diary_service.save_day("2024-06-10", make_day(morning=[unfinished, make_task("Готово", статус="✅", прогресс=100)]))
+
+    report = carryover_service.run("2024-06-10")
+
+    assert report.moved == [unfinished.id]
+    assert [task.id for task in _tasks("2024-06-11")] == [unfinished.id]
+    assert [task.task for task in _tasks("2024-06-10")] == ["Готово"]
+    assert [task.task for task in _tasks("2024-06-09")] == ["Старое"]
+    assert carryover_service.last_done() == "2024-06-10"
+
+
+def test_catch_up_collects_skipped_days_into_the_first_open_day(carryover):
+    diary_service.save_day("2024-06-01", make_day())
+    carryover_service.run("2024-06-01")
+    for number in (2, 3, 4):
+        diary_service.save_day(f"2024-06-0{number}", make_day(morning=[make_task(f"Задача {number}")]))
+
+    report = carryover_service.run("2024-06-04")
+
+    assert (report.date_from, report.target) == ("2024-06-02", "2024-06-05")
+    assert [task.task for task in _tasks("2024-06-05")] == ["Задача 2", "Задача 3", "Задача 4"]
+    assert _tasks("2024-06-03") == []
+
+
+def test_rules_duplicate_and_skip_by_category(carryover):
+    carryover(rules=[{"category": "💼 Работа", "mode": "duplicate", "target_period": "День"},
+                     {"category": "🩺 Здоровье", "mode": "skip"}])
+    work = make_task("Отчёт", категория="💼 Работа")
+    health = make_task("Врач", категория="🩺 Здоровье")
+    diary_service.save_day("2024-06-10", make_day(morning=[work, health]))
+
+    report = carryover_service.run("2024-06-10")
+
+    copies = _tasks("2024-06-11", "День")
+    assert report.skipped == 1
+    assert [(task.task, task.origin) for task in copies] == [("Отчёт", work.id)]
+    assert copies[0].id != work.id
+    assert [task.task for task in _tasks("2024-06-10")] == ["Отчёт", "Врач"]
+
+
+def test_dry_run_writes_nothing(carryover):
+    diary_service.save_day("2024-06-10", make_day(morning=[make_task("Не успел")]))
+
+    report = carryover_service.run("2024-06-10", dry_run=True)
+
+    assert len(report.moved) == 1
+    assert not diary_service.day_exists("2024-06-11")
+    assert carryover_service.last_done() is None
@@ -0,0 +1,65 @@
+import pytest
+
+from cli import main
+from core.config import config
+from services.diary_service import diary_service
+from tests.conftest import make_day, make_task
+
+DATES = ["2023-12-31", "2024-01-15", "2024-02-01"]
+
+
+@pytest.fixture
+def layout(monkeypatch):
+    def set_layout(name: str) -> None:
+        monkeypatch.setitem(config._data, "diary", {"layout": name})
+    return set_layout
+
+
+def _save_all() -> None:
+    for day_date in DATES:
+        diary_service.save_day(day_date, make_day(morning=[make_task(f"Задача {day_date}")]))
+
+
+def test_flat_is_the_default_layout(data_dir, monkeypatch):
+    monkeypatch.delitem(config._data, "diary", raising=False)
+    diary_service.save_day(DATES[0], make_day())
+
+    assert diary_service.layout == "flat"
+    assert (data_dir / "diary" / f"{DATES[0]}.json").exists()
+
+
+def test_days_are_read_in_either_layout(data_dir, layout):
+    layout("flat")
+    _save_all()
+    layout("sharded")
+
+    assert sorted(diary_service.list_days()) == DATES
+    assert diary_service.load_day("2024-01-15").morning[0].task == "Задача 2024-01-15"
+    assert [day_date for day_date, _ in diary_service.iter_day_files("2024-01-01", "2024-01-31")] == ["2024-01-15"]
+
+
+def test_migrate_layout_moves_every_file(data_dir, layout):
+    layout("flat")
+    _save_all()
+    layout("sharded")
+
+    moved = diary_service.migrate_layout()
+
+    diary_dir = data_dir / "diary"
+    assert moved == len(DATES)
+    assert sorted(path.relative_to(diary_dir).as_posix() for path in diary_dir.rglob("*.json")) == [
+        "2023/12/2023-12-31.json", "2024/01/2024-01-15.json", "2024/02/2024-02-01.json"]
+    assert sorted(diary_service.list_days()) == DATES
+
+
+def test_migrate_layout_cli_back_to_flat(data_dir, layout, capsys):
+    layout("sharded")
+    _save_all()
+    layout("flat")
+
+    assert main(["migrate-layout"]) == 0
+
+    diary_dir = data_dir / "diary"
+    assert sorted(path.name for path in diary_dir.iterdir() if path.is_file()) == [f"{d}.json" for d in DATES]
+    assert not any(path.is_dir() for path in diary_dir.iterdir() if path.name.isdigit())
+    assert "Перенесено файлов: 3" in capsys.readouterr().err
@@ -0,0 +1,74 @@
+import csv
+import io
+import pytest
+from core.exceptions import DataValidationError
+from services.diary_service import diary_service
+from services.export_service import EXPORT_FIELDS, export_service
+from services.json_codec import json_codec
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture
+def history(data_dir):
+    first = make_day(morning=[make_task("Зарядка", категория="🏃 Здоровье", статус="✅", прогресс=100)],
+                     evening=[make_task("Чтение", "21:00-22:00", категория="📚 Обучение")],
+                     notes=["Хороший день"])
+    first.state.set_value("Настроение", "8", "scale_1_10")
+    second = make_day(day=[make_task("Отчёт", "10:00-12:00", категория="💼 Работа", прогресс=50)])
+    diary_service.save_days({"2024-01-01": first, "2024-01-02": second})
+    return first, second
+
+
+def _export(export_format: str, **filters) -> bytes:
+    stream = io.BytesIO()
+    export_service.export(export_format, stream, **filters)
+    return stream.getvalue()
+
+
+def test_jsonl_has_one_record_per_task_state_and_note(history):
+    records = [json_codec.loads(line) for line in _export("jsonl").splitlines()]
+
+    assert [(record["date"], record["record_type"]) for record in records] == [
+        ("2024-01-01", "task"), ("2024-01-01", "task"), ("2024-01-01", "state"), ("2024-01-01", "note"),
+        ("2024-01-02", "task")]
+    assert records[0]["task_id"] == history[0].morning[0].id
+    assert (records[0]["period"], records[0]["progress"]) == ("Утро", 100)
+    assert (records[2]["state_category"], records[2]["value"]) == ("Настроение", "8")
+
+
+def test_csv_is_excel_friendly(history):
+    raw = _export("csv")
+
+    assert raw.startswith("﻿".encode("utf-8"))
+    rows = list(csv.DictReader(io.StringIO(raw.decode("utf-8-sig"))))
+    assert list(rows[0]) == EXPORT_FIELDS
+    assert [row["task"] for row in rows if row["record_type"] == "task"] == ["Зарядка", "Чтение", "Отчёт"]
+
+
+def test_filters_by_date_category_and_record_type(history):
+    def exported(**filters):
+        return [json_codec.loads(line) for line in _export("jsonl", **filters).splitlines()]
+
+    assert {record["date"] for record in exported(date_from="2024-01-02")} == {"2024-01-02"}
+    assert [record["task"] for record in exported(categories=["📚 Обучение"], record_types=["task"])] == ["Чтение"]
+    assert [record["note"] for record in exported(record_types=["note"])] == ["Хороший день"]
+
+
+def test_parquet_round_trip(history):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    table = pq.read_table(io.BytesIO(_export("parquet")))
+
+    assert table.num_rows == 5
+    assert table.column("progress").to_pylist()[:2] == [100, 0]
+
+
+def test_export_to_file_counts_records(history, tmp_path):
+    assert export_service.export_to_file("csv", tmp_path / "out" / "history.csv") == 5
+
+
+def test_rejects_unknown_format_and_bad_dates(data_dir):
+    with pytest.raises(DataValidationError):
+        _export("xml")
+    with pytest.raises(DataValidationError):
+        _export("csv", date_from="01.01.2024")
@@ -0,0 +1,71 @@
+from services.diary_service import diary_service
+from services.habit_service import habit_key, habit_service
+from services.json_codec import json_codec
+from tests.conftest import make_day, make_task
+
+TODAY = "2024-05-10"
+
+
+def _done(name: str = "🧘 Медитация"):
+    return make_task(name, статус="✅", прогресс=100)
+
+
+def _save_days(days) -> None:
+    for day_date, tasks in days.items():
+        diary_service.save_day(day_date, make_day(morning=tasks))
+
+
+def test_habit_key_ignores_emoji_case_and_punctuation():
+    assert habit_key("🧘 Медитация") == habit_key("медитация!") == "медитация"
+    assert habit_key("📚 Python  книга") == "python книга"
+
+
+def test_streaks_and_rate(data_dir):
+    _save_days({
+        "2024-05-01": [_done()], "2024-05-02": [_done()], "2024-05-03": [_done()],
+        "2024-05-05": [make_task("медитация")],
+        "2024-05-08": [_done("Медитация!")], "2024-05-09": [_done()],
+        "2024-05-10": [make_task("Медитация")],
+    })
+
+    stats = habit_service.get_stats("медитация", today=TODAY, window=10)
+
+    # Невыполненная сегодняшняя задача не прерывает вчерашнюю серию
+    assert stats.current_streak == 2
+    assert stats.longest_streak == 3
+    assert (stats.days_planned, stats.days_done) == (7, 5)
+    assert (stats.window_done, stats.window_planned) == (5, 7)
+    assert stats.last_done == "2024-05-09"
+
+
+def test_saving_a_day_updates_streaks_incrementally(data_dir):
+    _save_days({"2024-05-08": [_done()], "2024-05-09": [make_task("Медитация")], "2024-05-10": [_done()]})
+    assert habit_service.get_stats("медитация", today=TODAY).current_streak == 1
+
+    diary_service.save_day("2024-05-09", make_day(morning=[_done()]))
+    assert habit_service.get_stats("медитация", today=TODAY).current_streak == 3
+
+    diary_service.delete_day("2024-05-09")
+    stats = habit_service.get_stats("медитация", today=TODAY)
+    assert (stats.current_streak, stats.longest_streak, stats.days_planned) == (1, 1, 2)
+
+
+def test_history_and_listing(data_dir):
+    _save_days({"2024-05-09": [_done(), make_task("Пробежка")], "2024-05-10": [_done()]})
+
+    assert habit_service.history("Медитация", "2024-05-08", "2024-05-10") == [
+        ("2024-05-08", False, False), ("2024-05-09", True, True), ("2024-05-10", True, True)]
+    assert [stats.key for stats in habit_service.list_habits(today=TODAY, min_days=1)] == ["медитация", "пробежка"]
+
+
+def test_start_catches_up_with_edits_made_while_closed(data_dir, monkeypatch):
+    _save_days({"2024-05-08": [_done()], "2024-05-09": [_done()], "2024-05-10": [_done()]})
+    assert habit_service.get_stats("медитация", today=TODAY).current_streak == 3
+
+    diary_service.day_path("2024-05-09").write_bytes(
+        json_codec.dumps(make_day(morning=[make_task("Медитация")]).model_dump(by_alias=True)))
+    diary_service.day_path("2024-05-08").unlink()
+    monkeypatch.setattr(habit_service, "_reconciled", False)
+
+    stats = habit_service.get_stats("медитация", today=TODAY)
+    assert (stats.current_streak, stats.days_planned, stats.days_done) == (1, 2, 1)
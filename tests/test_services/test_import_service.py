@@ -0,0 +1,96 @@
+import io
+import pytest
+from core.exceptions import DataValidationError
+from services.diary_service import diary_service
+from services.export_service import export_service
+from services.import_service import ImportService
+from tests.conftest import make_day, make_task
+
+CSV = """дата,задача,время,статус,прогресс,категория
+2024-04-01,Зарядка,07:00-07:30,✅,100,🏃 Здоровье
+2024-04-01,Совещание,14:00-15:00,☐,0,💼 Работа
+2024-04-02,Чтение,21:00-22:00,☐,,📚 Обучение
+2024-13-01,Плохая дата,08:00-09:00,☐,0,
+2024-04-02,Плохой статус,08:00-09:00,?,0,
+2024-04-02,Плохой прогресс,08:00-09:00,☐,много,
+"""
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+DTSTART:20240405T190000
+DTEND:20240405T200000
+SUMMARY:Встреча с друзьями\\, ужин
+  и кино
+CATEGORIES:Личное,Отдых
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def _import(text: str, import_format: str, **options):
+    return ImportService(chunk_size=2, max_workers=2).import_stream(
+        io.BytesIO(text.encode("utf-8")), import_format, **options)
+
+
+def _tasks(day_date: str, period: str):
+    return [task.task for task in diary_service.load_day(day_date).get_tasks_by_period(period)]
+
+
+def test_csv_rows_are_validated_in_chunks_and_saved_by_day(data_dir):
+    report = _import(CSV, "csv")
+
+    assert (report.rows_read, report.tasks_imported) == (6, 3)
+    assert report.days_created == ["2024-04-01", "2024-04-02"]
+    assert [error.line for error in report.errors] == [5, 6, 7]
+    # Период выводится из времени начала
+    assert _tasks("2024-04-01", "Утро") == ["Зарядка"]
+    assert _tasks("2024-04-01", "День") == ["Совещание"]
+    assert _tasks("2024-04-02", "Вечер") == ["Чтение"]
+
+
+def test_repeated_import_skips_duplicates(data_dir):
+    _import(CSV, "csv")
+
+    report = _import(CSV, "csv")
+
+    assert (report.tasks_imported, report.duplicates_skipped) == (0, 3)
+    assert report.days_updated == []
+    assert _tasks("2024-04-01", "Утро") == ["Зарядка"]
+
+
+def test_dry_run_writes_nothing(data_dir):
+    report = _import(CSV, "csv", dry_run=True)
+
+    assert report.tasks_imported == 3
+    assert diary_service.list_days() == []
+
+
+def test_ics_events_with_folded_lines(data_dir):
+    report = _import(ICS, "ics")
+
+    assert report.errors == []
+    task = diary_service.load_day("2024-04-05").evening[0]
+    assert (task.task, task.time, task.category) == ("Встреча с друзьями, ужин и кино", "19:00-20:00", "Личное")
+
+
+def test_exported_jsonl_imports_back_with_the_same_ids(data_dir):
+    source = make_day(morning=[make_task("Зарядка", прогресс=100, статус="✅")],
+                      evening=[make_task("Чтение", "21:00-22:00")], notes=["не задача"])
+    diary_service.save_day("2024-04-10", source)
+    exported = io.BytesIO()
+    export_service.export("jsonl", exported)
+    diary_service.delete_day("2024-04-10")
+
+    report = _import(exported.getvalue().decode("utf-8"), "jsonl")
+
+    assert report.tasks_imported == 2
+    restored = diary_service.load_day("2024-04-10")
+    assert [task.id for task in restored.morning + restored.evening] == \
+        [task.id for task in source.morning + source.evening]
+
+
+def test_detect_format_by_extension():
+    assert ImportService.detect_format("tasks.ndjson") == "jsonl"
+    assert ImportService.detect_format("calendar.ICS") == "ics"
+    with pytest.raises(DataValidationError):
+        ImportService.detect_format("tasks.xlsx")
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from services import json_codec as json_codec_module
+from services.json_codec import JsonCodec
+
+DAY = {"Утро": [{"задача": "Зарядка 🏃", "прогресс": 100}], "Заметки": ["«кавычки»"]}
+SETTINGS = {"backend": "auto", "pretty": True, "compat": True}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request):
+    if request.param == "orjson" and json_codec_module.orjson is None:
+        pytest.skip("orjson не установлен")
+    return request.param
+
+
+def test_compat_output_matches_previous_format(backend):
+    codec = JsonCodec({**SETTINGS, "backend": backend})
+
+    assert codec.backend == backend
+    assert codec.dumps(DAY) == json.dumps(DAY, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def test_round_trip_and_empty_files(backend):
+    codec = JsonCodec({**SETTINGS, "backend": backend, "compat": False})
+
+    assert codec.loads(codec.dumps(DAY)) == DAY
+    assert codec.loads(codec.dumps_compact(DAY)) == DAY
+    assert b"\n" not in codec.dumps_compact(DAY)
+    assert codec.loads(b"") == {} and codec.loads(b" \n") == {}
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        JsonCodec({**SETTINGS, "backend": "ujson"})
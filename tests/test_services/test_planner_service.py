@@ -0,0 +1,92 @@
+from services.diary_service import diary_service
+from services.json_codec import json_codec
+from services.planner_service import planner_service
+from services.template_service import template_service
+from tests.conftest import make_day, make_task
+
+# 2030-01-05 - суббота, 2030-01-07 - понедельник
+WEEK = ("2030-01-05", "2030-01-11")
+
+
+def _tasks(day_date: str, period: str = "Утро"):
+    return [task.task for task in diary_service.load_day(day_date).get_tasks_by_period(period)]
+
+
+def test_copy_rule_fills_weekdays_from_monday(data_dir):
+    diary_service.save_day("2030-01-07", make_day(morning=[make_task("Планёрка")]))
+    rules = planner_service.weekly_rules(copy_period="Утро", copy_from_weekday=0)
+
+    report = planner_service.plan(*WEEK, rules)
+
+    assert report.created == ["2030-01-08", "2030-01-09", "2030-01-10", "2030-01-11"]
+    assert all(_tasks(day_date) == ["Планёрка"] for day_date in report.created)
+
+
+def test_dates_without_rule_content_are_left_alone(data_dir):
+    saturday = make_day(morning=[make_task("Своё")])
+    diary_service.save_day("2030-01-05", saturday)
+    diary_service.save_day("2030-01-07", make_day(morning=[make_task("Планёрка")]))
+    rules = planner_service.weekly_rules(copy_period="Утро", copy_from_weekday=0)
+
+    report = planner_service.plan(*WEEK, rules, existing="replace")
+
+    # Для выходных нет ни шаблона, ни копирования - их не трогаем и не создаём
+    assert {"2030-01-05", "2030-01-06"} <= set(report.skipped)
+    assert _tasks("2030-01-05") == ["Своё"]
+    assert not diary_service.day_exists("2030-01-06")
+
+
+def test_merge_adds_only_missing_tasks(data_dir):
+    diary_service.save_day("2030-01-07", make_day(morning=[make_task("Планёрка")]))
+    diary_service.save_day("2030-01-08", make_day(morning=[make_task("Планёрка"), make_task("Своё")]))
+    diary_service.save_day("2030-01-09", make_day(morning=[make_task("Своё")]))
+    rules = planner_service.weekly_rules(copy_period="Утро", copy_from_weekday=0)
+
+    report = planner_service.plan(*WEEK, rules, existing="merge")
+
+    assert report.merged == ["2030-01-09"]
+    assert "2030-01-08" in report.skipped
+    assert _tasks("2030-01-09") == ["Своё", "Планёрка"]
+
+
+def test_dry_run_writes_nothing(data_dir):
+    diary_service.save_day("2030-01-07", make_day(morning=[make_task("Планёрка")]))
+    rules = planner_service.weekly_rules(copy_period="Утро", copy_from_weekday=0)
+
+    report = planner_service.plan(*WEEK, rules, dry_run=True)
+
+    assert report.created
+    assert sorted(diary_service.list_days()) == ["2030-01-07"]
+
+
+def test_replace_without_template_replaces_only_copied_periods(data_dir):
+    diary_service.save_day("2030-01-07", make_day(morning=[make_task("Планёрка")]))
+    tuesday = make_day(morning=[make_task("Старое утро")], evening=[make_task("Своё")], notes=["заметка"])
+    tuesday.state.set_value("Настроение", "7", "scale_1_10")
+    diary_service.save_day("2030-01-08", tuesday)
+    rules = planner_service.weekly_rules(copy_period="Утро", copy_from_weekday=0)
+
+    report = planner_service.plan(*WEEK, rules, existing="replace")
+
+    assert "2030-01-08" in report.replaced
+    replaced = diary_service.load_day("2030-01-08")
+    assert _tasks("2030-01-08") == ["Планёрка"]
+    assert _tasks("2030-01-08", "Вечер") == ["Своё"]
+    assert replaced.notes == ["заметка"]
+    assert replaced.state.get_value("Настроение") == "7"
+
+
+def test_weekday_and_weekend_templates(data_dir, tmp_path, monkeypatch):
+    monkeypatch.setitem(template_service.template_dirs, "day", tmp_path / "templates")
+    monkeypatch.setattr(template_service, "_compiled", {})
+    (tmp_path / "templates").mkdir()
+    for name, task in (("будни", "Работа"), ("выходные", "Отдых")):
+        (tmp_path / "templates" / f"{name}.json").write_bytes(
+            json_codec.dumps(make_day(morning=[make_task(task)]).model_dump(by_alias=True)))
+    rules = planner_service.weekly_rules(weekday_template="будни", weekend_template="выходные")
+
+    report = planner_service.plan(*WEEK, rules)
+
+    assert len(report.created) == 7
+    assert _tasks("2030-01-05") == ["Отдых"]
+    assert _tasks("2030-01-07") == ["Работа"]
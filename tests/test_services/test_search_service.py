@@ -0,0 +1,98 @@
+from cli import main
+from core.vocabulary import vocabulary
+from services.diary_service import diary_service
+from services.json_codec import json_codec
+from services.search_service import search_service, tokenize
+from tests.conftest import make_day, make_task
+
+
+def _dates(query: str, **filters):
+    return [result.date for result in search_service.search(query, **filters)]
+
+
+def _write_behind_the_app(day_date: str, day_data) -> None:
+    """Изменить файл дня так, как это сделал бы другой редактор при закрытом приложении"""
+    path = diary_service.day_path(day_date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(json_codec.dumps(day_data.model_dump(by_alias=True)))
+
+
+def test_tokenize_normalizes_case_yo_and_emoji():
+    assert tokenize("Ёлка, ЗАРЯДКА 🏃") == ["елка", "зарядка", "em1f3c3"]
+
+
+def test_finds_tasks_and_notes_by_prefix_and_typo(data_dir):
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Прочитать статью")],
+                                                  notes=["Купить молоко"]))
+
+    assert _dates("стат") == ["2024-02-01"]
+    assert [result.kind for result in search_service.search("молако")] == ["note"]
+    assert search_service.search("молако", fuzzy=False) == []
+
+
+def test_filters_by_kind_and_date(data_dir):
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Зарядка")], notes=["зарядка утром"]))
+    diary_service.save_day("2024-03-01", make_day(morning=[make_task("Зарядка")]))
+
+    assert _dates("зарядка", kinds=["task"]) == ["2024-03-01", "2024-02-01"]
+    assert _dates("зарядка", date_from="2024-02-15") == ["2024-03-01"]
+    assert [result.kind for result in search_service.search("зарядка", kinds=["note"])] == ["note"]
+
+
+def test_saving_and_deleting_update_the_index(data_dir):
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Бассейн")]))
+    assert _dates("бассейн") == ["2024-02-01"]
+
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Тренажёрный зал")]))
+    assert _dates("бассейн") == []
+    assert _dates("тренажерный") == ["2024-02-01"]
+
+    diary_service.delete_day("2024-02-01")
+    assert _dates("тренажерный") == []
+
+
+def test_start_catches_up_with_edits_made_while_closed(data_dir, monkeypatch):
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Бассейн")]))
+    diary_service.save_day("2024-02-02", make_day(morning=[make_task("Пробежка")]))
+    assert _dates("бассейн") == ["2024-02-01"]
+
+    _write_behind_the_app("2024-02-01", make_day(morning=[make_task("Велосипед")]))
+    _write_behind_the_app("2024-02-03", make_day(notes=["Новая заметка"]))
+    diary_service.day_path("2024-02-02").unlink()
+    # Следующий запуск приложения
+    monkeypatch.setattr(search_service, "_reconciled", False)
+
+    assert _dates("бассейн") == []
+    assert _dates("велосипед") == ["2024-02-01"]
+    assert _dates("заметка") == ["2024-02-03"]
+    assert _dates("пробежка") == []
+    # Уже сверенные файлы повторно не индексируются
+    assert search_service.reconcile() == 0
+
+
+def test_reindex_command_rebuilds_from_files(data_dir):
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Бассейн")]))
+    _write_behind_the_app("2024-02-01", make_day(morning=[make_task("Велосипед")]))
+
+    assert main(["reindex"]) == 0
+    assert _dates("велосипед") == ["2024-02-01"]
+
+
+def test_category_filter_matches_values_without_a_code(data_dir):
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Гитара", категория="Своя категория"),
+                                                           make_task("Гитара", категория="🩺 Здоровье")]))
+
+    assert [result.category for result in search_service.search("гитара", category="Своя категория")] == [
+        "Своя категория"]
+    assert [result.category for result in search_service.search("гитара", category="🩺 Здоровье")] == [
+        "🩺 Здоровье"]
+    assert "Своя категория" not in vocabulary.categories
+
+
+def test_index_of_another_schema_version_is_rebuilt(data_dir):
+    diary_service.save_day("2024-02-01", make_day(morning=[make_task("Бассейн")]))
+    with search_service._connect() as conn:
+        search_service._set_meta("schema_version", "3")
+        conn.execute("DELETE FROM docs")
+
+    assert _dates("бассейн") == ["2024-02-01"]
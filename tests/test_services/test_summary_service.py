@@ -0,0 +1,90 @@
+from core.config import config
+from services.diary_service import diary_service
+from services.json_codec import json_codec
+from services.summary_service import summary_service
+from tests.conftest import make_day, make_task
+
+MOOD = "😌 Настроение"
+
+
+def _day(*tasks, mood=None):
+    day = make_day(morning=list(tasks))
+    if mood is not None:
+        day.state.set_value(MOOD, mood, "scale_1_10")
+    return day
+
+
+def test_read_range_counts_mean_and_missing_days(data_dir):
+    diary_service.save_day("2024-05-01", _day(make_task("А", статус="✅", прогресс=100), make_task("Б")))
+    diary_service.save_day("2024-05-03", _day())
+
+    first, second, third = summary_service.read_range("2024-05-01", "2024-05-03")
+
+    assert first.exists and first.status_counts == {"✅": 1, "☐": 1}
+    assert first.mean_progress == 50
+    assert not second.exists and second.status_counts == {}
+    # День без задач существует, но среднего прогресса у него нет
+    assert third.exists and third.mean_progress is None
+    assert summary_service.first_date() == "2024-01-01"
+
+
+def test_state_values_are_scaled_to_percent(data_dir):
+    diary_service.save_day("2024-05-01", _day(mood="7"))
+
+    summary = summary_service.get("2024-05-01")
+
+    assert summary.state[MOOD] == 70
+    assert summary.state["🛌 Качество сна"] is None
+
+
+def test_save_and_delete_update_records_in_place(data_dir):
+    diary_service.save_day("2024-05-01", _day(make_task("А")))
+    assert summary_service.get("2024-05-01").status_counts == {"☐": 1}
+
+    diary_service.save_day("2024-05-02", _day(make_task("Б", статус="✅", прогресс=100)))
+    diary_service.save_day("2024-05-01", _day(make_task("А", статус="✅", прогресс=100)))
+    assert summary_service.get("2024-05-01").status_counts == {"✅": 1}
+    assert summary_service.get("2024-05-02").mean_progress == 100
+
+    diary_service.delete_day("2024-05-02")
+    assert not summary_service.get("2024-05-02").exists
+
+
+def test_earlier_date_extends_the_file(data_dir):
+    diary_service.save_day("2024-05-01", _day(make_task("А")))
+    summary_service.get("2024-05-01")
+
+    diary_service.save_day("2023-12-31", _day(make_task("Б")))
+
+    assert summary_service.first_date() == "2023-01-01"
+    assert summary_service.get("2023-12-31").exists
+    assert summary_service.get("2024-05-01").exists
+
+
+def test_changed_state_categories_rebuild_the_file(data_dir, monkeypatch):
+    diary_service.save_day("2024-05-01", _day(mood="7"))
+    assert MOOD in summary_service.get("2024-05-01").state
+
+    # Новые категории читаются при следующем запуске
+    monkeypatch.setitem(config._data, "summary", {"state_categories": ["🛌 Качество сна"]})
+    monkeypatch.setattr(summary_service, "_base", None)
+    monkeypatch.setattr(summary_service, "_reconciled", False)
+
+    assert summary_service.get("2024-05-01").state == {"🛌 Качество сна": None}
+
+
+def test_start_catches_up_with_edits_made_while_closed(data_dir, monkeypatch):
+    diary_service.save_day("2024-05-01", _day(make_task("А")))
+    diary_service.save_day("2024-05-02", _day(make_task("Б")))
+    assert summary_service.get("2024-05-01").status_counts == {"☐": 1}
+
+    diary_service.day_path("2024-05-01").write_bytes(json_codec.dumps(
+        _day(make_task("А", статус="✅", прогресс=100)).model_dump(by_alias=True)))
+    diary_service.day_path("2024-05-02").unlink()
+    diary_service.day_path("2024-05-03").write_bytes(json_codec.dumps(_day(mood="5").model_dump(by_alias=True)))
+    monkeypatch.setattr(summary_service, "_reconciled", False)
+
+    first, second, third = summary_service.read_range("2024-05-01", "2024-05-03")
+    assert first.status_counts == {"✅": 1}
+    assert not second.exists
+    assert third.exists and third.state[MOOD] == 50
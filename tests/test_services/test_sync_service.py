@@ -0,0 +1,98 @@
+import pytest
+from pathlib import Path
+from core.exceptions import FileOperationError
+from models.diary import Day
+from services.archive_service import build_pack
+from services.file_service import file_service
+from services.json_codec import json_codec
+from services.sync_service import LocalTransport, Replica, SyncService
+from tests.conftest import make_day, make_task
+
+
+def _replica(base_dir: Path) -> Replica:
+    for name in ("diary", "projects"):
+        (base_dir / "data" / name).mkdir(parents=True)
+    (base_dir / "config").mkdir()
+    return Replica.for_base_dir(base_dir)
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    local, remote = _replica(tmp_path / "local"), _replica(tmp_path / "remote")
+    service = SyncService()
+    service._local = local
+    return service, local, LocalTransport(remote), remote
+
+
+def _write_day(replica: Replica, day_date: str, day_data: Day) -> None:
+    replica.write(f"diary/{day_date}", json_codec.dumps(day_data.model_dump(by_alias=True)))
+
+
+def _read_day(replica: Replica, day_date: str) -> Day:
+    return Day(**json_codec.loads(replica.read(f"diary/{day_date}")[0]))
+
+
+def test_sync_copies_new_days_both_ways(replicas):
+    service, local, transport, remote = replicas
+    _write_day(local, "2024-05-01", make_day(morning=[make_task("Локальная")]))
+    _write_day(remote, "2024-05-02", make_day(morning=[make_task("Удалённая")]))
+
+    report = service.sync(transport)
+
+    assert report.errors == []
+    assert report.pushed == ["diary/2024-05-01"]
+    assert report.pulled == ["diary/2024-05-02"]
+    assert local.root_hash() == remote.root_hash()
+    assert _read_day(remote, "2024-05-01").morning[0].task == "Локальная"
+    assert _read_day(local, "2024-05-02").morning[0].task == "Удалённая"
+
+
+def test_second_sync_has_nothing_to_do(replicas):
+    service, local, transport, remote = replicas
+    _write_day(local, "2024-05-01", make_day(notes=["заметка"]))
+    service.sync(transport)
+
+    report = service.sync(transport)
+
+    assert (report.pulled, report.pushed, report.merged) == ([], [], [])
+    assert report.exchanges == 1
+
+
+def test_concurrent_edits_of_one_day_are_merged(replicas):
+    service, local, transport, remote = replicas
+    first, second = make_task("Зарядка"), make_task("Почта", "10:00-11:00")
+    _write_day(local, "2024-05-01", make_day(morning=[first, second]))
+    service.sync(transport)
+
+    _write_day(local, "2024-05-01", make_day(morning=[first.model_copy(update={"status": "✅"}), second]))
+    _write_day(remote, "2024-05-01", make_day(morning=[first, second], evening=[make_task("Чтение")]))
+    report = service.sync(transport)
+
+    assert report.merged == ["diary/2024-05-01"]
+    for replica in (local, remote):
+        day = _read_day(replica, "2024-05-01")
+        assert [task.status for task in day.morning] == ["✅", "☐"]
+        assert [task.task for task in day.evening] == ["Чтение"]
+
+
+def test_deletion_is_propagated(replicas):
+    service, local, transport, remote = replicas
+    _write_day(local, "2024-05-01", make_day(notes=["заметка"]))
+    service.sync(transport)
+
+    local.delete("diary/2024-05-01")
+    report = service.sync(transport)
+
+    assert report.pushed == ["diary/2024-05-01"]
+    assert remote.read("diary/2024-05-01") is None
+
+
+def test_packed_day_of_replica_cannot_be_deleted(replicas):
+    _, local, _, _ = replicas
+    _write_day(local, "2020-03-01", make_day(notes=["в пакете"]))
+    raw = local.read("diary/2020-03-01")[0]
+    file_service.save_bytes(local.archive.pack_path("2020-03"), build_pack([("2020-03-01", raw)]))
+
+    with pytest.raises(FileOperationError):
+        local.delete("diary/2020-03-01")
+    assert local.read("diary/2020-03-01") is not None
@@ -0,0 +1,76 @@
+import pytest
+
+from core.exceptions import DataValidationError
+from services.diary_service import diary_service
+from services.json_codec import json_codec
+from services.task_index_service import task_index_service
+from tests.conftest import make_day, make_task
+
+
+def _write_behind_the_app(day_date: str, day_data) -> None:
+    """Изменить файл дня так, как это сделал бы другой редактор при закрытом приложении"""
+    path = diary_service.day_path(day_date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(json_codec.dumps(day_data.model_dump(by_alias=True)))
+
+
+def _names(day_date: str, period: str = "Утро"):
+    return [task.task for task in diary_service.load_day(day_date).get_tasks_by_period(period)]
+
+
+def test_locate_and_find_unfinished(data_dir):
+    done = make_task("Готово", статус="✅", прогресс=100)
+    open_task = make_task("Открыта")
+    diary_service.save_day("2024-04-01", make_day(morning=[done], evening=[open_task]))
+    diary_service.save_day("2024-04-02", make_day(day=[make_task("Почти", статус="✅", прогресс=90)]))
+
+    location = task_index_service.locate(open_task.id)
+    found = task_index_service.find_tasks("2024-04-01", "2024-04-07", unfinished=True)
+
+    assert (location.date, location.period, location.position) == ("2024-04-01", "Вечер", 0)
+    assert [row.task_id for row in found][0] == open_task.id
+    assert [row.date for row in found] == ["2024-04-01", "2024-04-02"]
+
+
+def test_move_task_keeps_id_and_updates_both_days(data_dir):
+    task = make_task("Перенести")
+    diary_service.save_day("2024-04-01", make_day(morning=[task, make_task("Остаётся")]))
+
+    assert diary_service.move_task(task.id, "2024-04-03", "Вечер")
+
+    assert _names("2024-04-01") == ["Остаётся"]
+    assert [moved.id for moved in diary_service.load_day("2024-04-03").evening] == [task.id]
+    assert task_index_service.locate(task.id).date == "2024-04-03"
+
+
+def test_reschedule_unfinished_week_to_monday(data_dir):
+    for number in range(1, 6):
+        diary_service.save_day(f"2024-04-0{number}", make_day(
+            morning=[make_task(f"Открыта {number}"), make_task(f"Готова {number}", статус="✅", прогресс=100)]))
+
+    moved = diary_service.reschedule_unfinished("2024-04-01", "2024-04-05", "2024-04-08")
+
+    assert len(moved) == 5
+    assert _names("2024-04-08") == [f"Открыта {number}" for number in range(1, 6)]
+    assert _names("2024-04-03") == ["Готова 3"]
+
+
+def test_unknown_task_is_reported(data_dir):
+    with pytest.raises(DataValidationError):
+        diary_service.move_task("нет-такой", "2024-04-03")
+
+
+def test_start_catches_up_with_edits_made_while_closed(data_dir, monkeypatch):
+    kept = make_task("Была")
+    diary_service.save_day("2024-04-01", make_day(morning=[kept]))
+    diary_service.save_day("2024-04-02", make_day(morning=[make_task("Удалённый день")]))
+    assert task_index_service.locate(kept.id).date == "2024-04-01"
+    added = make_task("Добавлена офлайн")
+    _write_behind_the_app("2024-04-01", make_day(morning=[added]))
+    diary_service.day_path("2024-04-02").unlink()
+    monkeypatch.setattr(task_index_service, "_reconciled", False)
+
+    assert diary_service.move_task(added.id, "2024-04-05")
+    assert task_index_service.locate(kept.id) is None
+    assert task_index_service.find_tasks("2024-04-02", "2024-04-02") == []
+    assert _names("2024-04-05") == ["Добавлена офлайн"]
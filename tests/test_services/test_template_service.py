@@ -0,0 +1,58 @@
+import os
+import pytest
+from core.exceptions import FileOperationError, TemplateError
+from services.json_codec import json_codec
+from services.template_service import TemplateService
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture
+def templates(tmp_path):
+    service = TemplateService()
+    service.template_dirs = {"day": tmp_path / "days", "project": tmp_path / "projects"}
+    service.template_dirs["day"].mkdir()
+    return service
+
+
+def _write_template(service: TemplateService, name: str, data) -> None:
+    path = service.template_dirs["day"] / f"{name}.json"
+    path.write_bytes(json_codec.dumps(data))
+
+
+def test_instantiate_fills_placeholders_and_fresh_ids(templates):
+    skeleton = make_day(morning=[make_task("Зарядка"), make_task("Письмо {{дата}}")],
+                        notes=["План на {{дата}}", "{{uuid}}"])
+    _write_template(templates, "будни", skeleton.model_dump(by_alias=True))
+
+    first = templates.instantiate_day("будни", "2024-05-01")
+    second = templates.instantiate_day("будни", "2024-05-02")
+
+    assert first.notes[0] == "План на 2024-05-01"
+    assert second.morning[1].task == "Письмо 2024-05-02"
+    assert first.notes[1] != second.notes[1]
+    assert {task.id for task in first.morning}.isdisjoint(task.id for task in second.morning)
+    # Скелет не меняется при создании копий
+    assert templates.get("day", "будни").skeleton.notes[0] == "План на {{дата}}"
+
+
+def test_compiled_once_and_recompiled_after_edit(templates):
+    _write_template(templates, "будни", make_day(notes=["старый"]).model_dump(by_alias=True))
+    compiled = templates.get("day", "будни")
+    assert templates.get("day", "будни") is compiled
+
+    _write_template(templates, "будни", make_day(notes=["новый шаблон"]).model_dump(by_alias=True))
+    path = templates.template_dirs["day"] / "будни.json"
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1))
+
+    assert templates.get("day", "будни") is not compiled
+    assert templates.instantiate_day("будни", "2024-05-01").notes == ["новый шаблон"]
+
+
+def test_broken_and_missing_templates(templates):
+    _write_template(templates, "сломанный", {"Утро": [{"задача": "Без времени", "прогресс": 500}]})
+
+    with pytest.raises(TemplateError):
+        templates.get("day", "сломанный")
+    with pytest.raises(FileOperationError):
+        templates.get("day", "нет такого")
+    assert templates.list_templates("day") == ["сломанный"]
@@ -0,0 +1,62 @@
+import threading
+import time
+import pytest
+from core.config import config
+from services.diary_service import diary_service
+from services.watcher_service import watcher_service
+from tests.conftest import make_day, make_task
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request, data_dir, monkeypatch):
+    """Запущенный наблюдатель над временной папкой; возвращает список полученных изменений"""
+    monkeypatch.setitem(config._data, "watcher", {"enabled": True, "backend": request.param,
+                                                  "poll_interval": 0.05})
+    monkeypatch.setattr(watcher_service, "_own_writes", {})
+    monkeypatch.setattr(watcher_service, "_generations", {})
+    changes, lock = [], threading.Lock()
+
+    def collect(change):
+        with lock:
+            changes.append(change)
+
+    monkeypatch.setattr(watcher_service, "_subscribers", [collect])
+    watcher_service.start()
+    yield changes
+    watcher_service.stop()
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def test_own_saves_are_not_dispatched(watcher):
+    for number in range(50):
+        diary_service.save_day("2024-03-01", make_day(morning=[make_task(f"Задача {number}")]))
+    # Время на доставку событий: все они должны быть распознаны как свои
+    time.sleep(0.3)
+
+    assert watcher == []
+    assert watcher_service.generation("day", "2024-03-01") == 0
+
+
+def test_external_edit_is_dispatched(watcher):
+    diary_service.save_day("2024-03-01", make_day(notes=["своя запись"]))
+    path = diary_service.day_path("2024-03-01")
+    time.sleep(0.1)
+
+    path.write_bytes(path.read_bytes().replace("своя запись".encode(), "чужая правка".encode()))
+
+    assert _wait_for(lambda: [change.key for change in watcher] == ["2024-03-01"])
+    assert watcher_service.generation("day", "2024-03-01") == 1
+
+
+def test_foreign_files_are_ignored(data_dir):
+    assert watcher_service._classify(data_dir / "diary" / "notes.json") is None
+    assert watcher_service._classify(data_dir / "diary" / ".2024-03-01.json.tmp") is None
+    assert watcher_service._classify(data_dir / "projects" / "Ремонт.json").key == "Ремонт"
@@ -0,0 +1,113 @@
+import os
+import pytest
+import streamlit as st
+from services.diary_service import diary_service
+from services.project_service import project_service
+from tests.conftest import make_day, make_task
+from ui.session_documents import SessionDocuments
+
+
+@pytest.fixture
+def session(data_dir, monkeypatch):
+    """Чистое состояние сессии вместо st.session_state"""
+    state = {}
+    monkeypatch.setattr(st, "session_state", state)
+    return state
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Счётчик чтений дней с диска"""
+    calls = []
+    load_day = diary_service.load_day
+    monkeypatch.setattr(diary_service, "load_day", lambda day_date: calls.append(day_date) or load_day(day_date))
+    return calls
+
+
+def _touch(path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_day_object_survives_reruns(session, loads):
+    diary_service.save_day("2024-06-10", make_day(morning=[make_task("Зарядка")]))
+
+    first = SessionDocuments.get_day("2024-06-10")
+    first.morning[0].status = "✅"
+
+    assert SessionDocuments.get_day("2024-06-10") is first
+    assert loads == ["2024-06-10"]
+
+
+def test_external_change_reloads_and_resets_widgets(session, loads):
+    diary_service.save_day("2024-06-10", make_day(morning=[make_task("Зарядка")]))
+    first = SessionDocuments.get_day("2024-06-10")
+    session["state_Настроение"] = 5
+    session["2024-06-10_task_0"] = "старое"
+    session["unrelated"] = 1
+
+    diary_service.save_day("2024-06-10", make_day(morning=[make_task("Пробежка")]))
+    _touch(diary_service.day_path("2024-06-10"))
+    reloaded = SessionDocuments.get_day("2024-06-10")
+
+    assert reloaded is not first
+    assert reloaded.morning[0].task == "Пробежка"
+    assert set(session) == {"session_day", "unrelated"}
+
+
+def test_save_keeps_the_session_object(session, loads):
+    diary_service.save_day("2024-06-10", make_day())
+    day_data = SessionDocuments.get_day("2024-06-10")
+    day_data.notes.append("новая заметка")
+
+    SessionDocuments.save_day("2024-06-10", day_data)
+
+    assert SessionDocuments.get_day("2024-06-10") is day_data
+    assert loads == ["2024-06-10"]
+
+
+def test_switching_days_loads_the_other_day(session, loads):
+    diary_service.save_days({"2024-06-10": make_day(notes=["первый"]), "2024-06-11": make_day(notes=["второй"])})
+
+    assert SessionDocuments.get_day("2024-06-10").notes == ["первый"]
+    assert SessionDocuments.get_day("2024-06-11").notes == ["второй"]
+    assert loads == ["2024-06-10", "2024-06-11"]
+
+
+def test_project_object_survives_reruns(session):
+    project_service.save_project("Ремонт", project_service.create_project("Ремонт"))
+
+    project = SessionDocuments.get_project("Ремонт")
+
+    assert SessionDocuments.get_project("Ремонт") is project
+
+
+def test_scheduled_save_writes_a_snapshot_once(session, monkeypatch):
+    from services.autosave_service import autosave_service
+
+    saves = []
+    save_day = diary_service.save_day
+    monkeypatch.setattr(diary_service, "save_day", lambda *args: saves.append(args[0]) or save_day(*args))
+    diary_service.save_day("2024-06-10", make_day())
+    saves.clear()
+    day_data = SessionDocuments.get_day("2024-06-10")
+
+    for value in ("5", "6", "7"):
+        day_data.state.set_value("Настроение", value, "scale_1_10")
+        SessionDocuments.schedule_day_save("2024-06-10", day_data)
+    # Правка после планирования в запись не попадает до следующего schedule_day_save
+    day_data.notes.append("позже")
+    autosave_service.flush(SessionDocuments._autosave_key("2024-06-10"))
+
+    saved = diary_service.load_day("2024-06-10")
+    assert saves == ["2024-06-10"]
+    assert (saved.state.get_value("Настроение"), saved.notes) == ("7", [])
+    # Версия в сессии обновлена: свой файл не перечитывается
+    assert SessionDocuments.get_day("2024-06-10") is day_data
+
+
+def test_sessions_do_not_cancel_each_others_saves(session):
+    first_key = SessionDocuments._autosave_key("2024-06-10")
+    session.clear()
+
+    assert SessionDocuments._autosave_key("2024-06-10") != first_key
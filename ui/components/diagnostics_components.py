@@ -0,0 +1,153 @@
+import streamlit as st
+from typing import Callable
+from core.config import config
+from core.constants import DATA_DIR
+from core.instrumentation import STAGES, instrumentation
+from core.profiler import ProfileResult, profile_call
+
+METRICS_FILE = DATA_DIR / "diagnostics" / "metrics.json"
+
+STAGE_LABELS = {
+    "io": "💽 Ввод-вывод",
+    "validation": "🧪 Валидация",
+    "service": "⚙️ Сервисы",
+    "render": "🖼️ Отрисовка",
+}
+
+
+class DiagnosticsComponents:
+    """Панели диагностики производительности: метрики и профилировщик"""
+
+    @staticmethod
+    def render_diagnostics_panel() -> None:
+        """Время операций по стадиям, гистограммы и экспорт метрик"""
+        if not instrumentation.enabled:
+            return
+
+        with st.expander("🩺 Диагностика производительности", expanded=False):
+            snapshot = instrumentation.snapshot()
+
+            # Собственное время стадий (без вложенных замеров) - куда уходит перезапуск
+            columns = st.columns(len(STAGES))
+            for column, stage in zip(columns, STAGES):
+                column.metric(STAGE_LABELS[stage], f"{snapshot['stage_totals_ms'][stage]:.1f} мс")
+
+            if snapshot["operations"]:
+                st.dataframe(
+                    [
+                        {
+                            "Операция": op["name"],
+                            "Стадия": op["stage"],
+                            "Вызовов": op["count"],
+                            "Всего, мс": op["total_ms"],
+                            "Собственное, мс": op["self_ms"],
+                            "Среднее, мс": op["mean_ms"],
+                            "p50, мс": op["p50_ms"],
+                            "p95, мс": op["p95_ms"],
+                            "Макс, мс": op["max_ms"],
+                        }
+                        for op in snapshot["operations"]
+                    ],
+                    use_container_width=True,
+                    hide_index=True,
+                )
+            else:
+                st.info("Замеров пока нет")
+
+            if snapshot["bytes"]:
+                st.caption(" · ".join(
+                    f"{item['name']} {item['direction']}: {item['bytes'] / 1024:.1f} КБ" for item in snapshot["bytes"]
+                ))
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.download_button("⬇️ Prometheus", data=instrumentation.to_prometheus(),
+                                   file_name="daily_tracker_metrics.prom", mime="text/plain",
+                                   use_container_width=True, key="diagnostics_prometheus")
+            with col2:
+                st.download_button("⬇️ JSON", data=instrumentation.to_json(),
+                                   file_name="daily_tracker_metrics.json", mime="application/json",
+                                   use_container_width=True, key="diagnostics_json")
+            with col3:
+                if st.button("💾 В файл", use_container_width=True, key="diagnostics_save"):
+                    try:
+                        instrumentation.save_json(METRICS_FILE)
+                        st.success(f"Сохранено: {METRICS_FILE}")
+                    except OSError as e:
+                        st.error(f"Ошибка сохранения метрик: {e}")
+            with col4:
+                if st.button("🔄 Сбросить", use_container_width=True, key="diagnostics_reset"):
+                    instrumentation.reset()
+                    st.rerun()
+
+    @staticmethod
+    def run_with_profiler(main: Callable[[], None]) -> None:
+        """Запуск страницы; по запросу пользователя - под профилировщиком"""
+        if not config.profiler['enabled']:
+            main()
+            return
+
+        if st.session_state.pop("profile_next_rerun", False):
+            st.session_state["profile_result"] = profile_call(main, top=int(config.profiler['top']))
+        else:
+            main()
+
+        # Панель рисуем после main, чтобы результат был виден в том же перезапуске
+        DiagnosticsComponents.render_profiler_panel()
+
+    @staticmethod
+    def render_profiler_panel() -> None:
+        """Кнопка профилирования и результаты последнего замера"""
+        with st.expander("⏱️ Профилировщик", expanded="profile_result" in st.session_state):
+            st.caption("Следующий перезапуск страницы выполнится под cProfile и tracemalloc")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("▶️ Профилировать перезапуск", use_container_width=True, key="profiler_start"):
+                    st.session_state["profile_next_rerun"] = True
+                    st.rerun()
+            with col2:
+                if st.button("🗑️ Очистить", use_container_width=True, key="profiler_clear"):
+                    st.session_state.pop("profile_result", None)
+                    st.rerun()
+
+            result: ProfileResult = st.session_state.get("profile_result")
+            if result is None:
+                return
+
+            if result.error:
+                st.warning(f"Перезапуск завершился ошибкой: {result.error}")
+
+            col1, col2 = st.columns(2)
+            col1.metric("Время перезапуска", f"{result.wall_ms:.0f} мс")
+            col2.metric("Пик памяти", f"{result.peak_memory / 1024 / 1024:.1f} МБ")
+
+            st.markdown("**Функции по накопленному времени**")
+            st.dataframe(
+                [
+                    {
+                        "Функция": row["function"],
+                        "Вызовов": row["calls"],
+                        "Собственное, мс": row["tottime_ms"],
+                        "Накопленное, мс": row["cumtime_ms"],
+                    }
+                    for row in result.functions
+                ],
+                use_container_width=True,
+                hide_index=True,
+            )
+
+            if result.allocations:
+                st.markdown("**Крупнейшие выделения памяти**")
+                st.dataframe(
+                    [
+                        {"Место": row["location"], "КБ": row["size_kb"], "Блоков": row["blocks"]}
+                        for row in result.allocations
+                    ],
+                    use_container_width=True,
+                    hide_index=True,
+                )
+
+            st.download_button("⬇️ Скачать профиль (.prof)", data=result.raw,
+                               file_name="daily_tracker_rerun.prof", mime="application/octet-stream",
+                               use_container_width=True, key="profiler_download")
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import streamlit as st
+from pathlib import Path
+from core.exceptions import DailyTrackerError
+from services.export_service import EXPORT_FORMATS, export_service
+from core.vocabulary import vocabulary
+from services.search_service import search_service
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportComponents:
+    """Компоненты экспорта истории"""
+
+    @staticmethod
+    def render_sidebar_export() -> None:
+        """Экспорт истории дней с кнопкой скачивания"""
+        with st.sidebar.expander("📤 Экспорт истории", expanded=False):
+            export_format = st.selectbox("Формат", EXPORT_FORMATS, key="export_format")
+            date_range = st.date_input("Период", value=(), key="export_dates")
+            category_vocabulary = vocabulary.categories
+            categories = [category_vocabulary.label(key) for key in st.multiselect(
+                "Категории задач", category_vocabulary.options(search_service.categories_in_use()),
+                format_func=category_vocabulary.label, key="export_categories")]
+
+            if st.button("📦 Подготовить файл", use_container_width=True, key="export_prepare"):
+                ExportComponents._remove_previous_file()
+
+                date_from = date_to = None
+                if len(date_range) == 2:
+                    date_from, date_to = (d.strftime("%Y-%m-%d") for d in date_range)
+
+                # Пишем во временный файл, чтобы не держать экспорт в памяти сессии
+                fd, temp_path = tempfile.mkstemp(prefix="daily_tracker_", suffix=f".{export_format}")
+                os.close(fd)
+                try:
+                    count = export_service.export_to_file(
+                        export_format, Path(temp_path),
+                        date_from=date_from, date_to=date_to, categories=categories or None
+                    )
+                    st.session_state["export_file"] = temp_path
+                    st.caption(f"Записей: {count}")
+                except DailyTrackerError as e:
+                    os.unlink(temp_path)
+                    st.error(f"Ошибка экспорта: {e}")
+
+            temp_path = st.session_state.get("export_file")
+            if temp_path and os.path.exists(temp_path):
+                file_format = temp_path.rsplit(".", 1)[-1]
+                with open(temp_path, "rb") as export_file:
+                    st.download_button(
+                        "⬇️ Скачать",
+                        data=export_file,
+                        file_name=f"daily_tracker_export.{file_format}",
+                        mime=MIME_TYPES.get(file_format),
+                        use_container_width=True,
+                        key="export_download"
+                    )
+
+    @staticmethod
+    def _remove_previous_file() -> None:
+        temp_path = st.session_state.pop("export_file", None)
+        if temp_path and os.path.exists(temp_path):
+            os.unlink(temp_path)
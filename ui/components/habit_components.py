@@ -0,0 +1,70 @@
+import streamlit as st
+from datetime import date, timedelta
+from core.config import config
+from core.exceptions import DailyTrackerError
+from core.instrumentation import instrumented
+from services.habit_service import habit_service
+
+WINDOW_OPTIONS = [7, 30, 90, 365]
+HISTORY_WEEKS = 26
+
+
+class HabitComponents:
+    """Панель привычек: серии и доля выполнения повторяющихся задач"""
+
+    @staticmethod
+    @instrumented("ui.habits", stage="render")
+    def render_dashboard() -> None:
+        """Таблица привычек и история выбранной привычки"""
+        st.header("🔥 Привычки")
+        configured = int(config.habits['window'])
+        options = sorted(set(WINDOW_OPTIONS) | {configured})
+        window = st.selectbox("Окно доли выполнения, дней", options, index=options.index(configured),
+                              key="habit_window")
+
+        try:
+            habits = habit_service.list_habits(window=window)
+        except DailyTrackerError as e:
+            st.error(f"Ошибка индекса привычек: {e}")
+            return
+
+        if not habits:
+            st.info("Привычек пока нет: задача становится привычкой, когда повторяется несколько дней")
+            return
+
+        st.dataframe(
+            [
+                {
+                    "Привычка": habit.name,
+                    "Серия": habit.current_streak,
+                    "Лучшая серия": habit.longest_streak,
+                    f"Выполнено за {window} дн.": habit.rate,
+                    "Дней выполнено": f"{habit.window_done}/{habit.window_planned}",
+                    "Последний раз": habit.last_done or "—",
+                }
+                for habit in habits
+            ],
+            column_config={
+                f"Выполнено за {window} дн.": st.column_config.ProgressColumn(
+                    min_value=0.0, max_value=1.0, format="%.2f"),
+            },
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        names = {habit.key: habit.name for habit in habits}
+        selected = st.selectbox("История привычки", list(names), format_func=names.get, key="habit_history")
+        HabitComponents._render_history(names[selected])
+
+    @staticmethod
+    def _render_history(name: str) -> None:
+        """Сетка последних недель: строки - дни недели, столбцы - недели"""
+        today = date.today()
+        start = today - timedelta(days=today.weekday() + 7 * (HISTORY_WEEKS - 1))
+        history = habit_service.history(name, start.isoformat(), today.isoformat())
+
+        rows = [[] for _ in range(7)]
+        for index, (_, planned, done) in enumerate(history):
+            rows[index % 7].append("🟩" if done else "🟥" if planned else "⬜")
+        st.text("\n".join("".join(row) for row in rows))
+        st.caption("🟩 выполнено · 🟥 было в плане, не выполнено · ⬜ не было в плане")
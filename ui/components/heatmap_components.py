@@ -0,0 +1,86 @@
+import streamlit as st
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+from core.exceptions import DailyTrackerError
+from core.instrumentation import instrumented
+from services.summary_service import DaySummary, summary_service
+
+LEVEL_COLORS = ["#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39"]
+CELL = 10
+GAP = 2
+RANGE_OPTIONS = {"Этот год": 1, "3 года": 3, "10 лет": 10}
+
+
+class HeatmapComponents:
+    """Годовая карта дней в стиле GitHub по файлу сводок"""
+
+    @staticmethod
+    def _level(value: Optional[float], scale: float) -> int:
+        """Уровень цвета 1-4 для существующего дня"""
+        if not value or scale <= 0:
+            return 1
+        return 1 + min(3, int(value / scale * 4))
+
+    @staticmethod
+    def _year_svg(year: int, summaries: Dict[str, DaySummary], metric: Callable[[DaySummary], Optional[float]],
+                  scale: float) -> str:
+        """SVG одного года: столбцы - недели, строки - дни недели"""
+        first = date(year, 1, 1)
+        start = first - timedelta(days=first.weekday())
+        cells = []
+        current = first
+        while current.year == year:
+            summary = summaries.get(current.isoformat())
+            column, row = (current - start).days // 7, current.weekday()
+            if summary is None or not summary.exists:
+                level, title = 0, f"{current.isoformat()}: дня нет"
+            else:
+                level = HeatmapComponents._level(metric(summary), scale)
+                progress = "—" if summary.mean_progress is None else f"{summary.mean_progress}%"
+                title = f"{current.isoformat()}: ✅ {summary.done}/{summary.total}, прогресс {progress}"
+            cells.append(f'<rect x="{column * (CELL + GAP)}" y="{row * (CELL + GAP)}" width="{CELL}" '
+                         f'height="{CELL}" rx="2" fill="{LEVEL_COLORS[level]}"><title>{title}</title></rect>')
+            current += timedelta(days=1)
+
+        width = 54 * (CELL + GAP)
+        height = 7 * (CELL + GAP)
+        return (f'<svg viewBox="0 0 {width} {height}" width="100%" xmlns="http://www.w3.org/2000/svg">'
+                + "".join(cells) + "</svg>")
+
+    @staticmethod
+    @instrumented("ui.heatmap", stage="render")
+    def render_sidebar_heatmap() -> None:
+        """Карта одного или нескольких лет: цвет - средний прогресс, выполненные задачи или состояние"""
+        with st.sidebar.expander("🟩 Карта года", expanded=False):
+            range_label = st.selectbox("Период", list(RANGE_OPTIONS), key="heatmap_range")
+            metrics: Dict[str, Callable[[DaySummary], Optional[float]]] = {
+                "📈 Средний прогресс": lambda summary: summary.mean_progress,
+                "✅ Выполнено задач": lambda summary: summary.done,
+            }
+            for category in summary_service.state_categories():
+                if category:
+                    metrics[category] = lambda summary, category=category: summary.state.get(category)
+            metric_label = st.selectbox("Цвет", list(metrics), key="heatmap_metric")
+            metric = metrics[metric_label]
+
+            today = date.today()
+            years = list(range(today.year - RANGE_OPTIONS[range_label] + 1, today.year + 1))
+            try:
+                # Весь диапазон - одно чтение файла сводок
+                summaries: List[DaySummary] = summary_service.read_range(f"{years[0]}-01-01", f"{years[-1]}-12-31")
+            except DailyTrackerError as e:
+                st.error(f"Ошибка файла сводок: {e}")
+                return
+
+            existing = [summary for summary in summaries if summary.exists]
+            values = [metric(summary) or 0 for summary in existing]
+            # Прогресс и состояние - в процентах, число задач - относительно максимума периода
+            scale = max(values, default=0) if metric_label == "✅ Выполнено задач" else 100
+            by_date = {summary.date: summary for summary in existing}
+
+            for year in reversed(years):
+                year_days = [summary for summary in existing if summary.date.startswith(str(year))]
+                progress = [summary.mean_progress for summary in year_days if summary.mean_progress is not None]
+                mean = f", средний прогресс {sum(progress) / len(progress):.0f}%" if progress else ""
+                st.caption(f"{year}: дней {len(year_days)}{mean}")
+                st.markdown(HeatmapComponents._year_svg(year, by_date, metric, scale), unsafe_allow_html=True)
@@ -0,0 +1,34 @@
+import streamlit as st
+from core.exceptions import DailyTrackerError
+from services.import_service import import_service
+
+
+class ImportComponents:
+    """Компоненты пакетного импорта"""
+
+    @staticmethod
+    def render_sidebar_import() -> None:
+        """Загрузка файла с задачами и импорт (с пробным режимом)"""
+        with st.sidebar.expander("📥 Импорт задач", expanded=False):
+            uploaded_file = st.file_uploader(
+                "CSV, JSONL или календарь (.ics)",
+                type=["csv", "jsonl", "json", "ics"],
+                key="import_file"
+            )
+            dry_run = st.checkbox("🔍 Пробный запуск (без записи)", value=True, key="import_dry_run")
+
+            if uploaded_file is not None and st.button("📥 Импортировать", use_container_width=True,
+                                                       key="import_run"):
+                try:
+                    import_format = import_service.detect_format(uploaded_file.name)
+                    report = import_service.import_stream(uploaded_file, import_format, dry_run=dry_run)
+                except DailyTrackerError as e:
+                    st.error(f"Ошибка импорта: {e}")
+                    return
+
+                if report.errors:
+                    st.warning(report.summary())
+                    for error in report.errors[:20]:
+                        st.caption(f"Строка {error.line}: {error.message}")
+                else:
+                    st.success(report.summary())
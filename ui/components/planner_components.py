@@ -0,0 +1,79 @@
+import streamlit as st
+from datetime import date, timedelta
+from typing import List
+from core.constants import DAY_PERIODS
+from core.exceptions import DailyTrackerError
+from services.carryover_service import carryover_service
+from services.planner_service import planner_service
+
+EXISTING_MODE_LABELS = {
+    "skip": "⏭️ Пропускать существующие",
+    "merge": "➕ Дополнять существующие",
+    "replace": "♻️ Перезаписывать",
+}
+WEEKDAY_NAMES = ["понедельника", "вторника", "среды", "четверга", "пятницы", "субботы", "воскресенья"]
+
+
+class PlannerComponents:
+    """Компоненты пакетного планирования дней"""
+
+    @staticmethod
+    def render_sidebar_planner(template_names: List[str]) -> None:
+        """Планирование диапазона дней по шаблонам будней/выходных"""
+        with st.sidebar.expander("🗓️ Планирование недели", expanded=False):
+            today = date.today()
+            date_range = st.date_input(
+                "Период",
+                value=(today + timedelta(days=1), today + timedelta(days=7)),
+                key="plan_dates"
+            )
+            options = ["—"] + template_names
+            weekday_template = st.selectbox("Шаблон будней", options, key="plan_weekday_template")
+            weekend_template = st.selectbox("Шаблон выходных", options, key="plan_weekend_template")
+
+            copy_block = st.checkbox("Копировать блок в будни", key="plan_copy_block")
+            copy_period = copy_from = None
+            if copy_block:
+                copy_period = st.selectbox("Период", DAY_PERIODS, index=2, key="plan_copy_period")
+                copy_from = st.selectbox("Из", range(5), format_func=lambda i: WEEKDAY_NAMES[i],
+                                         key="plan_copy_from")
+
+            existing = st.radio("Существующие дни", list(EXISTING_MODE_LABELS),
+                                format_func=EXISTING_MODE_LABELS.get, key="plan_existing")
+
+            if st.button("🗓️ Спланировать", use_container_width=True, key="plan_run"):
+                if len(date_range) != 2:
+                    st.error("Выберите начальную и конечную дату")
+                    return
+                rules = planner_service.weekly_rules(
+                    weekday_template=None if weekday_template == "—" else weekday_template,
+                    weekend_template=None if weekend_template == "—" else weekend_template,
+                    copy_period=copy_period,
+                    copy_from_weekday=copy_from or 0
+                )
+                try:
+                    report = planner_service.plan(
+                        date_range[0].strftime("%Y-%m-%d"), date_range[1].strftime("%Y-%m-%d"),
+                        rules, existing=existing
+                    )
+                    st.success(f"✅ Готово: {report.summary()}")
+                except DailyTrackerError as e:
+                    st.error(f"Ошибка планирования: {e}")
+
+    @staticmethod
+    def render_sidebar_carryover() -> None:
+        """Перенос незавершённых задач закрытых дней вручную"""
+        with st.sidebar.expander("🔁 Перенос незавершённых", expanded=False):
+            try:
+                last_done = carryover_service.last_done()
+                st.caption(f"Обработано по: {last_done or '—'}; день закрывается в "
+                           f"{carryover_service.run_time:%H:%M}")
+            except DailyTrackerError as e:
+                st.error(f"Ошибка настроек: {e}")
+                return
+
+            if st.button("🔁 Перенести сейчас", use_container_width=True, key="carryover_run"):
+                try:
+                    st.success(f"✅ {carryover_service.run().summary()}")
+                except DailyTrackerError as e:
+                    st.error(f"Ошибка переноса: {e}")
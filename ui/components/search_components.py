@@ -0,0 +1,70 @@
+import streamlit as st
+from typing import List
+from core.constants import PERIOD_ICONS
+from core.vocabulary import vocabulary
+from services.search_service import SearchResult, search_service
+
+
+class SearchComponents:
+    """Компоненты полнотекстового поиска"""
+
+    @staticmethod
+    def render_sidebar_search(scope: str) -> None:
+        """Поле поиска в боковой панели (scope: diary или projects)"""
+        st.sidebar.subheader("🔎 Поиск")
+
+        query = st.sidebar.text_input(
+            "Поиск",
+            key=f"search_query_{scope}",
+            placeholder="нейрохирург, 🧘, python...",
+            label_visibility="collapsed"
+        )
+
+        date_from = date_to = category = status = None
+        if scope == "diary":
+            with st.sidebar.expander("Фильтры поиска", expanded=False):
+                date_range = st.date_input("Период", value=(), key=f"search_dates_{scope}")
+                if len(date_range) == 2:
+                    date_from, date_to = (d.strftime("%Y-%m-%d") for d in date_range)
+                categories, statuses = vocabulary.categories, vocabulary.statuses
+                category_options = categories.options(search_service.categories_in_use())
+                category = st.selectbox("Категория", [None] + category_options,
+                                        format_func=lambda key: "Все" if key is None else categories.label(key),
+                                        key=f"search_category_{scope}")
+                status = st.selectbox("Статус", [None] + statuses.options(),
+                                      format_func=lambda key: "Все" if key is None else statuses.label(key),
+                                      key=f"search_status_{scope}")
+                category = None if category is None else categories.label(category)
+                status = None if status is None else statuses.label(status)
+
+        if not query.strip():
+            return
+
+        kinds = ["task", "note"] if scope == "diary" else ["project_task"]
+        try:
+            results = search_service.search(query, kinds=kinds, date_from=date_from, date_to=date_to,
+                                            category=category, status=status)
+        except Exception as e:
+            st.sidebar.error(f"Ошибка поиска: {e}")
+            return
+
+        SearchComponents._render_results(results)
+
+    @staticmethod
+    def _render_results(results: List[SearchResult]) -> None:
+        """Список найденных задач и заметок"""
+        if not results:
+            st.sidebar.info("Ничего не найдено")
+            return
+
+        st.sidebar.caption(f"Найдено: {len(results)}")
+        for result in results:
+            if result.kind == "task":
+                icon = PERIOD_ICONS.get(result.period, "📝")
+                st.sidebar.markdown(f"{result.status} **{result.text}**  \n"
+                                    f"📅 {result.date} {icon} {result.period} · {result.category} · {result.progress}%")
+            elif result.kind == "note":
+                st.sidebar.markdown(f"📝 {result.text}  \n📅 {result.date}")
+            else:
+                st.sidebar.markdown(f"{result.status} **{result.text}**  \n"
+                                    f"🚀 {result.ref} · {result.period} · {result.progress}%")
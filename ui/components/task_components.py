@@ -1,7 +1,7 @@
 import streamlit as st
 from typing import List, Callable, Optional
 from models.diary import Task
-from core.constants import CATEGORIES, TASK_STATUSES
+from core.vocabulary import vocabulary
 
 
 class TaskComponents:
@@ -32,16 +32,18 @@ class TaskComponents:
 
         if show_category:
             with cols[col_index]:
-                task.category = st.selectbox("Категория", CATEGORIES,
-                                             index=CATEGORIES.index(
-                                                 task.category) if task.category in CATEGORIES else 0,
-                                             key=f"{key_prefix}_category")
+                # Своя категория задачи остаётся в списке и не сбрасывается на первую
+                categories = vocabulary.categories
+                task.category = categories.label(st.selectbox(
+                    "Категория", categories.options([task.category]), index=categories.index(task.category),
+                    format_func=categories.label, key=f"{key_prefix}_category"))
             col_index += 1
 
         with cols[col_index]:
-            task.status = st.selectbox("Статус", TASK_STATUSES,
-                                       index=TASK_STATUSES.index(task.status) if task.status in TASK_STATUSES else 0,
-                                       key=f"{key_prefix}_status")
+            statuses = vocabulary.statuses
+            task.status = statuses.label(st.selectbox(
+                "Статус", statuses.options([task.status]), index=statuses.index(task.status),
+                format_func=statuses.label, key=f"{key_prefix}_status"))
         col_index += 1
 
         with cols[col_index]:
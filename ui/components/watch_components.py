@@ -0,0 +1,30 @@
+import streamlit as st
+from services.watcher_service import watcher_service
+
+
+class WatchComponents:
+    """Компоненты для реакции на внешние изменения файлов"""
+
+    @staticmethod
+    def track_generation(kind: str, key: str) -> bool:
+        """Запомнить поколение файла в сессии; True если файл изменился извне с прошлого показа"""
+        state_key = f"watch_generation_{kind}_{key}"
+        generation = watcher_service.generation(kind, key)
+        previous = st.session_state.get(state_key)
+        st.session_state[state_key] = generation
+        return previous is not None and previous != generation
+
+    @staticmethod
+    def render_change_monitor(kind: str, key: str, interval: float = 2.0) -> None:
+        """Перезапуск страницы, когда открытый день или проект изменили извне"""
+        if not watcher_service.is_running() or not hasattr(st, "fragment"):
+            return
+
+        state_key = f"watch_generation_{kind}_{key}"
+
+        @st.fragment(run_every=interval)
+        def monitor():
+            if watcher_service.generation(kind, key) != st.session_state.get(state_key):
+                st.rerun()
+
+        monitor()
@@ -3,18 +3,26 @@ from datetime import date, timedelta
 from typing import List, Optional
 from core.constants import DAY_PERIODS, PERIOD_ICONS
 from core.exceptions import DailyTrackerError
+from core.instrumentation import instrumented
+from core.vocabulary import vocabulary
 from services.diary_service import diary_service
+from services.template_service import template_service
 from models.diary import Day, Task
 from ui.components.task_components import TaskComponents
+from ui.components.export_components import ExportComponents
+from ui.components.heatmap_components import HeatmapComponents
+from ui.components.import_components import ImportComponents
+from ui.components.planner_components import PlannerComponents
 from ui.components.progress_components import ProgressComponents
+from ui.components.search_components import SearchComponents
 from ui.components.time_components import TimeComponents
-from core.constants import CATEGORIES, TASK_STATUSES
+from ui.components.watch_components import WatchComponents
+from ui.session_documents import SessionDocuments
 class DiaryTab:
     """Вкладка ежедневника"""
 
     def __init__(self):
-        self.template_files = diary_service.template_dir.glob("*.json")
-        self.template_names = sorted([f.stem for f in self.template_files])
+        self.template_names = template_service.list_templates("day")
 
     def render_sidebar(self) -> str:
         """Рендеринг боковой панели"""
@@ -58,13 +66,25 @@ class DiaryTab:
                     label_visibility="collapsed"
                 )
 
+        # Какие дни заполнены и насколько продуктивны
+        HeatmapComponents.render_sidebar_heatmap()
+
+        # Поиск по задачам и заметкам
+        SearchComponents.render_sidebar_search("diary")
+
         # Создание нового дня
         self._render_day_creation()
+        PlannerComponents.render_sidebar_planner(self.template_names)
+        PlannerComponents.render_sidebar_carryover()
 
         # Быстрое добавление задачи
         if selected_day:
             self._render_quick_task_add(selected_day)
 
+        # Импорт и экспорт истории
+        ImportComponents.render_sidebar_import()
+        ExportComponents.render_sidebar_export()
+
         return selected_day
 
     def _render_day_creation(self) -> None:
@@ -117,16 +137,17 @@ class DiaryTab:
         # Используем улучшенный селектор времени с уникальным ключом
         task_time = TimeComponents.render_time_selector(key_suffix="quick_add_sidebar")  # ИЗМЕНИЛИ
 
-        category_select = st.sidebar.selectbox(
+        category_select = vocabulary.categories.label(st.sidebar.selectbox(
             "Категория",
-            CATEGORIES,
+            vocabulary.categories.options(),
+            format_func=vocabulary.categories.label,
             key="new_task_category_quick_add"  # ИЗМЕНИЛИ
-        )
+        ))
 
         if st.sidebar.button("Добавить задачу", use_container_width=True,
                              key="add_task_quick_sidebar") and task_name and selected_day:
             try:
-                day_data = diary_service.load_day(selected_day)
+                day_data = SessionDocuments.get_day(selected_day)
                 new_task = Task(  # ⬅️ Автоматически получит ID
                     задача=task_name,
                     время=task_time or self._suggest_next_time([], period_select),
@@ -135,7 +156,7 @@ class DiaryTab:
                     категория=category_select
                 )
                 day_data.add_task(period_select, new_task)
-                diary_service.save_day(selected_day, day_data)
+                SessionDocuments.save_day(selected_day, day_data)
                 st.sidebar.success("Задача добавлена!")
                 st.rerun()
             except DailyTrackerError as e:
@@ -155,8 +176,12 @@ class DiaryTab:
                 """.format(selected_day=selected_day))
                 return
 
-            day_data = diary_service.load_day(selected_day)
-            day_file = diary_service.data_dir / f"{selected_day}.json"
+            day_data = SessionDocuments.get_day(selected_day)
+            day_file = diary_service.day_path(selected_day)
+
+            if WatchComponents.track_generation("day", selected_day):
+                st.toast(f"🔄 День {selected_day} изменён извне — данные обновлены")
+            WatchComponents.render_change_monitor("day", selected_day)
 
             st.header(f"📅 День: {selected_day}")
 
@@ -200,7 +225,7 @@ class DiaryTab:
                     def delete_task():
                         # Удаляем задачу по ID
                         tasks[:] = [t for t in tasks if getattr(t, 'id', None) != task_id]
-                        diary_service.save_day(selected_day, day_data)
+                        SessionDocuments.save_day(selected_day, day_data)
                         st.rerun()
 
                     return delete_task
@@ -213,7 +238,7 @@ class DiaryTab:
                                 if i > 0:
                                     # Меняем местами с предыдущей задачей
                                     tasks[i], tasks[i - 1] = tasks[i - 1], tasks[i]
-                                    diary_service.save_day(selected_day, day_data)
+                                    SessionDocuments.save_day(selected_day, day_data)
                                     st.rerun()
                                 break
 
@@ -227,7 +252,7 @@ class DiaryTab:
                                 if i < len(tasks) - 1:
                                     # Меняем местами со следующей задачей
                                     tasks[i], tasks[i + 1] = tasks[i + 1], tasks[i]
-                                    diary_service.save_day(selected_day, day_data)
+                                    SessionDocuments.save_day(selected_day, day_data)
                                     st.rerun()
                                 break
 
@@ -256,13 +281,13 @@ class DiaryTab:
                         категория="🏠 Быт"
                     )
                     tasks.append(new_task)
-                    diary_service.save_day(selected_day, day_data)
+                    SessionDocuments.save_day(selected_day, day_data)
                     st.rerun()
 
             with col2:
                 if st.button(f"🕐 Сортировать по времени", key=f"sort_{period}", use_container_width=True):
                     self._sort_tasks_in_period(tasks)
-                    diary_service.save_day(selected_day, day_data)
+                    SessionDocuments.save_day(selected_day, day_data)
                     st.rerun()
 
     def _render_day_analysis(self, day_data: Day) -> None:
@@ -301,11 +326,6 @@ class DiaryTab:
                     from ui.components.state_components import StateComponents
                     StateComponents.render_category_management()
                 else:
-                    # Сохраняем текущее состояние перед рендерингом
-                    current_state_data = day_data.state.model_dump(by_alias=True) if hasattr(day_data.state,
-                                                                                             'model_dump') else day_data.state.dict(
-                        by_alias=True)
-
                     # Рендерим редактор состояния
                     from ui.components.state_components import StateComponents
                     StateComponents.render_state_editor(day_data.state, state_categories)
@@ -313,16 +333,11 @@ class DiaryTab:
                     # Показываем сводку
                     StateComponents.render_state_summary(day_data.state, state_categories)
 
-                    # Автосохранение при изменении состояния
-                    new_state_data = day_data.state.model_dump(by_alias=True) if hasattr(day_data.state,
-                                                                                         'model_dump') else day_data.state.dict(
-                        by_alias=True)
-                    if current_state_data != new_state_data:
-                        try:
-                            diary_service.save_day(selected_day, day_data)
-                            st.success("✅ Состояние сохранено!")
-                        except Exception as e:
-                            st.error(f"Ошибка сохранения состояния: {e}")
+                    # Автосохранение: только если значения действительно изменились, с задержкой
+                    if day_data.state.is_dirty():
+                        day_data.state.clear_dirty()
+                        SessionDocuments.schedule_day_save(selected_day, day_data)
+                        st.caption("💾 Состояние будет сохранено автоматически")
 
             except Exception as e:
                 st.error(f"Ошибка загрузки категорий состояния: {e}")
@@ -346,7 +361,7 @@ class DiaryTab:
         with col1:
             if st.button("💾 Сохранить все изменения", use_container_width=True, type="primary"):
                 try:
-                    diary_service.save_day(selected_day, day_data)
+                    SessionDocuments.save_day(selected_day, day_data)
                     st.success("✅ Все изменения сохранены!")
                 except DailyTrackerError as e:
                     st.error(f"Ошибка сохранения: {e}")
@@ -356,14 +371,48 @@ class DiaryTab:
                 st.rerun()
 
         with col3:
+            target_date = st.date_input(
+                "Копировать на",
+                value=date.today() + timedelta(days=1),
+                key="copy_target_date"
+            ).strftime("%Y-%m-%d")
             if st.button("📅 Копировать день", use_container_width=True):
                 try:
-                    tomorrow = (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
-                    diary_service.copy_day(selected_day, tomorrow)
-                    st.success(f"📅 День на {tomorrow} создан как копия!")
+                    diary_service.copy_day(selected_day, target_date)
+                    st.success(f"📅 День на {target_date} создан как копия!")
                 except DailyTrackerError as e:
                     st.error(f"Ошибка копирования: {e}")
 
+        self._render_task_move(selected_day, day_data)
+
+    def _render_task_move(self, selected_day: str, day_data: Day) -> None:
+        """Перенос выбранных задач на другой день с сохранением их ID"""
+        with st.expander("📆 Перенести задачи на другой день", expanded=False):
+            labels = {task.id: f"{period}: {task.task}"
+                      for period in DAY_PERIODS for task in day_data.get_tasks_by_period(period)}
+            unfinished = [task.id for period in DAY_PERIODS for task in day_data.get_tasks_by_period(period)
+                          if task.status == "☐" or task.progress < 100]
+            selected = st.multiselect("Задачи", list(labels), default=unfinished, format_func=labels.get,
+                                      key=f"{selected_day}_move_tasks")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                target_date = st.date_input("На день", value=date.today() + timedelta(days=1),
+                                            key=f"{selected_day}_move_date").strftime("%Y-%m-%d")
+            with col2:
+                target_period = st.selectbox("Период", ["Прежний"] + DAY_PERIODS, key=f"{selected_day}_move_period")
+
+            if st.button("📆 Перенести", disabled=not selected, use_container_width=True):
+                try:
+                    # Несохранённые правки дня должны попасть в файл до переноса
+                    SessionDocuments.save_day(selected_day, day_data)
+                    moved = diary_service.reschedule_tasks(
+                        selected, target_date, None if target_period == "Прежний" else target_period)
+                    st.toast(f"📆 Перенесено задач на {target_date}: {len(moved)}")
+                    st.rerun()
+                except DailyTrackerError as e:
+                    st.error(f"Ошибка переноса: {e}")
+
     def render_empty_state(self) -> None:
         """Рендеринг пустого состояния"""
         st.info("""
@@ -381,6 +430,7 @@ class DiaryTab:
         Чтобы начать, создайте ваш первый день в боковой панели!
         """)
 
+    @instrumented("ui.diary_tab", stage="render")
     def show_diary_tab(self) -> None:
         """Основной метод отображения вкладки"""
         try:
@@ -1,22 +1,29 @@
 import streamlit as st
 from typing import List, Optional
 from core.exceptions import DailyTrackerError
+from core.instrumentation import instrumented
 from services.project_service import project_service
+from services.template_service import template_service
 from models.projects import Project, ProjectTask, ProjectSection
 from ui.components.progress_components import ProgressComponents
+from ui.components.search_components import SearchComponents
+from ui.components.watch_components import WatchComponents
+from ui.session_documents import SessionDocuments
 
 
 class ProjectsTab:
     """Вкладка проектов"""
 
     def __init__(self):
-        self.template_files = project_service.template_dir.glob("*.json")
-        self.template_names = sorted([f.stem for f in self.template_files])
+        self.template_names = template_service.list_templates("project")
 
     def render_sidebar(self) -> Optional[str]:
         """Рендеринг боковой панели"""
         st.sidebar.header("📁 Управление проектами")
 
+        # Поиск по задачам проектов
+        SearchComponents.render_sidebar_search("projects")
+
         # Создание проекта (оставить как есть)
         st.sidebar.subheader("Создать новый проект")
         creation_type = st.sidebar.radio(
@@ -76,7 +83,11 @@ class ProjectsTab:
     def render_project_content(self, project_name: str) -> None:
         """Рендеринг содержимого проекта - БЕЗ НАВИГАЦИИ В ОСНОВНОМ ОКНЕ"""
         try:
-            project_data = project_service.load_project(project_name)
+            project_data = SessionDocuments.get_project(project_name)
+
+            if WatchComponents.track_generation("project", project_name):
+                st.toast(f"🔄 Проект {project_name} изменён извне — данные обновлены")
+            WatchComponents.render_change_monitor("project", project_name)
 
             # Переключатель режимов
             view_mode = st.radio(
@@ -185,7 +196,7 @@ class ProjectsTab:
                     st.markdown("")
                     if st.button("❌", key=f"delete_{section_idx}_{task_idx}"):
                         section.задачи.pop(task_idx)
-                        project_service.save_project(project_name, project_data)
+                        SessionDocuments.save_project(project_name, project_data)
                         st.rerun()
 
             # Добавление новой задачи
@@ -208,7 +219,7 @@ class ProjectsTab:
                         название=new_task_name,
                         прогресс=new_task_progress
                     ))
-                    project_service.save_project(project_name, project_data)
+                    SessionDocuments.save_project(project_name, project_data)
                     st.rerun()
 
             st.markdown("---")
@@ -256,7 +267,7 @@ class ProjectsTab:
         # Кнопка сохранения
         if st.button("💾 Сохранить все изменения", use_container_width=True):
             try:
-                project_service.save_project(project_name, project_data)
+                SessionDocuments.save_project(project_name, project_data)
                 st.success("✅ Все изменения сохранены!")
             except DailyTrackerError as e:
                 st.error(f"Ошибка сохранения: {e}")
@@ -276,6 +287,7 @@ class ProjectsTab:
         **Чтобы начать, создайте ваш первый проект в боковой панели!**
         """)
 
+    @instrumented("ui.projects_tab", stage="render")
     def show_projects_tab(self) -> None:
         """Основной метод отображения вкладки"""
         try:
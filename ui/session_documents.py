@@ -0,0 +1,102 @@
+import uuid
+import streamlit as st
+from typing import Tuple
+from models.diary import Day
+from models.projects import Project
+from services.autosave_service import autosave_service
+from services.diary_service import diary_service
+from services.project_service import project_service
+
+# Ключи виджетов, не привязанные к конкретному дню/проекту: сбрасываем их при смене документа
+DAY_WIDGET_PREFIXES: Tuple[str, ...] = ("state_",)
+PROJECT_WIDGET_PREFIXES: Tuple[str, ...] = (
+    "meta_", "task_", "new_task_",
+    "global_progress", "stability", "performance", "mobile_ready", "web_mode",
+)
+
+
+class SessionDocuments:
+    """Открытые день и проект в сессии: объект живёт между перезапусками скрипта,
+    виджеты меняют его на месте, а перечитывание с диска происходит только
+    при изменении версии файла."""
+
+    @staticmethod
+    def _clear_widgets(prefixes: Tuple[str, ...]) -> None:
+        for key in list(st.session_state.keys()):
+            if isinstance(key, str) and key.startswith(prefixes):
+                del st.session_state[key]
+
+    @staticmethod
+    def _autosave_key(day_date: str) -> str:
+        """Ключ отложенного сохранения дня: свой у каждой сессии, чтобы сессии не отменяли записи друг друга"""
+        session_key = st.session_state.setdefault("session_key", uuid.uuid4().hex)
+        return f"day:{session_key}:{day_date}"
+
+    @staticmethod
+    def get_day(day_date: str) -> Day:
+        """День из сессии или с диска, если файл изменился"""
+        entry = st.session_state.get("session_day")
+        version = diary_service.day_version(day_date)
+
+        if entry and entry["date"] == day_date and entry["version"] == version:
+            return entry["data"]
+
+        day_data = diary_service.load_day(day_date)
+        # Новые данные не должны спорить со старыми значениями виджетов
+        SessionDocuments._clear_widgets(DAY_WIDGET_PREFIXES + (f"{day_date}_",))
+        st.session_state["session_day"] = {"date": day_date, "version": version, "data": day_data}
+        return day_data
+
+    @staticmethod
+    def save_day(day_date: str, day_data: Day) -> None:
+        """Сохранить день и запомнить новую версию файла"""
+        # Полное сохранение покрывает отложенное
+        autosave_service.cancel(SessionDocuments._autosave_key(day_date))
+        diary_service.save_day(day_date, day_data)
+        st.session_state["session_day"] = {
+            "date": day_date,
+            "version": diary_service.day_version(day_date),
+            "data": day_data,
+        }
+
+    @staticmethod
+    def schedule_day_save(day_date: str, day_data: Day) -> None:
+        """Отложенное сохранение дня: серия правок подряд записывается один раз"""
+        entry = st.session_state.get("session_day")
+        if not entry or entry["date"] != day_date or entry["data"] is not day_data:
+            entry = {"date": day_date, "version": diary_service.day_version(day_date), "data": day_data}
+            st.session_state["session_day"] = entry
+
+        # Таймер пишет снимок: живой объект дня тем временем меняет поток скрипта
+        snapshot = day_data.model_copy(deep=True)
+
+        def save() -> None:
+            # Выполняется в потоке таймера: st недоступен, обновляем запись сессии напрямую
+            diary_service.save_day(day_date, snapshot)
+            entry["version"] = diary_service.day_version(day_date)
+
+        autosave_service.schedule(SessionDocuments._autosave_key(day_date), save)
+
+    @staticmethod
+    def get_project(project_name: str) -> Project:
+        """Проект из сессии или с диска, если файл изменился"""
+        entry = st.session_state.get("session_project")
+        version = project_service.project_version(project_name)
+
+        if entry and entry["name"] == project_name and entry["version"] == version:
+            return entry["data"]
+
+        project_data = project_service.load_project(project_name)
+        SessionDocuments._clear_widgets(PROJECT_WIDGET_PREFIXES)
+        st.session_state["session_project"] = {"name": project_name, "version": version, "data": project_data}
+        return project_data
+
+    @staticmethod
+    def save_project(project_name: str, project_data: Project) -> None:
+        """Сохранить проект и запомнить новую версию файла"""
+        project_service.save_project(project_name, project_data)
+        st.session_state["session_project"] = {
+            "name": project_name,
+            "version": project_service.project_version(project_name),
+            "data": project_data,
+        }